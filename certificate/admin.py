@@ -1,8 +1,16 @@
 from django.contrib import admin
-from .models import Certificate
+from .models import Certificate, CertificateIssuance
 
 @admin.register(Certificate)
 class CertificateAdmin(admin.ModelAdmin):
-    list_display = ('student', 'event', 'issued_at', 'sent_via_email')
+    list_display = ('student', 'event', 'issued_at', 'sent_via_email', 'verification_code')
     list_filter = ('sent_via_email', 'event__event_type')
-    search_fields = ('student__username', 'event__title')
\ No newline at end of file
+    search_fields = ('student__username', 'event__title', '=verification_code')
+
+
+@admin.register(CertificateIssuance)
+class CertificateIssuanceAdmin(admin.ModelAdmin):
+    list_display = ('event', 'status', 'issued_count', 'failed_count', 'total', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    search_fields = ('event__title',)
+    readonly_fields = ('event', 'total', 'issued_count', 'failed_count', 'started_at', 'updated_at', 'finished_at')
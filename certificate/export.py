@@ -0,0 +1,72 @@
+import zipfile
+
+from .models import Certificate
+from .utils import certificate_filename, ensure_certificate_file, render_certificate_files
+
+# ZIP export of every certificate of an event, produced on the fly: members are
+# copied from storage in small blocks and each block is handed to the response
+# as soon as zipfile has written it, so memory use does not grow with the event.
+
+BATCH_SIZE = 200
+COPY_BLOCK = 64 * 1024
+
+
+class _ZipOutput:
+    # Write-only, unseekable file object: zipfile then writes data descriptors
+    # after each member instead of seeking back to patch the local headers.
+    def __init__(self):
+        self._chunks = []
+        self._offset = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._offset
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _certificates(event_id):
+    # keyset batches instead of one long-lived cursor, since rendering a
+    # missing file writes to the same table while we read it
+    last_id = 0
+    while True:
+        batch = list(Certificate.objects
+                     .filter(event_id=event_id, id__gt=last_id)
+                     .select_related('event__organizer', 'student')
+                     .order_by('id')[:BATCH_SIZE])
+        if not batch:
+            return
+        # certificates never downloaded have no file yet: render the batch's
+        # missing PDFs together across the render pool instead of one by one
+        render_certificate_files([c for c in batch if not c.certificate_file])
+        yield from batch
+        last_id = batch[-1].id
+
+
+def stream_event_certificates(event_id):
+    """Yield the bytes of a ZIP archive holding every certificate of an event."""
+    output = _ZipOutput()
+    # PDFs are already compressed; storing them avoids burning CPU on deflate
+    with zipfile.ZipFile(output, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for certificate in _certificates(event_id):
+            ensure_certificate_file(certificate)
+            arcname = certificate_filename(certificate.event, certificate.student)
+            with certificate.certificate_file.open('rb') as source, archive.open(arcname, 'w') as member:
+                while True:
+                    block = source.read(COPY_BLOCK)
+                    if not block:
+                        break
+                    member.write(block)
+                    yield output.drain()
+            yield output.drain()
+    yield output.drain()
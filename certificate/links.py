@@ -0,0 +1,84 @@
+import os
+
+from django.conf import settings
+from django.core import signing
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+
+# Certificates are delivered as signed, expiring download links instead of
+# email attachments. The token carries "<certificate_id>:<student_id>" and
+# cannot be forged or pointed at another certificate, but it is a bearer
+# link: it is opened straight from the email, usually without an API token,
+# so anyone holding it can download that one certificate until it expires.
+# Hence the short CERTIFICATE_LINK_MAX_AGE; logged-in students can always
+# download through certificate_download instead.
+
+SALT = "certificate.download"
+
+
+def link_max_age() -> int:
+    return int(getattr(settings, 'CERTIFICATE_LINK_MAX_AGE', 2 * 24 * 60 * 60))
+
+
+def make_download_token(certificate) -> str:
+    return signing.TimestampSigner(salt=SALT).sign(f"{certificate.pk}:{certificate.student_id}")
+
+
+def read_download_token(token):
+    """Return (certificate_id, student_id), or None for a bad or expired token."""
+    try:
+        value = signing.TimestampSigner(salt=SALT).unsign(token, max_age=link_max_age())
+        certificate_id, student_id = value.split(':')
+        return int(certificate_id), int(student_id)
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def download_path(certificate) -> str:
+    return reverse('certificate-download', args=[make_download_token(certificate)])
+
+
+def _absolute(path, request=None) -> str:
+    if request is not None:
+        return request.build_absolute_uri(path)
+    return f"http://{getattr(settings, 'SITE_DOMAIN', 'localhost:8000')}".rstrip("/") + path
+
+
+def download_url(certificate, request=None) -> str:
+    return _absolute(download_path(certificate), request)
+
+
+def verify_url(certificate, request=None) -> str:
+    """Public verification page printed on the certificate."""
+    return _absolute(reverse('certificate-verify', args=[certificate.display_code]), request)
+
+
+def serve_file(field_file, filename):
+    """
+    Send a stored file without copying it through Python where the web server
+    can do it: CERTIFICATE_SENDFILE_BACKEND = 'nginx' (X-Accel-Redirect to
+    CERTIFICATE_SENDFILE_PREFIX + name) or 'apache' (X-Sendfile with the
+    absolute path). Otherwise FileResponse, which uses sendfile under WSGI.
+    """
+    backend = getattr(settings, 'CERTIFICATE_SENDFILE_BACKEND', '')
+    disposition = f'attachment; filename="{filename}"'
+
+    if backend == 'nginx':
+        response = HttpResponse(content_type='application/pdf')
+        prefix = getattr(settings, 'CERTIFICATE_SENDFILE_PREFIX', '/protected/')
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + field_file.name
+        response['Content-Disposition'] = disposition
+        return response
+
+    if backend == 'apache':
+        response = HttpResponse(content_type='application/pdf')
+        response['X-Sendfile'] = field_file.path
+        response['Content-Disposition'] = disposition
+        return response
+
+    try:
+        fh = field_file.open('rb')
+    except FileNotFoundError:
+        raise Http404("Certificate file not found")
+    return FileResponse(fh, as_attachment=True, filename=os.path.basename(filename),
+                        content_type='application/pdf')
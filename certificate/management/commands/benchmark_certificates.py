@@ -0,0 +1,34 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from certificate.utils import generate_certificate_pdf
+
+
+class Command(BaseCommand):
+    help = "Compare certificate rendering with a full redraw vs. the cached layout (certificates/s and bytes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200, help="Certificates rendered per mode")
+
+    def handle(self, *args, **options):
+        count = max(1, options['count'])
+        samples = [
+            (f"Student {i}" if i % 10 else None, "Intro to Django Workshop", date.today(), "Department Organizer")
+            for i in range(count)
+        ]
+        generate_certificate_pdf(*samples[0])  # warm the description cache
+
+        rates = {}
+        for label, stamped in (('full redraw', False), ('stamped', True)):
+            started = time.perf_counter()
+            total_bytes = sum(len(generate_certificate_pdf(*s, stamped=stamped)) for s in samples)
+            elapsed = time.perf_counter() - started
+            rates[label] = count / elapsed
+            self.stdout.write(
+                f"{label:12} {rates[label]:8.1f} certificates/s  {total_bytes / count:8.0f} bytes/certificate"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Speed-up: {rates['stamped'] / rates['full redraw']:.2f}x over {count} certificates."
+        ))
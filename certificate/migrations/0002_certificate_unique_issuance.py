@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def remove_duplicate_certificates(apps, schema_editor):
+    # unique_together was never applied (Meta sat at module level), so keep the
+    # oldest certificate per (event, student) before adding the constraint
+    Certificate = apps.get_model('certificate', 'Certificate')
+    seen = set()
+    duplicates = []
+    for pk, event_id, student_id in Certificate.objects.order_by('id').values_list('id', 'event_id', 'student_id').iterator():
+        if (event_id, student_id) in seen:
+            duplicates.append(pk)
+        else:
+            seen.add((event_id, student_id))
+    for start in range(0, len(duplicates), 500):
+        Certificate.objects.filter(id__in=duplicates[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificate', '0001_initial'),
+        ('events', '0009_alter_event_semester_alter_event_year'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_certificates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='certificate',
+            unique_together={('event', 'student')},
+        ),
+        migrations.CreateModel(
+            name='CertificateIssuance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='running', max_length=20)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('issued_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='certificate_issuance', to='events.event')),
+            ],
+        ),
+    ]
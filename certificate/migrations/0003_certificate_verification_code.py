@@ -0,0 +1,43 @@
+from django.db import migrations, models
+
+import certificate.models
+from certificate.models import generate_verification_code
+
+
+def fill_verification_codes(apps, schema_editor):
+    Certificate = apps.get_model('certificate', 'Certificate')
+    used = set()
+    batch = []
+    for row in Certificate.objects.filter(verification_code__isnull=True).only('id').iterator():
+        code = generate_verification_code()
+        while code in used:
+            code = generate_verification_code()
+        used.add(code)
+        row.verification_code = code
+        batch.append(row)
+        if len(batch) >= 500:
+            Certificate.objects.bulk_update(batch, ['verification_code'])
+            batch = []
+    if batch:
+        Certificate.objects.bulk_update(batch, ['verification_code'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('certificate', '0002_certificate_unique_issuance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='certificate',
+            name='verification_code',
+            field=models.CharField(editable=False, max_length=16, null=True),
+        ),
+        migrations.RunPython(fill_verification_codes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='certificate',
+            name='verification_code',
+            field=models.CharField(default=certificate.models.generate_verification_code, editable=False, max_length=16, unique=True),
+        ),
+    ]
@@ -1,18 +1,63 @@
+import secrets
+
 from django.db import models
 from django.conf import settings
 from events.models import Event
 
 # Create your models here.
 
+# no 0/O, 1/I/L: codes are read off paper and typed in by hand
+VERIFICATION_ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"
+VERIFICATION_CODE_LENGTH = 10
+
+
+def generate_verification_code():
+    return "".join(secrets.choice(VERIFICATION_ALPHABET) for _ in range(VERIFICATION_CODE_LENGTH))
+
+
+def normalize_verification_code(code):
+    """Accept codes typed with dashes, spaces or in lower case."""
+    return "".join(ch for ch in (code or "").upper() if ch.isalnum())
+
+
 class Certificate(models.Model):
     event=models.ForeignKey(Event, on_delete=models.CASCADE, related_name='certificates')
     student = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='certificates')
     issued_at= models.DateTimeField(auto_now_add=True)
     certificate_file= models.FileField(upload_to='certificates/')
     sent_via_email = models.BooleanField(default=False)
-    
-class Meta:
-    unique_together= ('event','student')
+    # printed on the PDF and resolved by the public verify endpoint
+    verification_code = models.CharField(max_length=16, unique=True, editable=False,
+                                         default=generate_verification_code)
+
+    class Meta:
+        unique_together= ('event','student')
+
+    def __str__(self):
+        return f"Certificate for {self.student.username} - {self.event.title}"
+
+    @property
+    def display_code(self):
+        return f"{self.verification_code[:5]}-{self.verification_code[5:]}"
+
+
+class CertificateIssuance(models.Model):
+    # One row per event: claimed before issuance is queued, so repeated
+    # saves of a completed workshop do not start the job again.
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, related_name='certificate_issuance')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+    total = models.PositiveIntegerField(default=0)
+    issued_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    started_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
 
-def __str__(self):
-    return f"Certificate for {self.student.username} - {self.event.title}"
+    def __str__(self):
+        return f"Certificates for {self.event.title} ({self.get_status_display()})"
@@ -1,18 +1,22 @@
 from rest_framework import serializers
+from .links import download_url, verify_url
 from .models import Certificate
 
 class CertificateSerializer(serializers.ModelSerializer):
     event_title= serializers.CharField(source='event.title', read_only =True)
     student_name=serializers.CharField(source='student.username', read_only=True)
     certificate_url= serializers.SerializerMethodField()
+    verification_code = serializers.CharField(source='display_code', read_only=True)
+    verification_url = serializers.SerializerMethodField()
     
 
     class Meta:
         model = Certificate
-        fields = ['id', 'event', 'event_title', 'student', 'student_name', 'issued_at', 'certificate_url']
+        fields = ['id', 'event', 'event_title', 'student', 'student_name', 'issued_at', 'certificate_url', 'verification_code', 'verification_url']
 
     def get_certificate_url(self, obj):
-        request = self.context.get('request')
-        if obj.certificate_file and request:
-            return request.build_absolute_uri(obj.certificate_file.url)
-        return None 
\ No newline at end of file
+        # signed, expiring link; the PDF is rendered on first download
+        return download_url(obj, self.context.get('request')) 
+
+    def get_verification_url(self, obj):
+        return verify_url(obj, self.context.get('request'))
@@ -10,10 +10,24 @@
 #         send_certificates_for_workshop_event.delay(instance.id)
 
 
-from django.db.models.signals import post_save
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from events.models import Event
-from .tasks import send_certificates_for_workshop_event
+from .models import Certificate
+from .tasks import claim_issuance, send_certificates_for_workshop_event
+from .verification import invalidate_verification, invalidate_verifications
+
+# fields shown by the public verify endpoint; saves that touch none of them
+# (e.g. login updating last_login) leave the cached answers alone
+VERIFIED_EVENT_FIELDS = {'title', 'event_type', 'start_date', 'organizer', 'organizer_id'}
+VERIFIED_USER_FIELDS = {'first_name', 'last_name', 'username'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields.intersection(update_fields))
 
 @receiver(post_save, sender=Event)
 def event_completion_handler(sender, instance: Event, created, **kwargs):
@@ -28,7 +42,34 @@ def event_completion_handler(sender, instance: Event, created, **kwargs):
         return
 
     if status == "completed" and etype == "workshop":
-        # Optional: don’t spam Celery if nothing to do
-        # (we’ll let the task dedupe by get_or_create anyway)
-        # Kick off async issuance
-        send_certificates_for_workshop_event.delay(instance.id)
\ No newline at end of file
+        # Every later save of a completed workshop lands here too; only the
+        # save that claims the event's issuance row queues the job.
+        if claim_issuance(instance.id):
+            event_id = instance.id
+            transaction.on_commit(lambda: send_certificates_for_workshop_event.delay(event_id))
+
+
+@receiver(post_delete, sender=Certificate)
+def certificate_deleted_handler(sender, instance: Certificate, **kwargs):
+    # a revoked certificate must stop verifying right away
+    invalidate_verification(instance.verification_code)
+
+
+@receiver(post_save, sender=Certificate)
+def certificate_saved_handler(sender, instance: Certificate, **kwargs):
+    # also clears a cached "not found" for a newly issued code
+    invalidate_verification(instance.verification_code)
+
+
+@receiver(post_save, sender=Event)
+def event_verification_handler(sender, instance: Event, created, update_fields=None, **kwargs):
+    if not created and _touches(update_fields, VERIFIED_EVENT_FIELDS):
+        invalidate_verifications(Certificate.objects.filter(event_id=instance.id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_verification_handler(sender, instance, created, update_fields=None, **kwargs):
+    # the user may be the certificate's student or the event's organizer
+    if not created and _touches(update_fields, VERIFIED_USER_FIELDS):
+        invalidate_verifications(Certificate.objects.filter(
+            Q(student_id=instance.id) | Q(event__organizer_id=instance.id)))
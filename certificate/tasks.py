@@ -1,10 +1,151 @@
-from celery import shared_task
-from events.models import EventRegistration
-from .utils import create_and_send_certificate
+import logging
+from datetime import timedelta
+
+from celery import chord, group, shared_task
+from django.conf import settings
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from events.models import Event, EventRegistration
+from notifications.models import Notification
+from notifications.utils import create_notification, send_bulk_emails
+from .models import Certificate, CertificateIssuance
+from .utils import certificate_email, certificate_notification, render_certificate_files
+
+logger = logging.getLogger(__name__)
+
+
+def issuance_progress(event_id):
+    """Counters of the latest issuance run for an event, or None if there was none."""
+    return (CertificateIssuance.objects
+            .filter(event_id=event_id)
+            .values('status', 'total', 'issued_count', 'failed_count', 'started_at', 'finished_at')
+            .first())
 
-@shared_task
 
+def claim_issuance(event_id):
+    """
+    Mark issuance for an event as running; True if the caller should queue it.
+    Completed runs and runs still in progress are not claimed again; a run that
+    failed, or has not made progress for CERTIFICATE_ISSUANCE_STALE_SECONDS,
+    can be.
+    """
+    issuance, created = CertificateIssuance.objects.get_or_create(event_id=event_id)
+    if created:
+        return True
+    stale_before = timezone.now() - timedelta(
+        seconds=getattr(settings, 'CERTIFICATE_ISSUANCE_STALE_SECONDS', 60 * 60))
+    return (CertificateIssuance.objects
+            .filter(pk=issuance.pk, status__in=['running', 'failed'])
+            .exclude(status='running', updated_at__gte=stale_before)
+            .update(status='running', updated_at=timezone.now(), finished_at=None)) == 1
+
+
+def _pending_registrations(event_id):
+    # Attended registrations whose certificate has not been emailed yet. The
+    # issued rows themselves are the resume point: a restarted run (or chunk)
+    # picks up after the last student whose certificate went out.
+    emailed = Certificate.objects.filter(event_id=event_id, student_id=OuterRef('student_id'), sent_via_email=True)
+    return (EventRegistration.objects
+            .filter(event_id=event_id, event__event_type='workshop', attended=True)
+            .filter(~Exists(emailed)))
+
+
+@shared_task
 def send_certificates_for_workshop_event(event_id):
-    registrations=EventRegistration.objects.filter(event_id=event_id,attended=True)
-    for reg in registrations:
-        create_and_send_certificate(reg)
\ No newline at end of file
+    # """
+    # Split issuance into chunks handled by separate workers, then summarize
+    # once every chunk is done. Safe to run again: only students still
+    # without an emailed certificate are processed.
+    # """
+    registration_ids = list(_pending_registrations(event_id).order_by('id').values_list('id', flat=True))
+    already_issued = Certificate.objects.filter(event_id=event_id, sent_via_email=True).count()
+    CertificateIssuance.objects.update_or_create(event_id=event_id, defaults={
+        'status': 'running' if registration_ids else 'completed',
+        'total': already_issued + len(registration_ids),
+        'issued_count': already_issued,
+        'failed_count': 0,
+        'finished_at': None if registration_ids else timezone.now(),
+    })
+    if not registration_ids:
+        return {'event_id': event_id, 'total': 0}
+
+    size = getattr(settings, 'CERTIFICATE_CHUNK_SIZE', 50)
+    chunks = [registration_ids[i:i + size] for i in range(0, len(registration_ids), size)]
+    chord(group(issue_certificate_chunk.s(event_id, chunk) for chunk in chunks))(
+        summarize_certificate_issuance.s(event_id, len(registration_ids))
+    )
+    return {'event_id': event_id, 'total': len(registration_ids), 'chunks': len(chunks)}
+
+
+@shared_task(bind=True)
+def issue_certificate_chunk(self, event_id, registration_ids):
+    registrations = list(_pending_registrations(event_id).filter(id__in=registration_ids))
+    skipped = len(registration_ids) - len(registrations)
+    if not registrations:
+        return {'issued': 0, 'failed': 0, 'skipped': skipped}
+
+    # records only; the PDFs are rendered on first download unless eager rendering is on.
+    # The unique (event, student) constraint makes a repeated chunk a no-op here.
+    Certificate.objects.bulk_create([
+        Certificate(event_id=event_id, student_id=registration.student_id) for registration in registrations
+    ], ignore_conflicts=True)
+    certificates = list(Certificate.objects
+                        .filter(event_id=event_id, student_id__in=[r.student_id for r in registrations],
+                                sent_via_email=False)
+                        .select_related('event__organizer', 'student'))
+    if getattr(settings, 'CERTIFICATE_EAGER_RENDER', False):
+        render_certificate_files([c for c in certificates if not c.certificate_file])
+    emails = [certificate_email(c, c.event, c.student) for c in certificates]
+    self.update_state(state='PROGRESS', meta={'event_id': event_id, 'issued': len(certificates)})
+
+    issued, failed = 0, 0
+    notification = certificate_notification(certificates[0].event) if certificates else None
+
+    def mark_sent(start, stop):
+        # per recipient, so a failure further on does not re-send these on retry
+        nonlocal issued
+        sent = certificates[start:stop]
+        Certificate.objects.filter(id__in=[c.id for c in sent]).update(sent_via_email=True)
+        Notification.objects.bulk_create([Notification(recipient_id=c.student_id, **notification) for c in sent])
+        issued += len(sent)
+
+    try:
+        send_bulk_emails(emails, on_sent=mark_sent)
+    except Exception:
+        logger.exception("Sending certificate emails for event %s failed", event_id)
+        failed = len(emails) - issued
+
+    CertificateIssuance.objects.filter(event_id=event_id).update(
+        issued_count=F('issued_count') + issued,
+        failed_count=F('failed_count') + failed,
+        updated_at=timezone.now(),
+    )
+    return {'issued': issued, 'failed': failed, 'skipped': skipped}
+
+
+@shared_task
+def summarize_certificate_issuance(results, event_id, total):
+    issued = sum(r['issued'] for r in results)
+    failed = sum(r['failed'] for r in results)
+    skipped = sum(r['skipped'] for r in results)
+    # failed runs can be claimed again, which retries the unsent emails
+    CertificateIssuance.objects.filter(event_id=event_id).update(
+        status='failed' if failed else 'completed',
+        finished_at=timezone.now(),
+    )
+
+    event = Event.objects.select_related('organizer').filter(id=event_id).first()
+    if event is not None and event.organizer_id:
+        message = f"{issued} of {total} certificates for '{event.title}' were issued."
+        if failed:
+            message += f" {failed} download links could not be emailed; students can still find them under My Certificates."
+        create_notification(
+            recipient=event.organizer,
+            title=f"Certificates issued: {event.title}",
+            message=message,
+            notification_type='event_completed',
+            event=event,
+        )
+    logger.info("Certificates for event %s: %s issued, %s email failures, %s skipped", event_id, issued, failed, skipped)
+    return {'event_id': event_id, 'total': total, 'issued': issued, 'failed': failed, 'skipped': skipped}
@@ -1,3 +1,140 @@
-from django.test import TestCase
+import tempfile
+import time
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from events.models import Event
+from users.models import User
+from .links import make_download_token
+from .models import Certificate
+from .verification import verification_payload
+
+
+class CertificateDownloadLinkTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(username='dept5', email='dept5@x.com', phone_number='d5',
+                                        role='Department', department='it')
+        cls.student = User.objects.create(username='stud5', email='stud5@x.com', phone_number='s5',
+                                          role='Student', first_name='Ada', last_name='Lovelace')
+        cls.other = User.objects.create(username='stud6', email='stud6@x.com', phone_number='s6', role='Student')
+        cls.admin = User.objects.create(username='admin5', email='admin5@x.com', phone_number='a5', role='Admin')
+        now = timezone.now()
+        event = Event.objects.create(
+            title='Workshop', description='-', event_level='college', event_type='workshop',
+            start_date=now - timedelta(days=3), end_date=now - timedelta(days=2), venue='Hall',
+            organizer=organizer, registration_deadline=now - timedelta(days=4), status='approved',
+            qr_code_data='token',
+        )
+        cls.certificate = Certificate.objects.create(event=event, student=cls.student)
+
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name, CERTIFICATE_SENDFILE_BACKEND='')
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+        self.client = APIClient()
+
+    def url(self, token=None):
+        return reverse('certificate-download', args=[token or make_download_token(self.certificate)])
+
+    def test_valid_link_serves_pdf(self):
+        response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        self.assertIn('attachment', response['Content-Disposition'])
+
+    def test_expired_link(self):
+        with mock.patch('django.core.signing.time.time', return_value=time.time() - 3 * 24 * 60 * 60):
+            token = make_download_token(self.certificate)
+        with override_settings(CERTIFICATE_LINK_MAX_AGE=2 * 24 * 60 * 60):
+            self.assertEqual(self.client.get(self.url(token)).status_code, 403)
+
+    def test_tampered_link(self):
+        token = make_download_token(self.certificate)
+        forged = f"{self.certificate.pk + 1}:{token.split(':', 1)[1]}"
+        self.assertEqual(self.client.get(self.url(forged)).status_code, 403)
+        self.assertEqual(self.client.get(self.url(token[:-1] + ('A' if token[-1] != 'A' else 'B'))).status_code, 403)
+
+    def test_signed_in_user_must_own_certificate(self):
+        self.client.force_authenticate(self.other)
+        self.assertEqual(self.client.get(self.url()).status_code, 403)
+        for user in (self.student, self.admin):
+            self.client.force_authenticate(user)
+            self.assertEqual(self.client.get(self.url()).status_code, 200)
+
+    def test_web_server_sends_file(self):
+        with override_settings(CERTIFICATE_SENDFILE_BACKEND='nginx', CERTIFICATE_SENDFILE_PREFIX='/protected/'):
+            response = self.client.get(self.url())
+        self.assertEqual(response.status_code, 200)
+        self.certificate.refresh_from_db()
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/' + self.certificate.certificate_file.name)
+        self.assertEqual(response.content, b'')
+
+        with override_settings(CERTIFICATE_SENDFILE_BACKEND='apache'):
+            response = self.client.get(self.url())
+        self.assertEqual(response['X-Sendfile'], self.certificate.certificate_file.path)
+        self.assertIn('certificate_event_', response['Content-Disposition'])
+
+
+class CertificateVerificationCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(username='dept6', email='dept6@x.com', phone_number='d6',
+                                            role='Department', department='it')
+        cls.student = User.objects.create(username='stud7', email='stud7@x.com', phone_number='s7',
+                                          role='Student', first_name='Ada', last_name='Lovelace')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Workshop', description='-', event_level='college', event_type='workshop',
+            start_date=now - timedelta(days=3), end_date=now - timedelta(days=2), venue='Hall',
+            organizer=cls.organizer, registration_deadline=now - timedelta(days=4), status='approved',
+            qr_code_data='token',
+        )
+        cls.certificate = Certificate.objects.create(event=cls.event, student=cls.student)
+
+    def setUp(self):
+        cache.clear()
+        self.code = self.certificate.verification_code
+
+    def test_cached(self):
+        verification_payload(self.code)
+        with self.assertNumQueries(0):
+            self.assertEqual(verification_payload(self.code)['student_name'], 'Ada Lovelace')
+
+    def test_student_and_organizer_rename(self):
+        verification_payload(self.code)
+        self.student.first_name = 'Grace'
+        self.student.save()
+        self.assertEqual(verification_payload(self.code)['student_name'], 'Grace Lovelace')
+        self.organizer.username = 'dept6-renamed'
+        self.organizer.save(update_fields=['username'])
+        self.assertEqual(verification_payload(self.code)['organizer'], 'dept6-renamed')
+
+    def test_login_keeps_cache(self):
+        verification_payload(self.code)
+        self.student.last_login = timezone.now()
+        self.student.save(update_fields=['last_login'])
+        with self.assertNumQueries(0):
+            verification_payload(self.code)
+
+    def test_event_rename(self):
+        verification_payload(self.code)
+        self.event.title = 'Advanced Workshop'
+        self.event.save()
+        self.assertEqual(verification_payload(self.code)['event_title'], 'Advanced Workshop')
+
+    def test_certificate_save_and_delete(self):
+        self.assertIsNone(verification_payload('ZZZZZZZZZZ'))
+        other = User.objects.create(username='stud8', email='stud8@x.com', phone_number='s8', role='Student')
+        Certificate.objects.create(event=self.event, student=other, verification_code='ZZZZZZZZZZ')
+        self.assertEqual(verification_payload('zzzzz-zzzzz')['student_name'], 'stud8')
+        self.certificate.delete()
+        self.assertIsNone(verification_payload(self.code))
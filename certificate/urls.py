@@ -1,6 +1,18 @@
 from django.urls import path
-from .views import StudentCertificateListView
+from .views import (
+    StudentCertificateListView,
+    certificate_download,
+    certificate_issuance_progress,
+    download_certificate,
+    event_certificates_zip,
+    verify_certificate,
+)
 
 urlpatterns = [
     path('my-certificates/', StudentCertificateListView.as_view(), name='student-certificates'),
+    path('<int:pk>/download/', certificate_download, name='certificate-file'),
+    path('download/<str:token>/', download_certificate, name='certificate-download'),
+    path('progress/<int:event_id>/', certificate_issuance_progress, name='certificate-progress'),
+    path('event/<int:event_id>/zip/', event_certificates_zip, name='certificate-zip'),
+    path('verify/<str:code>/', verify_certificate, name='certificate-verify'),
 ]
\ No newline at end of file
@@ -124,18 +124,41 @@
 #     return certificate
 
 
+import hashlib
 import io
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date
+from functools import lru_cache
+from django.conf import settings
+from django.core.cache import cache
 from django.core.files.base import ContentFile
 from django.core.mail import EmailMessage
+from django.utils import timezone
+from reportlab import rl_config
 from reportlab.lib.pagesizes import landscape, A4
 from reportlab.pdfgen import canvas
 from reportlab.lib.units import cm
 from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.platypus import Paragraph, Frame
 from notifications.utils import create_notification
 from reportlab.lib.units import cm, mm
+from eventify.parallel import init_django_worker
+from events.qr import write_atomic
+from .links import download_url, link_max_age, verify_url
+
+logger = logging.getLogger(__name__)
+
+RENDER_LOCK_TIMEOUT = 30
+
+# Write page streams as plain deflate instead of ASCII85-wrapped deflate:
+# about 10% smaller PDFs, and the pure-Python ASCII85 encoder was a large
+# share of the render time. reportlab is only used for certificates.
+rl_config.useA85 = 0
 
 NAVY = colors.HexColor("#0b2a3a")
 GOLD = colors.HexColor("#f4c542")
@@ -163,15 +186,21 @@ def _draw_corner_stripes(c, x, y, w=110*mm, h=14*mm, angle=45):
     c.restoreState()
 
 
-def generate_certificate_pdf(student_name, event_title, event_date, organizer_name):
-    """
-    Improved visual design; if student_name is falsy we draw two blank lines
-    so the recipient can hand-write First/Last name.
-    """
-    buffer = io.BytesIO()
-    width, height = landscape(A4)
-    c = canvas.Canvas(buffer, pagesize=(width, height))
+# Bump when the layout below changes; stored files and the cached description are keyed by it.
+TEMPLATE_VERSION = 1
+
+DESCRIPTION_STYLE = ParagraphStyle(
+    "CertificateDescription",
+    fontName="Helvetica",
+    fontSize=13,
+    leading=18,
+    textColor=MUTED,
+    alignment=1,  # center
+)
 
+
+def _draw_static_layout(c, width, height):
+    """Everything that is identical on every certificate."""
     # --- background ---
     c.setFillColorRGB(0.99, 0.99, 0.995)  # very light background
     c.rect(0, 0, width, height, fill=1, stroke=0)
@@ -182,8 +211,6 @@ def generate_certificate_pdf(student_name, event_title, event_date, organizer_na
     c.rect(1.1 * cm, 1.1 * cm, width - 2.2 * cm, height - 2.2 * cm, stroke=1, fill=0)
 
     # --- decorative corner stripes (top-right and bottom-left) ---
-    # dimensions in mm helper
-    from reportlab.lib.units import mm
     _draw_corner_stripes(c, width - 120*mm, height - 24*mm, w=110*mm, h=14*mm, angle=0)  # top-right
     c.saveState()
     c.translate(10*mm, 10*mm)
@@ -217,9 +244,67 @@ def generate_certificate_pdf(student_name, event_title, event_date, organizer_na
     c.setFont("Helvetica", 14)
     c.drawCentredString(width / 2, height - 7.0 * cm, "This certificate is proudly presented to")
 
+    # --- divider line ---
+    c.setFillColor(BORDER)
+    c.rect((width - 140*mm) / 2, height - 15.2*cm, 140*mm, 1.6, stroke=0, fill=1)
+
+    # --- footer lines: date (left) & signature (right) ---
+    left_x = 5 * cm
+    c.line(left_x, 3.2 * cm, left_x + 6 * cm, 3.2 * cm)
+    right_x = width - (11 * cm)
+    c.line(right_x, 3.2 * cm, right_x + 6 * cm, 3.2 * cm)
+    c.setFillColor(MUTED)
+    c.setFont("Helvetica", 12)
+    c.drawString(right_x, 2.4 * cm, "Signature")
+
+
+def _description(event_title, event_date):
+    text = (
+        f"This is to certify that the above named participant has successfully "
+        f"completed the workshop <b>{event_title}</b> held on "
+        f"{event_date.strftime('%B %d, %Y')}."
+    )
+    return Paragraph(text, DESCRIPTION_STYLE)
+
+
+@lru_cache(maxsize=64)
+def _wrapped_description(version, width, height, event_title, event_date):
+    """
+    The description paragraph, line-broken once per event (the slowest part of
+    drawing a certificate) and placed where the Frame below would put it.
+    None if it does not fit, so the Frame handles it as before.
+    """
+    padding = 6  # Frame's default padding
+    frame_w, frame_h = width - 6 * cm, 3.5 * cm
+    paragraph = _description(event_title, event_date)
+    _, h = paragraph.wrap(frame_w - 2 * padding, frame_h - 2 * padding)
+    if h > frame_h - 2 * padding:
+        return None
+    return paragraph, 3 * cm + padding, height - 13.5 * cm + frame_h - padding - h
+
+
+def _draw_event_text(c, width, height, event_title, event_date, organizer_name, cached=False):
+    """Text shared by every certificate of one event."""
+    # --- description paragraph (center) ---
+    wrapped = _wrapped_description(TEMPLATE_VERSION, width, height, event_title, event_date) if cached else None
+    if wrapped:
+        paragraph, x, y = wrapped
+        paragraph.drawOn(c, x, y)
+    else:
+        frame = Frame(3 * cm, height - 13.5 * cm, width - 6 * cm, 3.5 * cm, showBoundary=0)
+        frame.addFromList([_description(event_title, event_date)], c)
+
+    # organizer name above left line (optional)
+    if organizer_name:
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica", 12)
+        c.drawString(5 * cm, 3.6 * cm, organizer_name)
+
+
+def _stamp_student_text(c, width, height, student_name, issued_on=None, verification_code=None, verify_url=None):
+    """Per-student text drawn on top of the cached template."""
     # --- name or blank lines ---
     name_y = height - 9.5 * cm
-    c.setFillColor(colors.black)
     if student_name:  # print the name, styled like gold
         c.setFillColor(GOLD)
         c.setFont("Helvetica-Bold", 28)
@@ -241,49 +326,47 @@ def generate_certificate_pdf(student_name, event_title, event_date, organizer_na
         c.drawCentredString(cx - gap/2 - line_w/2, y - 12, "First Name")
         c.drawCentredString(cx + gap/2 + line_w/2, y - 12, "Last Name")
 
-    # --- description paragraph (center) ---
-    styles = getSampleStyleSheet()
-    style = styles["Normal"]
-    style.fontName = "Helvetica"
-    style.fontSize = 13
-    style.leading = 18
-    style.textColor = MUTED
-    style.alignment = 1  # center
-    text = (
-        f"This is to certify that the above named participant has successfully "
-        f"completed the workshop <b>{event_title}</b> held on "
-        f"{event_date.strftime('%B %d, %Y')}."
-    )
-    frame = Frame(3 * cm, height - 13.5 * cm, width - 6 * cm, 3.5 * cm, showBoundary=0)
-    Paragraph(text, style).wrapOn(c, frame._width, frame._height)
-    frame.addFromList([Paragraph(text, style)], c)
+    # --- issue date under the left line ---
+    c.setFillColor(MUTED)
+    c.setFont("Helvetica", 12)
+    c.drawString(5 * cm, 2.4 * cm, f"Date: {(issued_on or date.today()).strftime('%B %d, %Y')}")
 
-    # --- divider line ---
-    c.setFillColor(BORDER)
-    c.rect((width - 140*mm) / 2, height - 15.2*cm, 140*mm, 1.6, stroke=0, fill=1)
+    # --- verification code (bottom center) ---
+    if verification_code:
+        line = f"Certificate ID {verification_code}"
+        if verify_url:
+            line += f"  ·  verify at {verify_url}"
+        c.setFont("Helvetica", 9)
+        c.drawCentredString(width / 2, 1.6 * cm, line)
 
-    # --- footer: date & signature ---
-    c.setFillColor(colors.black)
-    c.setFont("Helvetica", 12)
 
-    # left block (date)
-    left_x = 5 * cm
-    c.line(left_x, 3.2 * cm, left_x + 6 * cm, 3.2 * cm)
-    c.setFillColor(MUTED)
-    c.drawString(left_x, 2.4 * cm, f"Date: {date.today().strftime('%B %d, %Y')}")
+def generate_certificate_pdf(student_name, event_title, event_date, organizer_name, issued_on=None,
+                             verification_code=None, verify_url=None, stamped=True):
+    """
+    Improved visual design; if student_name is falsy we draw two blank lines
+    so the recipient can hand-write First/Last name.
 
-    # right block (signature)
-    right_x = width - (11 * cm)
-    c.setFillColor(colors.black)
-    c.line(right_x, 3.2 * cm, right_x + 6 * cm, 3.2 * cm)
-    c.setFillColor(MUTED)
-    c.drawString(right_x, 2.4 * cm, "Signature")
+    The layout and the event's text go into a form XObject that the page
+    then draws, so the student's text is stamped on top of it from a clean
+    graphics state. The event's description is line-broken once per event
+    (and TEMPLATE_VERSION). stamped=False draws everything straight onto the
+    page (used by the benchmark).
+    """
+    buffer = io.BytesIO()
+    width, height = landscape(A4)
+    c = canvas.Canvas(buffer, pagesize=(width, height))
 
-    # organizer name above left line (optional)
-    if organizer_name:
-        c.setFillColor(colors.black)
-        c.setFont("Helvetica", 12)
-        c.drawString(left_x, 3.6 * cm, organizer_name)
+    if stamped:
+        c.beginForm("layout")
+        _draw_static_layout(c, width, height)
+        _draw_event_text(c, width, height, event_title, event_date, organizer_name, cached=True)
+        c.endForm()
+        c.doForm("layout")
+    else:
+        _draw_static_layout(c, width, height)
+        _draw_event_text(c, width, height, event_title, event_date, organizer_name)
+
+    _stamp_student_text(c, width, height, student_name, issued_on, verification_code, verify_url)
 
     c.showPage()
     c.save()
@@ -292,21 +375,14 @@ def generate_certificate_pdf(student_name, event_title, event_date, organizer_na
     return pdf
 
 
-def create_and_send_certificate(event_registration):
+def certificate_pdf_args(certificate):
     """
-    Generate PDF certificate, save it, email to student, and create a notification.
-    Only for workshop events and students who actually attended.
+    Plain (picklable) arguments for generate_certificate_pdf, so rendering can run
+    in another process. The name is None when first/last name are missing; the
+    date printed is the day the certificate was issued.
     """
-    student = event_registration.student
-    event = event_registration.event
-
-    if event.event_type != 'workshop' or not event_registration.attended:
-        return None
-
-    from .models import Certificate
-    certificate, created = Certificate.objects.get_or_create(event=event, student=student)
-    if not created:
-        return certificate  # already issued
+    student = certificate.student
+    event = certificate.event
 
     # build display name; leave blank if first/last missing
     first = (getattr(student, "first_name", "") or "").strip()
@@ -319,45 +395,186 @@ def create_and_send_certificate(event_registration):
     if getattr(event, "organizer", None):
         organizer_name = getattr(event.organizer, "get_full_name", lambda: "")() or getattr(event.organizer, "username", "")
 
-    pdf_content = generate_certificate_pdf(
+    issued_at = getattr(certificate, "issued_at", None)
+    return (
         display_name,
         event.title,
         getattr(event, "start_date", date.today()),
-        organizer_name or ""
+        organizer_name or "",
+        timezone.localdate(issued_at) if issued_at else date.today(),
+        certificate.display_code,
+        verify_url(certificate),
     )
 
-    filename = f"certificate_event_{event.id}_{getattr(student, 'username', 'student')}.pdf"
-    certificate.certificate_file.save(filename, ContentFile(pdf_content))
-    certificate.save()
 
-    # Email sending
+def certificate_content_name(pdf_args):
+    """Storage name derived from everything printed on the certificate."""
+    digest = hashlib.sha256(repr((TEMPLATE_VERSION,) + tuple(pdf_args)).encode()).hexdigest()
+    return f"certificates/{digest[:2]}/{digest}.pdf"
+
+
+def store_certificate_pdf(storage, name, content):
+    """
+    Store a rendered PDF under its content name so it only becomes visible once
+    complete: local storage writes a temp file and renames it into place. Other
+    storages go through save(); if a concurrent save already took the name, the
+    suffixed copy it made instead is deleted (the content is identical).
+    """
+    try:
+        path = storage.path(name)
+    except NotImplementedError:
+        saved = storage.save(name, ContentFile(content))
+        if saved != name:
+            storage.delete(saved)
+        return name
+    write_atomic(path, content)
+    # mkstemp files are 0600; give them the mode storage.save() would have
+    mode = getattr(storage, 'file_permissions_mode', None)
+    if mode is not None:
+        os.chmod(path, mode)
+    return name
+
+
+def ensure_certificate_file(certificate):
+    """
+    Render a certificate's PDF on first use. Files are stored under a
+    content-addressed name, so a render only happens when no identical PDF
+    exists yet; a cache lock keeps concurrent downloads from rendering the
+    same certificate twice.
+    """
+    field = certificate.certificate_file
+    if field and field.storage.exists(field.name):
+        return certificate
+
+    pdf_args = certificate_pdf_args(certificate)
+    name = certificate_content_name(pdf_args)
+    storage = field.storage
+    if not storage.exists(name):
+        lock = f"certificate:render:{name}"
+        if cache.add(lock, 1, timeout=RENDER_LOCK_TIMEOUT):
+            try:
+                if not storage.exists(name):
+                    store_certificate_pdf(storage, name, generate_certificate_pdf(*pdf_args))
+            finally:
+                cache.delete(lock)
+        else:
+            # another request is rendering it; wait for the file
+            deadline = time.monotonic() + RENDER_LOCK_TIMEOUT
+            while not storage.exists(name) and time.monotonic() < deadline:
+                time.sleep(0.1)
+            if not storage.exists(name):
+                store_certificate_pdf(storage, name, generate_certificate_pdf(*pdf_args))
+
+    type(certificate).objects.filter(pk=certificate.pk).update(certificate_file=name)
+    field.name = name
+    return certificate
+
+
+def render_certificate_files(certificates):
+    """Render files for many saved certificates at once (CERTIFICATE_EAGER_RENDER)."""
+    if not certificates:
+        return
+    storage = certificates[0].certificate_file.storage
+    pending = {}
+    for certificate in certificates:
+        pdf_args = certificate_pdf_args(certificate)
+        certificate.certificate_file.name = certificate_content_name(pdf_args)
+        pending.setdefault(certificate.certificate_file.name, pdf_args)
+
+    missing = [(name, pdf_args) for name, pdf_args in pending.items() if not storage.exists(name)]
+    pdfs = render_certificates(pdf_args for _, pdf_args in missing)
+    for (name, _), pdf_content in zip(missing, pdfs):
+        if not storage.exists(name):
+            store_certificate_pdf(storage, name, pdf_content)
+
+    type(certificates[0]).objects.bulk_update(certificates, ['certificate_file'])
+
+def certificate_filename(event, student):
+    return f"certificate_event_{event.id}_{getattr(student, 'username', 'student')}.pdf"
+
+
+def certificate_email(certificate, event, student):
+    """Completion email with a signed download link (not sent)."""
+    hours = max(1, link_max_age() // (60 * 60))
+    validity = f"{hours // 24} days" if hours >= 48 else f"{hours} hours"
+
     email_subject = f"Your Workshop Completion Certificate: {event.title}"
     email_body = (
         f"Dear {getattr(student, 'username', 'Student')},\n\n"
         f"Congratulations on successfully completing the workshop '{event.title}'. "
-        f"Your certificate is attached.\n\n"
+        f"Download your certificate here (the link is valid for {validity}):\n"
+        f"{download_url(certificate)}\n\n"
+        f"You can always find it later under My Certificates in Eventify.\n\n"
         f"If your name area is blank, please print and hand-write your First and Last name.\n\n"
         f"Best regards,\nEventify Team"
     )
 
-    email = EmailMessage(
+    return EmailMessage(
         subject=email_subject,
         body=email_body,
         to=[getattr(student, "email", None)],
     )
-    email.attach(filename, pdf_content, 'application/pdf')
-    email.send()
 
-    certificate.sent_via_email = True
-    certificate.save()
 
-    # Notification
-    create_notification(
-        recipient=student,
+def certificate_notification(event):
+    return dict(
         title=f"Certificate Issued: {event.title}",
-        message=f"Your certificate for the workshop '{event.title}' has been issued and emailed to you.",
+        message=f"Your certificate for the workshop '{event.title}' has been issued. A download link was emailed to you.",
         notification_type='event_completed',
-        event=event
+        event=event,
     )
 
-    return certificate
\ No newline at end of file
+
+def render_certificates(pdf_args, processes=None):
+    """
+    Render many certificates, spread over a process pool (reportlab is pure
+    Python and CPU-bound). Returns PDF bytes in the order of pdf_args.
+    """
+    pdf_args = list(pdf_args)
+    processes = processes or getattr(settings, 'CERTIFICATE_RENDER_PROCESSES', None) or os.cpu_count() or 1
+    processes = min(processes, len(pdf_args))
+    if processes > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=processes, initializer=init_django_worker) as pool:
+                return list(pool.map(_render_args, pdf_args))
+        except (AssertionError, OSError, BrokenProcessPool):
+            # e.g. daemonic Celery workers may not fork children
+            logger.warning("Certificate render pool unavailable; rendering inline", exc_info=True)
+    return [generate_certificate_pdf(*args) for args in pdf_args]
+
+
+def _render_args(args):
+    return generate_certificate_pdf(*args)
+
+
+def create_and_send_certificate(event_registration):
+    """
+    Issue a certificate, email the student a download link and create a
+    notification. The PDF itself is rendered on first download unless
+    CERTIFICATE_EAGER_RENDER is set.
+    Only for workshop events and students who actually attended.
+    """
+    student = event_registration.student
+    event = event_registration.event
+
+    if event.event_type != 'workshop' or not event_registration.attended:
+        return None
+
+    from .models import Certificate
+    certificate, created = Certificate.objects.get_or_create(event=event, student=student)
+    if not created:
+        return certificate  # already issued
+
+    if getattr(settings, 'CERTIFICATE_EAGER_RENDER', False):
+        ensure_certificate_file(certificate)
+
+    # Email sending
+    certificate_email(certificate, event, student).send()
+
+    certificate.sent_via_email = True
+    certificate.save(update_fields=['sent_via_email'])
+
+    # Notification
+    create_notification(recipient=student, **certificate_notification(event))
+
+    return certificate
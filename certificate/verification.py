@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Certificate, normalize_verification_code
+
+# Public certificate verification: one indexed lookup by verification_code,
+# with the answer (found or not) cached so repeated and crawler traffic is
+# served from the cache without touching the database or the PDF files.
+# certificate/signals.py drops cached answers when a certificate, its event,
+# its student or the organizer is saved with a field shown here, or deleted.
+
+NOT_FOUND = "missing"
+
+
+def _cache_key(code):
+    return f"certificate:verify:{code}"
+
+
+def verification_payload(code):
+    """Public details of the certificate with this code, or None."""
+    code = normalize_verification_code(code)
+    if not code:
+        return None
+    key = _cache_key(code)
+    payload = cache.get(key)
+    if payload is None:
+        payload = _build_payload(code)
+        if payload is None:
+            cache.set(key, NOT_FOUND, getattr(settings, 'CERTIFICATE_VERIFY_MISS_TTL', 5 * 60))
+        else:
+            cache.set(key, payload, getattr(settings, 'CERTIFICATE_VERIFY_CACHE_TTL', 24 * 60 * 60))
+    return None if payload == NOT_FOUND else payload
+
+
+def _build_payload(code):
+    row = (Certificate.objects
+           .filter(verification_code=code)
+           .values('verification_code', 'issued_at',
+                   'student__first_name', 'student__last_name', 'student__username',
+                   'event__title', 'event__event_type', 'event__start_date',
+                   'event__organizer__first_name', 'event__organizer__last_name',
+                   'event__organizer__username')
+           .first())
+    if row is None:
+        return None
+    student = (f"{row['student__first_name'] or ''} {row['student__last_name'] or ''}".strip()
+               or row['student__username'])
+    organizer = (f"{row['event__organizer__first_name'] or ''} {row['event__organizer__last_name'] or ''}".strip()
+                 or row['event__organizer__username'])
+    return {
+        'valid': True,
+        'certificate_id': f"{row['verification_code'][:5]}-{row['verification_code'][5:]}",
+        'student_name': student,
+        'event_title': row['event__title'],
+        'event_type': row['event__event_type'],
+        'event_date': timezone.localdate(row['event__start_date']).isoformat() if row['event__start_date'] else None,
+        'organizer': organizer,
+        'issued_on': timezone.localdate(row['issued_at']).isoformat(),
+    }
+
+
+def invalidate_verification(code):
+    cache.delete(_cache_key(normalize_verification_code(code)))
+
+
+def invalidate_verifications(certificates):
+    """Drop the cached answers for every certificate in a queryset."""
+    codes = certificates.values_list('verification_code', flat=True)
+    cache.delete_many([_cache_key(code) for code in codes])
@@ -1,10 +1,100 @@
-from django.shortcuts import render
-from rest_framework import generics, permissions
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.utils.cache import patch_cache_control
+from rest_framework import generics, permissions, status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes, throttle_classes
+from rest_framework.response import Response
+from rest_framework.throttling import AnonRateThrottle
+from events.models import Event
 from.serializers import CertificateSerializer
+from .export import stream_event_certificates
+from .links import read_download_token, serve_file
 from .models import Certificate
+from .tasks import issuance_progress
+from .utils import certificate_filename, ensure_certificate_file
+from .verification import verification_payload
 class StudentCertificateListView(generics.ListAPIView):
     serializer_class = CertificateSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
-        return Certificate.objects.filter(student=self.request.user)
+        return Certificate.objects.filter(student=self.request.user).select_related('event', 'student')
+
+
+def _serve_certificate(certificate):
+    # rendered on first download, then served from storage
+    ensure_certificate_file(certificate)
+    return serve_file(certificate.certificate_file, certificate_filename(certificate.event, certificate.student))
+
+
+@api_view(['GET'])
+@permission_classes([permissions.AllowAny])
+def download_certificate(request, token):
+    # signed link from the certificate email; the token names both the
+    # certificate and the student it was issued to. It is a bearer link
+    # (see certificate/links.py): anonymous requests holding a valid token are
+    # served, but a signed-in user other than that student (or an admin) is not.
+    ids = read_download_token(token)
+    if ids is None:
+        return Response({'error': 'This download link is invalid or has expired'}, status=status.HTTP_403_FORBIDDEN)
+    certificate_id, student_id = ids
+    user = request.user
+    if user.is_authenticated and user.id != student_id and not user.is_admin_user():
+        return Response({'error': 'You can only download your own certificates'}, status=status.HTTP_403_FORBIDDEN)
+    certificate = get_object_or_404(Certificate.objects.select_related('event__organizer', 'student'),
+                                    id=certificate_id, student_id=student_id)
+    return _serve_certificate(certificate)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def certificate_download(request, pk):
+    certificate = get_object_or_404(Certificate.objects.select_related('event__organizer', 'student'), id=pk)
+    if certificate.student_id != request.user.id and not request.user.is_admin_user():
+        return Response({'error': 'You can only download your own certificates'}, status=status.HTTP_403_FORBIDDEN)
+    return _serve_certificate(certificate)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def certificate_issuance_progress(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    if event.organizer_id != request.user.id and not request.user.is_admin_user():
+        return Response({'error': 'Only the organizer can view certificate progress'}, status=status.HTTP_403_FORBIDDEN)
+    progress = issuance_progress(event_id)
+    if progress is None:
+        return Response({'error': 'No certificate issuance has run for this event'}, status=status.HTTP_404_NOT_FOUND)
+    return Response({'event_id': event_id, **progress})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def event_certificates_zip(request, event_id):
+    event = get_object_or_404(Event, id=event_id)
+    if event.organizer_id != request.user.id and not request.user.is_admin_user():
+        return Response({'error': 'Only the organizer can export certificates'}, status=status.HTTP_403_FORBIDDEN)
+    if not Certificate.objects.filter(event_id=event_id).exists():
+        return Response({'error': 'No certificates have been issued for this event'}, status=status.HTTP_404_NOT_FOUND)
+    response = StreamingHttpResponse(stream_event_certificates(event_id), content_type='application/zip')
+    response['Content-Disposition'] = f'attachment; filename="certificates_event_{event_id}.zip"'
+    return response
+
+
+class CertificateVerifyThrottle(AnonRateThrottle):
+    # per client IP; rate from REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']
+    scope = 'certificate_verify'
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+@throttle_classes([CertificateVerifyThrottle])
+def verify_certificate(request, code):
+    payload = verification_payload(code)
+    if payload is None:
+        response = Response({'valid': False, 'error': 'No certificate with this ID'}, status=status.HTTP_404_NOT_FOUND)
+    else:
+        response = Response(payload)
+    patch_cache_control(response, public=True, max_age=getattr(settings, 'CERTIFICATE_VERIFY_MAX_AGE', 300))
+    return response
@@ -0,0 +1,9 @@
+import os
+
+
+def init_django_worker():
+    # ProcessPoolExecutor initializer: spawned workers (Windows/macOS) start
+    # without Django configured; under fork this is a cheap no-op.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'eventify.settings')
+    import django
+    django.setup()
@@ -84,6 +84,84 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD", "")
 DOMAIN = os.getenv("DOMAIN", "192.168.1.81:8000")
 EMAIL_RESET_DOMAIN = DOMAIN
 SITE_DOMAIN = os.getenv("SITE_DOMAIN", "192.168.1.81:8000")
+# used by provision_student_accounts for roster rows without an email
+STUDENT_EMAIL_DOMAIN = os.getenv("STUDENT_EMAIL_DOMAIN", "")
+
+# Rotating attendance QR tokens (events/qr_tokens.py)
+ATTENDANCE_QR_ROTATE_SECONDS = int(os.getenv("ATTENDANCE_QR_ROTATE_SECONDS", "30"))
+ATTENDANCE_QR_GRACE_SECONDS = int(os.getenv("ATTENDANCE_QR_GRACE_SECONDS", "120"))
+# static qr_code_data links can be replayed from a photo; only set True while
+# moving existing events over to the rotating code
+ATTENDANCE_ALLOW_STATIC_QR = os.getenv("ATTENDANCE_ALLOW_STATIC_QR", "False") == "True"
+
+# Write-behind attendance buffer (events/attendance.py): check-ins go to an
+# append-only log that a background thread flushes to the DB in batches.
+# Off by default: the log directory must be local, persistent storage.
+ATTENDANCE_WRITE_BEHIND = os.getenv("ATTENDANCE_WRITE_BEHIND", "False") == "True"
+ATTENDANCE_FLUSH_INTERVAL = float(os.getenv("ATTENDANCE_FLUSH_INTERVAL", "2"))
+ATTENDANCE_LOG_DIR = os.getenv("ATTENDANCE_LOG_DIR", str(BASE_DIR / "var" / "attendance"))
+ATTENDANCE_LOG_FSYNC = os.getenv("ATTENDANCE_LOG_FSYNC", "False") == "True"
+
+# On-demand attendance QR images (events/qr.py)
+QR_MEMORY_CACHE_SIZE = 256
+QR_DISK_CACHE_MAX_FILES = 1000
+
+# Certificate issuance (certificate/tasks.py): registrations per Celery chunk,
+# and render processes for batch rendering (eager issuance and the ZIP export;
+# unset = all cores)
+CERTIFICATE_CHUNK_SIZE = int(os.getenv("CERTIFICATE_CHUNK_SIZE", "50"))
+CERTIFICATE_RENDER_PROCESSES = int(os.getenv("CERTIFICATE_RENDER_PROCESSES", "0")) or None
+# False: issuance only creates the records and each PDF is rendered on first download
+CERTIFICATE_EAGER_RENDER = os.getenv("CERTIFICATE_EAGER_RENDER", "False") == "True"
+# a "running" issuance with no progress for this long may be claimed and resumed
+CERTIFICATE_ISSUANCE_STALE_SECONDS = int(os.getenv("CERTIFICATE_ISSUANCE_STALE_SECONDS", str(60 * 60)))
+
+# Certificate downloads (certificate/links.py): signed links are bearer links
+# and expire after CERTIFICATE_LINK_MAX_AGE seconds. Set CERTIFICATE_SENDFILE_BACKEND to "nginx"
+# (X-Accel-Redirect to an internal location at CERTIFICATE_SENDFILE_PREFIX that
+# maps to MEDIA_ROOT) or "apache" (mod_xsendfile) to let the web server send files.
+CERTIFICATE_LINK_MAX_AGE = int(os.getenv("CERTIFICATE_LINK_MAX_AGE", str(2 * 24 * 60 * 60)))
+CERTIFICATE_SENDFILE_BACKEND = os.getenv("CERTIFICATE_SENDFILE_BACKEND", "")
+CERTIFICATE_SENDFILE_PREFIX = os.getenv("CERTIFICATE_SENDFILE_PREFIX", "/protected/")
+
+# Public verification endpoint (certificate/verification.py): server-side cache
+# TTLs for found / unknown codes, and the Cache-Control max-age sent to clients
+CERTIFICATE_VERIFY_CACHE_TTL = int(os.getenv("CERTIFICATE_VERIFY_CACHE_TTL", str(24 * 60 * 60)))
+CERTIFICATE_VERIFY_MISS_TTL = int(os.getenv("CERTIFICATE_VERIFY_MISS_TTL", str(5 * 60)))
+CERTIFICATE_VERIFY_MAX_AGE = int(os.getenv("CERTIFICATE_VERIFY_MAX_AGE", "300"))
+
+# Seconds a dashboard_stats payload is cached (users/stats.py); writes through
+# the ORM invalidate it earlier
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv("DASHBOARD_STATS_CACHE_TTL", "60"))
+
+# Days before the last rolled-up day that the nightly rollup recomputes, to
+# pick up check-ins replayed late with their original scan time
+EVENT_ROLLUP_LOOKBACK_DAYS = int(os.getenv("EVENT_ROLLUP_LOOKBACK_DAYS", "3"))
+
+# Seconds the feedback rating analytics (events/feedback_analytics.py) are cached
+FEEDBACK_ANALYTICS_CACHE_TTL = int(os.getenv("FEEDBACK_ANALYTICS_CACHE_TTL", str(10 * 60)))
+
+# Seconds a student's interest-based recommendations are cached; index changes
+# and the student's registrations invalidate them earlier
+RECOMMENDATIONS_CACHE_TTL = int(os.getenv("RECOMMENDATIONS_CACHE_TTL", str(10 * 60)))
+
+# Co-attendance similarities (events/coattendance.py): similar events kept per
+# event, and the fewest shared attendees for a pair to count
+EVENT_SIMILARITY_TOP_K = int(os.getenv("EVENT_SIMILARITY_TOP_K", "20"))
+EVENT_SIMILARITY_MIN_CO_ATTENDEES = int(os.getenv("EVENT_SIMILARITY_MIN_CO_ATTENDEES", "2"))
+
+# iCalendar feed (events/calendar.py): window of events it covers, in days
+# before and after today, and how long calendar apps may cache it
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", "30"))
+CALENDAR_FEED_DAYS = int(os.getenv("CALENDAR_FEED_DAYS", "180"))
+CALENDAR_FEED_MAX_AGE = int(os.getenv("CALENDAR_FEED_MAX_AGE", "900"))
+
+# API token lookups (users/authentication.py): per-process LRU size and
+# lifetime, shared cache lifetime, and token expiry (0 = never expire)
+TOKEN_AUTH_LRU_SIZE = int(os.getenv("TOKEN_AUTH_LRU_SIZE", "1024"))
+TOKEN_AUTH_LOCAL_TTL = int(os.getenv("TOKEN_AUTH_LOCAL_TTL", "10"))
+TOKEN_AUTH_CACHE_TTL = int(os.getenv("TOKEN_AUTH_CACHE_TTL", "300"))
+TOKEN_EXPIRE_SECONDS = int(os.getenv("TOKEN_EXPIRE_SECONDS", "0"))
 WSGI_APPLICATION = 'eventify.wsgi.application'
 
 
@@ -144,9 +222,12 @@ MEDIA_ROOT= os.path.join(BASE_DIR, 'media')
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',  # Add this
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'certificate_verify': os.getenv("CERTIFICATE_VERIFY_RATE", "60/minute"),
+    },
 }
 
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
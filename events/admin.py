@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Event, EventRegistration, EventFeedback, EventConflict
+from .models import Event, EventRegistration, EventFeedback, EventConflict, EventStats, DailyEventRollup
 
 # Register your models here.
 class EventRegistrationInline(admin.TabularInline):
@@ -84,3 +84,19 @@ class EventConflictAdmin(admin.ModelAdmin):
     list_display = ['event1', 'event2', 'status', 'detected_at']
     list_filter = ['status', 'detected_at']
     readonly_fields = ['detected_at']
+
+
+@admin.register(EventStats)
+class EventStatsAdmin(admin.ModelAdmin):
+    list_display = ['event', 'total_registrations', 'confirmed_registrations', 'attended_count', 'feedback_count', 'updated_at']
+    search_fields = ['event__title']
+    readonly_fields = ['event', 'total_registrations', 'confirmed_registrations', 'attended_count',
+                       'feedback_count', 'rating_sum', 'content_rating_sum', 'organization_rating_sum', 'updated_at']
+
+
+@admin.register(DailyEventRollup)
+class DailyEventRollupAdmin(admin.ModelAdmin):
+    list_display = ['date', 'event', 'department', 'event_type', 'registrations', 'attendances', 'feedbacks']
+    list_filter = ['event_type', 'department', 'date']
+    search_fields = ['event__title']
+    date_hierarchy = 'date'
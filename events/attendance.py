@@ -0,0 +1,389 @@
+import atexit
+import fcntl
+import json
+import logging
+import os
+import re
+import secrets
+import socket
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import EventRegistration
+from .stats import bump_event_stats
+
+logger = logging.getLogger(__name__)
+
+MAX_SYNC_BATCH = 5000
+
+ROSTER_COLUMNS = ['registration_id', 'username', 'student_id', 'first_name', 'last_name', 'attended']
+
+
+def roster_snapshot(event):
+    """Compact list of confirmed registrations, for gate scanners to validate offline."""
+    rows = (EventRegistration.objects
+            .filter(event=event, status='confirmed')
+            .order_by('id')
+            .values_list('id', 'student__username', 'student__student_id',
+                         'student__first_name', 'student__last_name', 'attended'))
+    return {
+        'event_id': event.id,
+        'generated_at': timezone.now().isoformat(),
+        'columns': ROSTER_COLUMNS,
+        'rows': [list(r) for r in rows],
+    }
+
+
+def _parse_scanned_at(value, now):
+    if not value:
+        return now
+    scanned_at = parse_datetime(str(value))
+    if scanned_at is None:
+        raise ValueError(f"invalid scanned_at '{value}'")
+    if timezone.is_naive(scanned_at):
+        scanned_at = timezone.make_aware(scanned_at)
+    # scanner clocks drift; never record a check-in in the future
+    return min(scanned_at, now)
+
+
+def apply_checkins(event, checkins, count_live=True):
+    """
+    Apply scanned check-ins for one event (instance or id) with a single bulk_update.
+
+    checkins: iterable of {'registration_id': int, 'scanned_at': iso8601 (optional)}.
+    Duplicates keep the earliest scan, and a registration already marked keeps
+    the earlier of the stored and scanned times, so replaying a batch is a no-op.
+    count_live=False is used when replaying the write-behind log, whose entries
+    were already counted when they were buffered.
+    """
+    now = timezone.now()
+    earliest = {}
+    rejected = []
+
+    for item in checkins:
+        if not isinstance(item, dict) or item.get('registration_id') is None:
+            rejected.append({'item': item, 'reason': 'missing registration_id'})
+            continue
+        try:
+            registration_id = int(item['registration_id'])
+            scanned_at = _parse_scanned_at(item.get('scanned_at'), now)
+        except (TypeError, ValueError) as exc:
+            rejected.append({'item': item, 'reason': str(exc) or 'invalid item'})
+            continue
+        if registration_id not in earliest or scanned_at < earliest[registration_id]:
+            earliest[registration_id] = scanned_at
+
+    registrations = (EventRegistration.objects
+                     .filter(event=event, status='confirmed', id__in=earliest.keys())
+                     .only('id', 'attended', 'attendance_marked_at'))
+
+    to_update, already_recorded, newly_attended = [], 0, 0
+    found = set()
+    for registration in registrations:
+        found.add(registration.id)
+        scanned_at = earliest[registration.id]
+        if registration.attended and registration.attendance_marked_at and registration.attendance_marked_at <= scanned_at:
+            already_recorded += 1
+            continue
+        if not registration.attended:
+            newly_attended += 1
+        registration.attended = True
+        registration.attendance_marked_at = scanned_at
+        to_update.append(registration)
+
+    for registration_id in earliest.keys() - found:
+        rejected.append({'registration_id': registration_id,
+                         'reason': 'not a confirmed registration for this event'})
+
+    if to_update:
+        EventRegistration.objects.bulk_update(to_update, ['attended', 'attendance_marked_at'])
+    # bulk_update sends no signals
+    bump_event_stats(getattr(event, 'pk', event), attended_count=newly_attended)
+    if count_live and newly_attended:
+        _add_live_count(getattr(event, 'pk', event), newly_attended)
+
+    return {
+        'applied': len(to_update),
+        'already_recorded': already_recorded,
+        'rejected': rejected,
+    }
+
+
+# ---------- write-behind check-in buffer ----------
+#
+# mark_attendance_for_user() appends each check-in to a per-process append-only
+# log and bumps a cached per-event counter; a background thread replays the log
+# into the database in batches through apply_checkins(). Logs left behind by a
+# crashed or restarted process are picked up by replay_orphaned_logs() (run on
+# startup of the next buffer and by the flush_attendance_logs Celery task).
+
+LOG_PREFIX = 'checkins-'
+SEEN_TTL = 24 * 60 * 60
+
+
+def _live_key(event_id):
+    return f"attendance:live:{event_id}"
+
+
+def _seen_key(registration_id):
+    return f"attendance:seen:{registration_id}"
+
+
+def live_attendance_count(event_id):
+    """Attended count for an event from the cache, seeded from the DB on a miss."""
+    count = cache.get(_live_key(event_id))
+    if count is None:
+        count = EventRegistration.objects.filter(event_id=event_id, attended=True).count()
+        cache.add(_live_key(event_id), count, timeout=None)
+        count = cache.get(_live_key(event_id), count)
+    return count
+
+
+def _add_live_count(event_id, delta):
+    # only adjust a seeded counter; an unseeded one is read from the DB when needed
+    try:
+        cache.incr(_live_key(event_id), delta)
+    except ValueError:
+        pass
+
+
+def _bump_live_count(event_id):
+    try:
+        cache.incr(_live_key(event_id))
+    except ValueError:
+        # not seeded yet: the DB count does not include this (unflushed) check-in
+        live_attendance_count(event_id)
+        cache.incr(_live_key(event_id))
+
+
+def _replay_file(path):
+    """Apply one rotated log file, then delete it. Left in place if the DB write fails."""
+    by_event = defaultdict(list)
+    with open(path, encoding='utf-8') as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+                by_event[int(record['e'])].append({'registration_id': record['r'], 'scanned_at': record['t']})
+            except (ValueError, KeyError, TypeError):
+                # a torn last line from a crash mid-write
+                logger.warning("Skipping malformed attendance log line in %s", path)
+
+    applied = 0
+    for event_id, items in by_event.items():
+        applied += apply_checkins(event_id, items, count_live=False)['applied']
+    os.remove(path)
+    return applied
+
+
+# Every process writes under an owner name "<host>_<pid>_<nonce>" and holds an
+# exclusive flock on checkins-<owner>.lock while it lives. A log is orphaned
+# when its owner's lock can be taken: the owner exited or crashed. The random
+# nonce keeps a restarted container that gets the same pid (or another host
+# sharing the directory) from mistaking old logs for its own.
+
+_identity = None   # (pid, owner)
+_held_locks = {}   # directory -> fd of this process's lock file there
+
+
+def process_owner():
+    global _identity
+    if _identity is None or _identity[0] != os.getpid():
+        # first use in this process, or a fork: never reuse the parent's name
+        host = re.sub(r'[^A-Za-z0-9]', '_', socket.gethostname())
+        _identity = (os.getpid(), f"{host}_{os.getpid()}_{secrets.token_hex(4)}")
+        # a forked child drops its copies of the parent's lock fds, so the
+        # parent's lock is released when the parent itself exits
+        for fd in _held_locks.values():
+            os.close(fd)
+        _held_locks.clear()
+    return _identity[1]
+
+
+def _owner_of(path):
+    return path.name[len(LOG_PREFIX):].split('.')[0]
+
+
+def _lock_path(directory, owner):
+    return Path(directory) / f"{LOG_PREFIX}{owner}.lock"
+
+
+def _try_lock(path):
+    """Open and exclusively flock a lock file; the fd, or None if someone holds it."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def hold_owner_lock(directory):
+    """Take this process's lock in a log directory (kept until the process exits)."""
+    owner = process_owner()
+    directory = str(directory)
+    if directory not in _held_locks:
+        fd = _try_lock(_lock_path(directory, owner))
+        if fd is None:
+            raise RuntimeError(f"attendance log lock for {owner} is held by another process")
+        _held_locks[directory] = fd
+    return owner
+
+
+def _claim(path, directory):
+    """Atomically rename a log to a name owned by this process; None if another process won."""
+    target = Path(directory) / f"{LOG_PREFIX}{process_owner()}.{time.time_ns()}.flushing"
+    try:
+        os.replace(path, target)
+    except FileNotFoundError:
+        return None
+    return target
+
+
+def replay_orphaned_logs(directory=None):
+    """Replay logs whose owning process is gone. Returns rows applied."""
+    directory = Path(directory or settings.ATTENDANCE_LOG_DIR)
+    if not directory.is_dir():
+        return 0
+
+    by_owner = defaultdict(list)
+    for path in sorted(directory.glob(f"{LOG_PREFIX}*")):
+        if path.suffix in ('.log', '.flushing'):
+            by_owner[_owner_of(path)].append(path)
+        elif path.suffix == '.lock':
+            by_owner[_owner_of(path)]  # lock left by a cleanly stopped process
+    by_owner.pop(process_owner(), None)  # ours are flushed by our own buffer
+
+    applied = 0
+    for owner, paths in by_owner.items():
+        lock_path = _lock_path(directory, owner)
+        fd = _try_lock(lock_path)
+        if fd is None:
+            continue  # owner alive, or another process is replaying it right now
+        try:
+            done = True
+            for path in paths:
+                try:
+                    applied += _replay_file(path)
+                except FileNotFoundError:
+                    pass
+                except Exception:
+                    done = False
+                    logger.exception("Replaying attendance log %s failed; will retry", path)
+            if done:
+                os.unlink(lock_path)
+        finally:
+            os.close(fd)
+    return applied
+
+
+class AttendanceBuffer:
+    def __init__(self, directory, flush_interval=2.0, fsync=False):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / f"{LOG_PREFIX}{hold_owner_lock(self.directory)}.log"
+        self.pid = os.getpid()
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._fh = None
+        self._pending = []  # rotated files of this process not yet applied
+        self._thread = None
+
+    def append(self, event_id, registration_id, marked_at):
+        line = json.dumps({'e': event_id, 'r': registration_id, 't': marked_at.isoformat()}) + "\n"
+        with self._lock:
+            if self._fh is None:
+                self._fh = open(self.path, 'a', encoding='utf-8')
+            self._fh.write(line)
+            self._fh.flush()
+            if self.fsync:
+                os.fsync(self._fh.fileno())
+        self._ensure_flusher()
+
+    def flush(self):
+        with self._lock:
+            if self._fh is not None:
+                self._fh.close()
+                self._fh = None
+            if self.path.exists():
+                claimed = _claim(self.path, self.directory)
+                if claimed is not None:
+                    self._pending.append(claimed)
+            pending, self._pending = self._pending, []
+
+        applied = 0
+        for index, path in enumerate(pending):
+            try:
+                applied += _replay_file(path)
+            except FileNotFoundError:
+                # claimed by another process's replay; nothing left to retry
+                logger.warning("Attendance log %s disappeared before it was flushed", path)
+            except Exception:
+                logger.exception("Flushing attendance log %s failed; will retry", path)
+                with self._lock:
+                    self._pending = pending[index:] + self._pending
+                break
+        return applied
+
+    def _ensure_flusher(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='attendance-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Attendance flush failed")
+            finally:
+                connections.close_all()
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    global _buffer
+    if _buffer is None or _buffer.pid != os.getpid():
+        with _buffer_lock:
+            if _buffer is None or _buffer.pid != os.getpid():
+                buffer = AttendanceBuffer(
+                    settings.ATTENDANCE_LOG_DIR,
+                    flush_interval=getattr(settings, 'ATTENDANCE_FLUSH_INTERVAL', 2),
+                    fsync=getattr(settings, 'ATTENDANCE_LOG_FSYNC', False),
+                )
+                try:
+                    replay_orphaned_logs(buffer.directory)
+                except Exception:
+                    logger.exception("Replaying orphaned attendance logs failed")
+                atexit.register(buffer.flush)
+                _buffer = buffer
+    return _buffer
+
+
+def record_checkin(registration):
+    """
+    Buffer a check-in for write-behind. Returns False if this registration was
+    already checked in (by the DB row or a still-unflushed entry).
+    """
+    if registration.attended or not cache.add(_seen_key(registration.id), 1, timeout=SEEN_TTL):
+        return False
+    get_buffer().append(registration.event_id, registration.id, timezone.now())
+    _bump_live_count(registration.event_id)
+    return True
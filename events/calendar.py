@@ -0,0 +1,118 @@
+import hashlib
+from datetime import timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import Event
+from .utils import get_upcoming_events
+
+# Per-user iCalendar feed. The feed URL carries "<user id>.<hmac>" instead of
+# an API token, because calendar apps cannot send headers; the HMAC covers the
+# user's password hash, so changing the password revokes old feed URLs.
+# The ETag is derived from the ids and updated_at of the events in the feed,
+# so polls that find nothing new are answered 304 before any rendering.
+
+SALT = "events.calendar"
+PRODID = "-//Eventify//Event Calendar//EN"
+STATUS_MAP = {
+    'approved': 'CONFIRMED',
+    'completed': 'CONFIRMED',
+    'draft': 'TENTATIVE',
+    'pending': 'TENTATIVE',
+    'rejected': 'CANCELLED',
+    'cancelled': 'CANCELLED',
+}
+
+
+def feed_token(user):
+    digest = salted_hmac(SALT, f"{user.pk}:{user.password}", algorithm='sha256').hexdigest()[:32]
+    return f"{user.pk}.{digest}"
+
+
+def user_for_token(token):
+    """The active user a feed token belongs to, or None."""
+    user_id, _, digest = (token or '').partition('.')
+    if not user_id.isdigit() or not digest:
+        return None
+    user = get_user_model().objects.filter(pk=int(user_id), is_active=True).first()
+    if user is None or not constant_time_compare(feed_token(user), token):
+        return None
+    return user
+
+
+def feed_events(user, include_eligible=False):
+    """
+    Events in a user's feed: their upcoming events (get_upcoming_events) from
+    CALENDAR_FEED_PAST_DAYS ago, plus for students with include_eligible, the
+    approved events still open for registration.
+    """
+    since = timezone.now() - timedelta(days=getattr(settings, 'CALENDAR_FEED_PAST_DAYS', 30))
+    days = getattr(settings, 'CALENDAR_FEED_DAYS', 180)
+    events = get_upcoming_events(user, days=days, since=since)
+    if include_eligible and user.is_student():
+        eligible = Event.objects.filter(status='approved', registration_deadline__gte=timezone.now(),
+                                        start_date__lte=timezone.now() + timedelta(days=days))
+        events = Event.objects.filter(id__in=events.values('id')) | eligible
+    return events.order_by('start_date', 'id')
+
+
+def feed_etag(user, events, include_eligible=False):
+    digest = hashlib.sha1(f"{user.pk}:{include_eligible}".encode())
+    for event_id, updated_at in events.values_list('id', 'updated_at'):
+        digest.update(f"{event_id}:{updated_at.timestamp()};".encode())
+    return f'"{digest.hexdigest()}"'
+
+
+def _escape(text):
+    return (str(text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+            .replace('\r\n', '\\n').replace('\n', '\\n'))
+
+
+def _fold(line):
+    # RFC 5545: lines of at most 75 octets, continuations start with a space
+    data = line.encode('utf-8')
+    if len(data) <= 75:
+        return line + '\r\n'
+    parts, current = [], b''
+    for char in line:
+        encoded = char.encode('utf-8')
+        if len(current) + len(encoded) > (75 if not parts else 74):
+            parts.append(current)
+            current = b''
+        current += encoded
+    parts.append(current)
+    return '\r\n '.join(part.decode('utf-8') for part in parts) + '\r\n'
+
+
+def _utc(dt):
+    return dt.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def iter_ics(events, calendar_name, base_url):
+    """Yield the feed a VEVENT at a time."""
+    yield ''.join(_fold(line) for line in (
+        'BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH',
+        f'X-WR-CALNAME:{_escape(calendar_name)}', 'REFRESH-INTERVAL;VALUE=DURATION:PT15M',
+    ))
+    stamp = _utc(timezone.now())
+    domain = getattr(settings, 'SITE_DOMAIN', 'eventify').split(':')[0]
+    for event in events.only('id', 'title', 'description', 'venue', 'start_date', 'end_date',
+                             'status', 'updated_at').iterator(chunk_size=200):
+        yield ''.join(_fold(line) for line in (
+            'BEGIN:VEVENT',
+            f'UID:event-{event.id}@{domain}',
+            f'DTSTAMP:{stamp}',
+            f'LAST-MODIFIED:{_utc(event.updated_at)}',
+            f'DTSTART:{_utc(event.start_date)}',
+            f'DTEND:{_utc(event.end_date)}',
+            f'SUMMARY:{_escape(event.title)}',
+            f'LOCATION:{_escape(event.venue)}',
+            f'DESCRIPTION:{_escape(event.description)}',
+            f'URL:{base_url}/api/v1/events/{event.id}/',
+            f'STATUS:{STATUS_MAP.get(event.status, "TENTATIVE")}',
+            'END:VEVENT',
+        ))
+    yield 'END:VCALENDAR\r\n'
@@ -0,0 +1,120 @@
+import itertools
+
+import numpy as np
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Event, EventRegistration, EventSimilarity
+
+# "Students like you also attended": item-to-item similarity from attendance
+# history. A student "took part" in an event they attended or hold a
+# confirmed registration for; the latter is what links past events to
+# upcoming ones. Participation is a sparse student x event matrix A; A.T @ A
+# counts, for every pair of events, the students who took part in both.
+# Scores are the cosine of the two participant sets. The top-k per event are
+# stored twice over: among events still open for registration (the ones that
+# can be recommended) and among the rest, so past events do not crowd out
+# upcoming ones. The product is computed a block of events at a time so
+# memory stays bounded by the block, not by events x events.
+
+BLOCK_SIZE = 1000
+
+
+def _participation_pairs():
+    queryset = (EventRegistration.objects
+                .filter(Q(attended=True) | Q(status='confirmed'))
+                .order_by()
+                .values_list('student_id', 'event_id'))
+    # plain cursor + np.fromiter: values_list() row overhead dominates otherwise
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    data = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows))
+    return data[0::2], data[1::2]
+
+
+def _open_event_ids():
+    return list(Event.objects
+                .filter(status='approved', registration_deadline__gte=timezone.now())
+                .values_list('id', flat=True))
+
+
+def _top(columns, counts, scores, top_k):
+    if len(scores) > top_k:
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        return columns[best], counts[best], scores[best]
+    return columns, counts, scores
+
+
+def top_similar(student_ids, event_ids, top_k=20, min_co_attendees=2, open_event_ids=()):
+    """
+    Yield (event_id, similar_event_id, score, co_attendees) for the most
+    similar events of every event, from parallel arrays of participation
+    pairs: the top_k among open_event_ids and the top_k among the others.
+    """
+    if not len(event_ids):
+        return
+    _, students = np.unique(student_ids, return_inverse=True)
+    events, event_index = np.unique(event_ids, return_inverse=True)
+    attendance = sparse.csc_matrix(
+        (np.ones(len(students), dtype=np.float32), (students, event_index)),
+        shape=(students.max() + 1, len(events)),
+    )
+    attendance.data[:] = 1  # duplicates would have been summed
+    attendees = np.asarray(attendance.sum(axis=0)).ravel()
+    attendance_t = attendance.T.tocsr()
+    is_open = np.isin(events, np.asarray(list(open_event_ids), dtype=events.dtype))
+
+    for start in range(0, len(events), BLOCK_SIZE):
+        stop = min(start + BLOCK_SIZE, len(events))
+        co = (attendance_t[start:stop] @ attendance).tocsr()
+        for row in range(stop - start):
+            i = start + row
+            lo, hi = co.indptr[row], co.indptr[row + 1]
+            columns, counts = co.indices[lo:hi], co.data[lo:hi]
+            keep = (columns != i) & (counts >= min_co_attendees)
+            columns, counts = columns[keep], counts[keep]
+            if not len(columns):
+                continue
+            scores = counts / np.sqrt(attendees[i] * attendees[columns])
+            for part in (is_open[columns], ~is_open[columns]):
+                kept = _top(columns[part], counts[part], scores[part], top_k)
+                for j, count, score in zip(*(values.tolist() for values in kept)):
+                    yield int(events[i]), int(events[j]), float(score), int(count)
+
+
+def rebuild_similarities(batch_size=5000):
+    """Recompute EventSimilarity from all participation; returns the number of rows stored."""
+    top_k = getattr(settings, 'EVENT_SIMILARITY_TOP_K', 20)
+    min_co_attendees = getattr(settings, 'EVENT_SIMILARITY_MIN_CO_ATTENDEES', 2)
+    student_ids, event_ids = _participation_pairs()
+    rows = [EventSimilarity(event_id=i, similar_event_id=j, score=score, co_attendees=count)
+            for i, j, score, count in top_similar(student_ids, event_ids, top_k, min_co_attendees,
+                                                  _open_event_ids())]
+    with transaction.atomic():
+        EventSimilarity.objects.all().delete()
+        EventSimilarity.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def coattendance_recommendations(user, limit=20):
+    """
+    [(event_id, score, matched)] of open approved events similar to the ones
+    the user attended, excluding events they registered for. score sums the
+    similarities, matched counts how many attended events pointed to it.
+    """
+    attended = EventRegistration.objects.filter(student=user, attended=True).values('event_id')
+    registered = EventRegistration.objects.filter(student=user).values('event_id')
+    rows = (EventSimilarity.objects
+            .filter(event_id__in=attended,
+                    similar_event__status='approved',
+                    similar_event__registration_deadline__gte=timezone.now())
+            .exclude(similar_event_id__in=registered)
+            .values('similar_event_id')
+            .annotate(total=Sum('score'), matched=Count('event_id'))
+            .order_by('-total', 'similar_event_id')[:limit])
+    return [(row['similar_event_id'], row['total'], row['matched']) for row in rows]
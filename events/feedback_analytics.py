@@ -0,0 +1,131 @@
+import itertools
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, IntegerField
+from django.db.models.functions import Cast
+
+from users.models import User
+from .models import Event, EventFeedback
+
+# Feedback rating analytics per organizer, organizer department, event type
+# and semester, computed with NumPy instead of per-group ORM aggregates.
+#
+# The feedback table is read once, as (event_id, packed ratings) pairs, and
+# shared by every dimension; each dimension then only needs a values_list
+# over events to map event ids to its groups. Per-group statistics are
+# bincounts, so the cost is one scan plus vector arithmetic however many
+# groups there are. Results are cached for FEEDBACK_ANALYTICS_CACHE_TTL.
+
+DIMENSIONS = {
+    'organizer': 'organizer_id',
+    'department': 'organizer__department',
+    'event_type': 'event_type',
+    'semester': 'semester',
+}
+METRICS = ('rating', 'content_quality_rating', 'organization_rating')
+MAX_RATING = 5
+Z_95 = 1.96
+CACHE_KEY = "feedback-analytics"
+
+
+def _fetch_feedback():
+    # Ratings are 1-5 and would_recommend is 0/1, so the four values pack into
+    # one integer; two columns per row keep the fetch cheap. The ORM's SQL is
+    # run on a plain cursor because values_list() converters cost more per
+    # row than everything below.
+    packed = (F('rating') * 1000 + F('content_quality_rating') * 100 + F('organization_rating') * 10
+              + Cast('would_recommend', IntegerField()))
+    queryset = EventFeedback.objects.order_by().annotate(packed=packed).values_list('event_id', 'packed')
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    data = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64, count=2 * len(rows)).reshape(-1, 2)
+    event_ids, packed = data[:, 0], data[:, 1]
+    ratings = np.column_stack([packed // 1000, packed // 100 % 10, packed // 10 % 10])
+    return event_ids, ratings, packed % 10
+
+
+def _event_groups(dimension, feedback_event_ids):
+    """(group keys, group index of every feedback row) for one dimension."""
+    events = list(Event.objects.order_by('id').values_list('id', DIMENSIONS[dimension]))
+    ids = np.array([event_id for event_id, _ in events], dtype=np.int64)
+    if dimension == 'organizer':
+        keys = np.array([key for _, key in events], dtype=np.int64)
+    else:
+        keys = np.array(['' if key is None else key for _, key in events], dtype=object)
+    unique_keys, event_group = np.unique(keys, return_inverse=True)
+    return unique_keys, event_group[np.searchsorted(ids, feedback_event_ids)]
+
+
+def _labels(dimension, keys):
+    if dimension == 'organizer':
+        names = dict(User.objects.filter(id__in=keys).values_list('id', 'username'))
+        return [names.get(key, str(key)) for key in keys]
+    choices = {
+        'department': dict(User.DEPARTMENTS),
+        'event_type': dict(Event.EVENT_TYPE_CHOICES),
+    }.get(dimension, {})
+    return [choices.get(key, key) or 'Unspecified' for key in keys]
+
+
+def _metric_stats(groups, counts, ratings):
+    n_groups = len(counts)
+    sums = np.bincount(groups, weights=ratings, minlength=n_groups)
+    squares = np.bincount(groups, weights=ratings ** 2, minlength=n_groups)
+    means = sums / counts
+    # sample variance from the sums; groups of one have no spread
+    variances = np.clip((squares - counts * means ** 2) / np.maximum(counts - 1, 1), 0, None)
+    variances[counts < 2] = 0.0
+    half_widths = Z_95 * np.sqrt(variances / counts)
+    distribution = np.bincount(groups * MAX_RATING + (ratings - 1),
+                               minlength=n_groups * MAX_RATING).reshape(n_groups, MAX_RATING)
+    return means, np.sqrt(variances), half_widths, distribution
+
+
+def _dimension_stats(dimension, event_ids, ratings, recommend):
+    unique_keys, groups = _event_groups(dimension, event_ids)
+    # drop groups without feedback (events nobody rated)
+    present = np.bincount(groups, minlength=len(unique_keys)) > 0
+    remap = np.cumsum(present) - 1
+    unique_keys, groups = unique_keys[present], remap[groups]
+
+    counts = np.bincount(groups, minlength=len(unique_keys)).astype(np.float64)
+    recommend_rates = np.bincount(groups, weights=recommend, minlength=len(unique_keys)) / counts
+    per_metric = {metric: _metric_stats(groups, counts, ratings[:, i]) for i, metric in enumerate(METRICS)}
+
+    keys = unique_keys.tolist()
+    results = []
+    for g, (key, label) in enumerate(zip(keys, _labels(dimension, keys))):
+        entry = {'key': key, 'label': label, 'count': int(counts[g]),
+                 'would_recommend_rate': round(float(recommend_rates[g]), 4)}
+        for metric, (means, stds, half_widths, distribution) in per_metric.items():
+            entry[metric] = {
+                'mean': round(float(means[g]), 3),
+                'std': round(float(stds[g]), 3),
+                'ci95': [round(float(means[g] - half_widths[g]), 3), round(float(means[g] + half_widths[g]), 3)],
+                'distribution': distribution[g].tolist(),
+            }
+        results.append(entry)
+    results.sort(key=lambda entry: -entry['count'])
+    return results
+
+
+def compute_feedback_analytics():
+    """{dimension: [per-group statistics]} for every dimension in DIMENSIONS."""
+    event_ids, ratings, recommend = _fetch_feedback()
+    if not len(event_ids):
+        return {dimension: [] for dimension in DIMENSIONS}
+    return {dimension: _dimension_stats(dimension, event_ids, ratings, recommend) for dimension in DIMENSIONS}
+
+
+def feedback_analytics():
+    """Cached compute_feedback_analytics()."""
+    results = cache.get(CACHE_KEY)
+    if results is None:
+        results = compute_feedback_analytics()
+        cache.set(CACHE_KEY, results, getattr(settings, 'FEEDBACK_ANALYTICS_CACHE_TTL', 10 * 60))
+    return results
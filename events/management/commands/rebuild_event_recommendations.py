@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from events.recommendations import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the interest term index used by /events/recommended/ from all approved events."
+
+    def handle(self, *args, **options):
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} approved events."))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from events.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the full-text search index of events (run after bulk edits made with "
+            "queryset.update() or raw SQL, which bypass the index signals).")
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("Full-text search index not available on this database; nothing to do.")
+            return
+        count = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} events."))
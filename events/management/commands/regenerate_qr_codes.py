@@ -0,0 +1,82 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from eventify.parallel import init_django_worker
+from events.models import Event
+from events.qr import CONTENT_TYPES, _disk_dir, new_qr_token, payload_digest, render_qr, static_attendance_url, write_atomic
+
+
+def _render_to_file(job):
+    payload, fmt, path = job
+    data = render_qr(payload, fmt)
+    write_atomic(path, data)
+    return len(data)
+
+
+class Command(BaseCommand):
+    help = ("Rebuild the on-demand attendance QR cache (events/qr.py) for approved events with the "
+            "current SITE_DOMAIN (run after moving hosts): drops cached images of old URLs and "
+            "pre-renders the new ones.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help="Render processes (default: all cores)")
+        parser.add_argument('--rotate-tokens', action='store_true',
+                            help="Also issue a new qr_code_data token; previously printed QR codes stop working")
+        parser.add_argument('--formats', default='png', help="Comma-separated formats to pre-render (png,svg)")
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        formats = [f.strip() for f in options['formats'].split(',') if f.strip()]
+        unknown = set(formats) - set(CONTENT_TYPES)
+        if unknown:
+            self.stderr.write(f"Unsupported format(s): {', '.join(sorted(unknown))}")
+            return
+
+        events = list(Event.objects.filter(status='approved').only('id', 'qr_code_data').order_by('-start_date', '-id'))
+        changed = []
+        for event in events:
+            if options['rotate_tokens'] or not event.qr_code_data:
+                event.qr_code_data = new_qr_token(event.id)
+                changed.append(event)
+        Event.objects.bulk_update(changed, ['qr_code_data'], batch_size=options['batch_size'])
+
+        # cache files are named by the digest of the full URL, so entries for the
+        # old domain (or rotated tokens) are simply never hit again: remove them
+        directory = _disk_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        wanted = {}
+        for event in events:
+            payload = static_attendance_url(event)
+            for fmt in formats:
+                wanted[f"{payload_digest(payload, fmt)}.{fmt}"] = (payload, fmt)
+        removed = 0
+        for path in directory.iterdir():
+            if path.is_file() and not path.name.startswith('.tmp-') and path.name not in wanted:
+                path.unlink(missing_ok=True)
+                removed += 1
+
+        # newest events first, no more than the disk cache keeps anyway
+        limit = getattr(settings, 'QR_DISK_CACHE_MAX_FILES', 1000)
+        jobs = [(payload, fmt, str(directory / name)) for name, (payload, fmt) in list(wanted.items())[:limit]
+                if not (directory / name).exists()]
+
+        workers = options['workers'] or os.cpu_count() or 1
+        if workers <= 1 or len(jobs) < 2:
+            sizes = [_render_to_file(job) for job in jobs]
+        else:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=init_django_worker) as pool:
+                sizes = list(pool.map(_render_to_file, jobs, chunksize=chunksize))
+
+        elapsed = time.monotonic() - started
+        rate = len(jobs) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Rendered {len(jobs)} QR images for {len(events)} events at {settings.SITE_DOMAIN} "
+            f"({sum(sizes) / 1024:.0f} KiB, {len(changed)} new tokens, {removed} stale images removed) "
+            f"in {elapsed:.2f}s ({rate:.0f} images/s, {workers} workers)."
+        ))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q, Sum
+
+
+def fill_event_stats(apps, schema_editor):
+    EventRegistration = apps.get_model('events', 'EventRegistration')
+    EventStats = apps.get_model('events', 'EventStats')
+    rows = (EventRegistration.objects
+            .order_by()
+            .values('event_id')
+            .annotate(total_registrations=Count('id'),
+                      confirmed_registrations=Count('id', filter=Q(status='confirmed')),
+                      attended_count=Count('id', filter=Q(attended=True)),
+                      feedback_count=Count('feedback'),
+                      rating_sum=Sum('feedback__rating', default=0),
+                      content_rating_sum=Sum('feedback__content_quality_rating', default=0),
+                      organization_rating_sum=Sum('feedback__organization_rating', default=0)))
+    EventStats.objects.bulk_create([EventStats(**row) for row in rows], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0009_alter_event_semester_alter_event_year'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventStats',
+            fields=[
+                ('event', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='events.event')),
+                ('total_registrations', models.IntegerField(default=0)),
+                ('confirmed_registrations', models.IntegerField(default=0)),
+                ('attended_count', models.IntegerField(default=0)),
+                ('feedback_count', models.IntegerField(default=0)),
+                ('rating_sum', models.IntegerField(default=0)),
+                ('content_rating_sum', models.IntegerField(default=0)),
+                ('organization_rating_sum', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'events_stats',
+            },
+        ),
+        migrations.RunPython(fill_event_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:13
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0010_eventstats'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyEventRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('department', models.CharField(blank=True, default='', max_length=50)),
+                ('event_type', models.CharField(choices=[('technical', 'Technical'), ('non_technical', 'Non-Technical'), ('workshop', 'Workshop'), ('seminar', 'Seminar'), ('competition', 'Competition'), ('cultural', 'Cultural'), ('sports', 'Sports'), ('others', 'others')], max_length=20)),
+                ('registrations', models.PositiveIntegerField(default=0)),
+                ('attendances', models.PositiveIntegerField(default=0)),
+                ('feedbacks', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'events_daily_rollup',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='eventfeedback',
+            index=models.Index(fields=['created_at'], name='events_feed_created_2c7dae_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['registration_date'], name='events_regi_registr_07801a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='eventregistration',
+            index=models.Index(fields=['attendance_marked_at'], name='events_regi_attenda_3c3579_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailyeventrollup',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_rollups', to='events.event'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyeventrollup',
+            index=models.Index(fields=['date', 'event_type'], name='events_dail_date_b58cfa_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyeventrollup',
+            index=models.Index(fields=['date', 'department'], name='events_dail_date_3cfde0_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='dailyeventrollup',
+            unique_together={('date', 'event', 'department')},
+        ),
+    ]
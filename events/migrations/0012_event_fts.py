@@ -0,0 +1,36 @@
+from django.db import migrations
+
+FTS_TABLE = 'events_event_fts'
+
+
+def create_fts_table(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            return
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "title, description, venue, "
+            "prefix='2 3', tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, title, description, venue) "
+                       "SELECT id, title, description, venue FROM events_event")
+
+
+def drop_fts_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0011_dailyeventrollup'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts_table, drop_fts_table),
+    ]
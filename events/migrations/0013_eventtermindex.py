@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:19
+
+import math
+import re
+from collections import Counter
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Frozen copy of the tokenizer in events/recommendations.py as of this
+# migration, so later changes there cannot alter what migrating produces.
+# If the tokenizer changes, run manage.py rebuild_event_recommendations.
+FIELD_WEIGHTS = {'title': 3.0, 'event_type': 2.0, 'description': 1.0}
+MAX_TERMS_PER_EVENT = 64
+WORD = re.compile(r'[^\W\d_]{3,}', re.UNICODE)
+STOPWORDS = frozenset("""
+    the and for with from this that will are was were been have has had not but you your our their
+    all any can into about more most other some such than then them they there these those what when
+    where which while who why how its also event events join welcome please day days
+""".split())
+
+
+def normalize_term(word):
+    word = word.lower()
+    if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word[:40]
+
+
+def event_term_weights(title, description, event_type):
+    counts = Counter()
+    for field, text in (('title', title), ('description', description),
+                        ('event_type', (event_type or '').replace('_', ' '))):
+        for word in WORD.findall(text or ''):
+            if word.lower() not in STOPWORDS:
+                counts[normalize_term(word)] += FIELD_WEIGHTS[field]
+    return {term: 1.0 + math.log(count) for term, count in counts.most_common(MAX_TERMS_PER_EVENT)}
+
+
+def index_approved_events(apps, schema_editor):
+    Event = apps.get_model('events', 'Event')
+    EventTermIndex = apps.get_model('events', 'EventTermIndex')
+    rows = []
+    for event in Event.objects.filter(status='approved').only('id', 'title', 'description', 'event_type').iterator():
+        rows.extend(EventTermIndex(term=term, event_id=event.id, weight=weight)
+                    for term, weight in event_term_weights(event.title, event.description, event.event_type).items())
+    EventTermIndex.objects.bulk_create(rows, batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0012_event_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventTermIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=40)),
+                ('weight', models.FloatField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_terms', to='events.event')),
+            ],
+            options={
+                'db_table': 'events_term_index',
+                'unique_together': {('term', 'event')},
+            },
+        ),
+        migrations.RunPython(index_approved_events, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('events', '0013_eventtermindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventSimilarity',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField(help_text="Cosine similarity of the two events' attendee sets")),
+                ('co_attendees', models.PositiveIntegerField()),
+                ('event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_events', to='events.event')),
+                ('similar_event', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='events.event')),
+            ],
+            options={
+                'db_table': 'events_similarity',
+                'unique_together': {('event', 'similar_event')},
+            },
+        ),
+    ]
@@ -2,11 +2,8 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.utils import timezone
-import qrcode
-from io import BytesIO
-from django.core.files import File
-import uuid
 from django.conf import settings
+from .qr import new_qr_token
 # Create your models here.
 
 User =get_user_model()
@@ -90,8 +87,9 @@ class Event(models.Model):
     
     
     def save(self, *args, **kwargs):
-        # Generate QR code when event is approved
-        if self.status == 'approved' and not self.qr_code:
+        # Assign the attendance QR token when event is approved; the image itself
+        # is rendered on demand by the /events/<id>/qr.png endpoint (events/qr.py)
+        if self.status == 'approved' and not self.qr_code_data:
             self.generate_qr_code()
         super().save(*args, **kwargs)
 
@@ -119,26 +117,8 @@ class Event(models.Model):
 
 
     def generate_qr_code(self):
-        # Build base URL from settings (works on LAN or prod)
-        base_url = f"http://{settings.SITE_DOMAIN}".rstrip("/")
-
-        qr_value = f"eventify_attendance_{self.id}_{uuid.uuid4().hex[:8]}"
-        attendance_url = f"{base_url}/api/v1/events/attendance/verify/?event_id={self.id}&qr={qr_value}"
-
-        qr = qrcode.QRCode(version=1, box_size=10, border=5)
-        qr.add_data(attendance_url)
-        qr.make(fit=True)
-
-        img = qr.make_image(fill_color="black", back_color="white")
-        buffer = BytesIO()
-        img.save(buffer, format='PNG')
-        buffer.seek(0)
-
-        filename = f'qr_event_{self.id}.png'
-        self.qr_code.save(filename, File(buffer), save=False)
-
         # store short token to verify later
-        self.qr_code_data = qr_value
+        self.qr_code_data = new_qr_token(self.id)
 
     def is_registration_open(self):
         from django.utils import timezone
@@ -199,12 +179,25 @@ class EventRegistration(models.Model):
         if not self.event.is_registration_open():
             raise ValidationError('Registration is closed for this event')
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # what EventStats currently counts for this row; see events/signals.py
+        if 'status' in field_names and 'attended' in field_names:
+            instance._stats_state = (instance.status == 'confirmed', instance.attended)
+        return instance
+
     def __str__(self):
         return f"{self.student.username} - {self.event.title}"
     
     class Meta:
         db_table = 'events_registration'
         unique_together = ['event', 'student']  # Prevent duplicate registrations
+        indexes = [
+            # range scans of the nightly rollup
+            models.Index(fields=['registration_date']),
+            models.Index(fields=['attendance_marked_at']),
+        ]
 
 
 class EventFeedback(models.Model):
@@ -249,6 +242,90 @@ class EventFeedback(models.Model):
     class Meta:
         db_table = 'events_feedback'
         unique_together = ['event', 'Student']
+        indexes = [models.Index(fields=['created_at'])]
+
+class EventStats(models.Model):
+    # Running totals for event_statistics, kept current by events/signals.py
+    # and rebuilt nightly by events.tasks.reconcile_event_stats.
+    event = models.OneToOneField(Event, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+
+    total_registrations = models.IntegerField(default=0)
+    confirmed_registrations = models.IntegerField(default=0)
+    attended_count = models.IntegerField(default=0)
+
+    feedback_count = models.IntegerField(default=0)
+    rating_sum = models.IntegerField(default=0)
+    content_rating_sum = models.IntegerField(default=0)
+    organization_rating_sum = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Stats for event {self.event_id}"
+
+    class Meta:
+        db_table = 'events_stats'
+
+
+class DailyEventRollup(models.Model):
+    # Per local day, event and student department: how many registrations,
+    # check-ins and feedbacks happened that day. Filled nightly by
+    # events.tasks.rollup_daily_events (see events/rollups.py) so charts never
+    # scan the registration tables.
+    date = models.DateField()
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='daily_rollups')
+    department = models.CharField(max_length=50, blank=True, default='')
+    event_type = models.CharField(max_length=20, choices=Event.EVENT_TYPE_CHOICES)
+
+    registrations = models.PositiveIntegerField(default=0)
+    attendances = models.PositiveIntegerField(default=0)
+    feedbacks = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.date} event {self.event_id} {self.department or '-'}"
+
+    class Meta:
+        db_table = 'events_daily_rollup'
+        unique_together = ['date', 'event', 'department']
+        indexes = [
+            models.Index(fields=['date', 'event_type']),
+            models.Index(fields=['date', 'department']),
+        ]
+
+
+class EventTermIndex(models.Model):
+    # Inverted index for interest-based recommendations: one row per term of an
+    # approved event's title, description and event type, with its weighted
+    # term frequency. Maintained by events/recommendations.py.
+    term = models.CharField(max_length=40)
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='index_terms')
+    weight = models.FloatField()
+
+    def __str__(self):
+        return f"{self.term} -> event {self.event_id}"
+
+    class Meta:
+        db_table = 'events_term_index'
+        unique_together = ['term', 'event']
+
+
+class EventSimilarity(models.Model):
+    # Top-k events most often attended (or confirmed) by the same students, per
+    # event; see events/coattendance.py.
+    # Rebuilt nightly by events.tasks.build_event_similarities.
+    event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='similar_events')
+    similar_event = models.ForeignKey(Event, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(help_text="Cosine similarity of the two events' attendee sets")
+    co_attendees = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.event_id} ~ {self.similar_event_id} ({self.score:.3f})"
+
+    class Meta:
+        db_table = 'events_similarity'
+        unique_together = ['event', 'similar_event']
+
 
 class EventConflict(models.Model):
     
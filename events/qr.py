@@ -0,0 +1,111 @@
+import hashlib
+import os
+import tempfile
+import uuid
+from functools import lru_cache
+from io import BytesIO
+from pathlib import Path
+
+import qrcode
+import qrcode.image.svg
+from django.conf import settings
+
+# QR images are rendered on demand from Event.qr_code_data and cached in a
+# bounded LRU: an in-process lru_cache in front of a small disk cache under
+# MEDIA_ROOT/qr_cache/ (least recently used files are evicted first).
+
+CONTENT_TYPES = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+
+def new_qr_token(event_id) -> str:
+    """Short token stored in Event.qr_code_data and checked by attendance_verify."""
+    return f"eventify_attendance_{event_id}_{uuid.uuid4().hex[:8]}"
+
+
+def _base_url() -> str:
+    return f"http://{getattr(settings, 'SITE_DOMAIN', 'localhost:8000')}".rstrip("/")
+
+
+def static_attendance_url(event) -> str:
+    """Attendance link encoded in an event's (static) QR code."""
+    return f"{_base_url()}/api/v1/events/attendance/verify/?event_id={event.id}&qr={event.qr_code_data}"
+
+
+def payload_digest(payload: str, fmt: str) -> str:
+    return hashlib.sha256(f"{fmt}:{payload}".encode()).hexdigest()
+
+
+def render_qr(payload: str, fmt: str = 'png') -> bytes:
+    if fmt == 'svg':
+        img = qrcode.make(payload, image_factory=qrcode.image.svg.SvgPathImage, box_size=10, border=5)
+    else:
+        qr = qrcode.QRCode(version=1, box_size=10, border=5)
+        qr.add_data(payload)
+        qr.make(fit=True)
+        img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer) if fmt == 'svg' else img.save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+def _disk_dir() -> Path:
+    return Path(getattr(settings, 'QR_DISK_CACHE_DIR', os.path.join(settings.MEDIA_ROOT, 'qr_cache')))
+
+
+def write_atomic(path, data: bytes):
+    """Write to a temp file in the same directory, then rename over the target."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _evict(directory: Path, max_files: int):
+    files = [p for p in directory.iterdir() if p.is_file() and not p.name.startswith('.tmp-')]
+    if len(files) <= max_files:
+        return
+    files.sort(key=lambda p: p.stat().st_mtime)
+    for path in files[:len(files) - max_files]:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+@lru_cache(maxsize=getattr(settings, 'QR_MEMORY_CACHE_SIZE', 256))
+def _cached_image(digest: str, payload: str, fmt: str, persist: bool) -> bytes:
+    path = _disk_dir() / f"{digest}.{fmt}"
+    if persist:
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # mark as recently used
+            return data
+        except FileNotFoundError:
+            pass
+
+    data = render_qr(payload, fmt)
+    if persist:
+        write_atomic(path, data)
+        _evict(path.parent, getattr(settings, 'QR_DISK_CACHE_MAX_FILES', 1000))
+    return data
+
+
+def qr_image(payload: str, fmt: str = 'png', persist: bool = True):
+    """
+    Return (image_bytes, digest) for a payload. persist=False keeps short-lived
+    payloads (rotating tokens) in memory only.
+    """
+    if fmt not in CONTENT_TYPES:
+        raise ValueError(f"Unsupported QR format: {fmt}")
+    digest = payload_digest(payload, fmt)
+    return _cached_image(digest, payload, fmt, persist), digest
@@ -0,0 +1,67 @@
+import base64
+import hashlib
+import hmac
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+# Rotating attendance QR tokens: "<event_id>.<window>.<signature>".
+# The signature is an HMAC over (event_id, window) with a per-event key derived
+# from SECRET_KEY, so verifying a token needs no database access at all.
+
+KEY_SALT = "eventify.attendance-qr"
+
+
+def rotation_seconds() -> int:
+    return max(5, int(getattr(settings, 'ATTENDANCE_QR_ROTATE_SECONDS', 30)))
+
+
+def grace_seconds() -> int:
+    """How long a scanned token stays valid (covers the login step after scanning)."""
+    return max(0, int(getattr(settings, 'ATTENDANCE_QR_GRACE_SECONDS', 120)))
+
+
+@lru_cache(maxsize=1024)
+def _event_key(event_id: int, secret: str) -> bytes:
+    # secret is part of the cache key so a rotated SECRET_KEY is picked up
+    return salted_hmac(KEY_SALT, str(event_id), secret=secret, algorithm='sha256').digest()
+
+
+def _signature(event_id: int, window: int) -> str:
+    key = _event_key(event_id, settings.SECRET_KEY)
+    digest = hmac.new(key, f"{event_id}.{window}".encode(), hashlib.sha256).digest()[:12]
+    return base64.urlsafe_b64encode(digest).decode().rstrip('=')
+
+
+def current_window(at=None) -> int:
+    return int((time.time() if at is None else at) // rotation_seconds())
+
+
+def make_token(event_id: int, at=None) -> str:
+    window = current_window(at)
+    return f"{event_id}.{window}.{_signature(event_id, window)}"
+
+
+def seconds_until_rotation(at=None) -> int:
+    now = time.time() if at is None else at
+    period = rotation_seconds()
+    return int(period - (now % period)) or period
+
+
+def verify_token(token, at=None):
+    """Return the event id for a valid, unexpired token, else None."""
+    try:
+        event_part, window_part, signature = (token or '').split('.')
+        event_id, window = int(event_part), int(window_part)
+    except ValueError:
+        return None
+
+    now_window = current_window(at)
+    oldest = now_window - (grace_seconds() + rotation_seconds() - 1) // rotation_seconds()
+    if not (oldest <= window <= now_window):
+        return None
+    if not constant_time_compare(signature, _signature(event_id, window)):
+        return None
+    return event_id
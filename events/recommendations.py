@@ -0,0 +1,155 @@
+import hashlib
+import math
+import re
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Event, EventRegistration, EventTermIndex
+
+# Interest-based recommendations. Approved events are tokenized into
+# EventTermIndex (term -> event, weighted term frequency) when they are
+# approved, and dropped from it when they leave that state. A student's
+# Profile.interests are tokenized the same way; candidates are the events
+# sharing a term with them, scored by TF-IDF with document frequencies read
+# from the index. Results are cached per user, keyed by the interests and an
+# index version that every index change bumps.
+
+FIELD_WEIGHTS = {'title': 3.0, 'event_type': 2.0, 'description': 1.0}
+MAX_TERMS_PER_EVENT = 64
+MAX_INTEREST_TERMS = 32
+VERSION_KEY = 'recommendations:index-version'
+
+_WORD = re.compile(r'[^\W\d_]{3,}', re.UNICODE)
+STOPWORDS = frozenset("""
+    the and for with from this that will are was were been have has had not but you your our their
+    all any can into about more most other some such than then them they there these those what when
+    where which while who why how its also event events join welcome please day days
+""".split())
+
+
+def normalize_term(word):
+    word = word.lower()
+    # fold simple plurals so "workshops" matches "workshop"
+    if len(word) > 4 and word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    return word[:40]
+
+
+def tokenize(text):
+    return [normalize_term(word) for word in _WORD.findall(text or '') if word.lower() not in STOPWORDS]
+
+
+def event_term_weights(title, description, event_type):
+    """{term: weight} for one event: field-weighted counts, log-scaled."""
+    counts = Counter()
+    for field, text in (('title', title), ('description', description),
+                        ('event_type', (event_type or '').replace('_', ' '))):
+        for term in tokenize(text):
+            counts[term] += FIELD_WEIGHTS[field]
+    top = counts.most_common(MAX_TERMS_PER_EVENT)
+    return {term: 1.0 + math.log(count) for term, count in top}
+
+
+def interest_terms(interests):
+    terms = []
+    for interest in (interests or '').split(','):
+        for term in tokenize(interest):
+            if term not in terms:
+                terms.append(term)
+    return terms[:MAX_INTEREST_TERMS]
+
+
+def _bump_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def index_event(event):
+    """Replace an event's index rows: indexed while approved, removed otherwise."""
+    with transaction.atomic():
+        removed, _ = EventTermIndex.objects.filter(event_id=event.id).delete()
+        rows = []
+        if event.status == 'approved':
+            rows = [EventTermIndex(term=term, event_id=event.id, weight=weight)
+                    for term, weight in event_term_weights(event.title, event.description, event.event_type).items()]
+            EventTermIndex.objects.bulk_create(rows)
+    if removed or rows:
+        _bump_version()
+
+
+def rebuild_index(batch_size=2000):
+    """Re-index every approved event; returns the number indexed."""
+    events = Event.objects.filter(status='approved').only('id', 'title', 'description', 'event_type')
+    rows, count = [], 0
+    with transaction.atomic():
+        EventTermIndex.objects.all().delete()
+        for event in events.iterator(chunk_size=500):
+            count += 1
+            rows.extend(EventTermIndex(term=term, event_id=event.id, weight=weight)
+                        for term, weight in event_term_weights(event.title, event.description,
+                                                               event.event_type).items())
+            if len(rows) >= batch_size:
+                EventTermIndex.objects.bulk_create(rows)
+                rows = []
+        EventTermIndex.objects.bulk_create(rows)
+    _bump_version()
+    return count
+
+
+def _indexed_event_count(version):
+    return cache.get_or_set(f"recommendations:indexed-events:{version}",
+                            lambda: EventTermIndex.objects.values('event').distinct().count(), None)
+
+
+def score_events(terms, exclude_ids=(), limit=20, version=None):
+    """[(event_id, score)] for open approved events matching any of terms, best first."""
+    if not terms:
+        return []
+    indexed_events = _indexed_event_count(version or cache.get_or_set(VERSION_KEY, 1, None)) or 1
+    document_frequency = dict(EventTermIndex.objects
+                              .filter(term__in=terms)
+                              .order_by()
+                              .values_list('term')
+                              .annotate(n=Count('event')))
+    postings = (EventTermIndex.objects
+                .filter(term__in=terms, event__status='approved', event__registration_deadline__gte=timezone.now())
+                .exclude(event_id__in=exclude_ids)
+                .values_list('event_id', 'term', 'weight'))
+
+    scores = defaultdict(float)
+    for event_id, term, weight in postings:
+        scores[event_id] += weight * math.log(1 + indexed_events / document_frequency[term])
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def user_cache_key(user_id):
+    return f"recommendations:user:{user_id}"
+
+
+def recommended_event_ids(user, interests, limit=20):
+    """
+    Cached [(event_id, score)] for a user's interests, excluding events they
+    registered for. The entry is reused while the interests, the limit and
+    the index version are unchanged; registrations drop it (events/signals.py).
+    """
+    terms = interest_terms(interests)
+    if not terms:
+        return []
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    fingerprint = (version, limit, hashlib.sha1(','.join(terms).encode()).hexdigest())
+    cached = cache.get(user_cache_key(user.id))
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    registered = EventRegistration.objects.filter(student=user).values('event_id')
+    ranked = score_events(terms, exclude_ids=registered, limit=limit, version=version)
+    cache.set(user_cache_key(user.id), (fingerprint, ranked),
+              getattr(settings, 'RECOMMENDATIONS_CACHE_TTL', 10 * 60))
+    return ranked
@@ -0,0 +1,111 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import DailyEventRollup, EventFeedback, EventRegistration
+
+# Daily rollups: registrations are counted on the day they were made,
+# check-ins on the day they were marked and feedback on the day it was sent,
+# all in the project's local time. The watermark is the latest rolled-up day;
+# each run recomputes from a few days before it (late check-ins replayed from
+# scanners carry their original time) through yesterday, so it is idempotent.
+
+METRICS = ('registrations', 'attendances', 'feedbacks', 'rating_sum')
+GROUPS = ('date', 'department', 'event_type', 'event')
+
+
+def _lookback_days():
+    return getattr(settings, 'EVENT_ROLLUP_LOOKBACK_DAYS', 3)
+
+
+def _window(first, last):
+    tz = timezone.get_current_timezone()
+    start = timezone.make_aware(datetime.combine(first, time.min), tz)
+    end = timezone.make_aware(datetime.combine(last + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def _grouped(queryset, timestamp, department, start, end, **metrics):
+    return (queryset
+            .filter(**{f'{timestamp}__gte': start, f'{timestamp}__lt': end})
+            .annotate(day=TruncDate(timestamp, tzinfo=timezone.get_current_timezone()),
+                      department_key=F(department), event_type_key=F('event__event_type'))
+            .order_by()
+            .values('day', 'event_id', 'department_key', 'event_type_key')
+            .annotate(**metrics))
+
+
+def compute_rollups(first, last):
+    """Unsaved DailyEventRollup rows for the local days first..last, from three grouped queries."""
+    start, end = _window(first, last)
+    sources = [
+        _grouped(EventRegistration.objects.all(), 'registration_date', 'student__department', start, end,
+                 registrations=Count('id')),
+        _grouped(EventRegistration.objects.filter(attended=True), 'attendance_marked_at', 'student__department',
+                 start, end, attendances=Count('id')),
+        _grouped(EventFeedback.objects.all(), 'created_at', 'Student__department', start, end,
+                 feedbacks=Count('id'), rating_sum=Sum('rating')),
+    ]
+    rows = {}
+    for source in sources:
+        for values in source:
+            key = (values['day'], values['event_id'], values['department_key'] or '')
+            row = rows.get(key)
+            if row is None:
+                row = rows[key] = DailyEventRollup(date=key[0], event_id=key[1], department=key[2],
+                                                   event_type=values['event_type_key'])
+            for metric in METRICS:
+                if metric in values:
+                    setattr(row, metric, values[metric])
+    return list(rows.values())
+
+
+def rollup_days(first, last, batch_size=1000):
+    """Replace the rollups of days first..last; returns the number of rows written."""
+    rows = compute_rollups(first, last)
+    with transaction.atomic():
+        DailyEventRollup.objects.filter(date__range=(first, last)).delete()
+        DailyEventRollup.objects.bulk_create(rows, batch_size=batch_size)
+    return len(rows)
+
+
+def next_rollup_window(today=None):
+    """(first, last) days the next run should rebuild, or None if there is nothing to do."""
+    last = (today or timezone.localdate()) - timedelta(days=1)
+    watermark = DailyEventRollup.objects.aggregate(latest=Max('date'))['latest']
+    if watermark is not None:
+        first = watermark - timedelta(days=_lookback_days())
+    else:
+        earliest = EventRegistration.objects.aggregate(earliest=Min('registration_date'))['earliest']
+        if earliest is None:
+            return None
+        first = timezone.localdate(earliest)
+    return (first, last) if first <= last else None
+
+
+def update_rollups(today=None):
+    window = next_rollup_window(today)
+    if window is None:
+        return {'rows': 0}
+    first, last = window
+    return {'first': first.isoformat(), 'last': last.isoformat(), 'rows': rollup_days(first, last)}
+
+
+def rollup_series(queryset, group_by='date'):
+    """Sum the metrics of a DailyEventRollup queryset per group_by value."""
+    fields = ['event', 'event__title'] if group_by == 'event' else [group_by]
+    rows = (queryset
+            .order_by()
+            .values(*fields)
+            .annotate(**{metric: Sum(metric) for metric in METRICS})
+            .order_by(*fields))
+    series = []
+    for row in rows:
+        rating_sum, feedbacks = row.pop('rating_sum'), row['feedbacks']
+        row['average_rating'] = round(rating_sum / feedbacks, 2) if feedbacks else None
+        series.append(row)
+    return series
@@ -0,0 +1,100 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Event
+
+# Full-text event search. On SQLite the title, description and venue of every
+# event are indexed in the FTS5 table events_event_fts (rowid = event id),
+# created by migration 0012 and kept current by events/signals.py. A search
+# reads the FTS index, ranks with bm25 and joins events by primary key only
+# for the visibility check, so the events table itself is never scanned.
+# Other databases (or SQLite builds without FTS5) fall back to icontains.
+
+FTS_TABLE = 'events_event_fts'
+# bm25 column weights (title, description, venue): a hit in the title counts
+# most, then the venue; the long description counts least
+COLUMN_WEIGHTS = (10.0, 1.0, 2.0)
+MAX_TERMS = 8
+
+_TOKEN = re.compile(r'\w+', re.UNICODE)
+_fts_tables = {}
+
+
+def fts_available(using=connection):
+    alias = using.alias
+    if alias not in _fts_tables:
+        _fts_tables[alias] = using.vendor == 'sqlite' and FTS_TABLE in using.introspection.table_names()
+    return _fts_tables[alias]
+
+
+def search_terms(query):
+    return _TOKEN.findall(query or '')[:MAX_TERMS]
+
+
+def match_expression(terms):
+    # every term quoted (so FTS5 operators in user input are plain text) and
+    # prefix-matched, ANDed together
+    return ' '.join('"{}"*'.format(term.replace('"', '')) for term in terms)
+
+
+def index_event(event_id, title, description, venue):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event_id])
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, title, description, venue) VALUES (%s, %s, %s, %s)",
+                       [event_id, title or '', description or '', venue or ''])
+
+
+def unindex_event(event_id):
+    if not fts_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [event_id])
+
+
+def rebuild_index():
+    """Re-index every event; returns the number indexed."""
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(f"INSERT INTO {FTS_TABLE} (rowid, title, description, venue) "
+                       f"SELECT id, title, description, venue FROM {Event._meta.db_table}")
+        return cursor.rowcount
+
+
+def _visibility(user):
+    # same rules as EventListCreateView
+    if user.is_student():
+        return "e.status = 'approved'", [], Q(status='approved')
+    if user.is_department() or user.is_organization():
+        return "(e.status = 'approved' OR e.organizer_id = %s)", [user.id], Q(status='approved') | Q(organizer=user)
+    return "1 = 1", [], Q()
+
+
+def search_event_ids(user, query, limit=20, offset=0):
+    """Ids of the events matching query that user may see, best match first."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    visible_sql, visible_params, visible_q = _visibility(user)
+
+    if not fts_available():
+        matches = Q()
+        for term in terms:
+            matches &= Q(title__icontains=term) | Q(description__icontains=term) | Q(venue__icontains=term)
+        return list(Event.objects.filter(matches & visible_q)
+                    .order_by('-start_date')
+                    .values_list('id', flat=True)[offset:offset + limit])
+
+    sql = (f"SELECT f.rowid FROM {FTS_TABLE} f "
+           f"JOIN {Event._meta.db_table} e ON e.id = f.rowid "
+           f"WHERE {FTS_TABLE} MATCH %s AND {visible_sql} "
+           f"ORDER BY bm25({FTS_TABLE}, %s, %s, %s) LIMIT %s OFFSET %s")
+    params = [match_expression(terms), *visible_params, *COLUMN_WEIGHTS, limit, offset]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.utils import timezone
+from django.urls import reverse
 from .models import Event, EventRegistration, EventFeedback, EventConflict
+from .qr import payload_digest, static_attendance_url
 from users.serializers import UserProfileSerializer
 
 
@@ -10,21 +12,34 @@ class EventSerializer(serializers.ModelSerializer):
     registered_count = serializers.SerializerMethodField()
     available_slots = serializers.SerializerMethodField()
     is_registration_open = serializers.SerializerMethodField()
+    qr_image_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Event
         fields = '__all__'
         read_only_fields = ['organizer', 'approved_by', 'status', 'qr_code', 'created_at', 'updated_at']
 
+    # list views annotate confirmed_count (see events.views.with_registered_count)
+    # so these do not run a COUNT per event
     def get_registered_count(self, obj):
-        return obj.get_registered_count()
+        count = getattr(obj, 'confirmed_count', None)
+        return obj.get_registered_count() if count is None else count
 
     def get_available_slots(self, obj):
-        return obj.get_available_slots()
+        count = getattr(obj, 'confirmed_count', None)
+        return obj.get_available_slots() if count is None else max(0, obj.max_participants - count)
 
     def get_is_registration_open(self, obj):
         return obj.is_registration_open()
 
+    def get_qr_image_url(self, obj):
+        if not obj.qr_code_data:
+            return None
+        digest = payload_digest(static_attendance_url(obj), 'png')[:16]
+        url = f"{reverse('event-qr', args=[obj.id, 'png'])}?v={digest}"
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+
     def validate(self, attrs):
         if attrs.get('start_date') and attrs.get('end_date'):
             if attrs['start_date'] >= attrs['end_date']:
@@ -54,10 +69,19 @@ class EventSerializer(serializers.ModelSerializer):
             # Remove both the image/file field and the raw QR value
             data.pop('qr_code', None)
             data.pop('qr_code_data', None)
+            data.pop('qr_image_url', None)
 
         return data
 
 
+class RegisteredEventSerializer(EventSerializer):
+    # An event as seen by a registered student; the registration fields are
+    # annotated onto the Event rows by my_events.
+    registration_status = serializers.CharField(read_only=True)
+    attended = serializers.BooleanField(read_only=True)
+    feedback_given = serializers.BooleanField(read_only=True)
+
+
 class EventCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Event
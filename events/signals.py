@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Event, EventFeedback, EventRegistration
+from .recommendations import index_event as index_event_terms, user_cache_key
+from .search import index_event, unindex_event
+from .stats import bump_event_stats, refresh_event_stats
+
+SEARCH_FIELDS = {'title', 'description', 'venue'}
+RECOMMENDATION_FIELDS = {'status', 'title', 'description', 'event_type'}
+
+
+def _registration_state(registration, update_fields=None, previous=None):
+    # (counts as confirmed, counts as attended); fields left out of a partial
+    # save keep their previous value, since the database did not change them
+    confirmed, attended = registration.status == 'confirmed', registration.attended
+    if update_fields is not None and previous is not None:
+        if 'status' not in update_fields:
+            confirmed = previous[0]
+        if 'attended' not in update_fields:
+            attended = previous[1]
+    return confirmed, attended
+
+
+@receiver(post_save, sender=EventRegistration)
+def registration_saved(sender, instance, created, update_fields=None, **kwargs):
+    previous = getattr(instance, '_stats_state', None)
+    if created:
+        confirmed, attended = _registration_state(instance)
+        bump_event_stats(instance.event_id, total_registrations=1,
+                         confirmed_registrations=int(confirmed), attended_count=int(attended))
+    elif previous is None:
+        # loaded without status/attended, so the change is unknown
+        refresh_event_stats(instance.event_id)
+    else:
+        confirmed, attended = _registration_state(instance, update_fields, previous)
+        bump_event_stats(instance.event_id,
+                         confirmed_registrations=int(confirmed) - int(previous[0]),
+                         attended_count=int(attended) - int(previous[1]))
+    instance._stats_state = _registration_state(instance, update_fields, previous)
+
+
+@receiver(post_delete, sender=EventRegistration)
+def registration_deleted(sender, instance, **kwargs):
+    confirmed, attended = getattr(instance, '_stats_state', None) or _registration_state(instance)
+    bump_event_stats(instance.event_id, create=False, total_registrations=-1,
+                     confirmed_registrations=-int(confirmed), attended_count=-int(attended))
+
+
+@receiver(post_save, sender=EventFeedback)
+def feedback_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_event_stats(instance.event_id, feedback_count=1,
+                         rating_sum=instance.rating,
+                         content_rating_sum=instance.content_quality_rating,
+                         organization_rating_sum=instance.organization_rating)
+    else:
+        # ratings edited (admin only); the old values are not known here
+        refresh_event_stats(instance.event_id)
+
+
+@receiver(post_delete, sender=EventFeedback)
+def feedback_deleted(sender, instance, **kwargs):
+    bump_event_stats(instance.event_id, create=False, feedback_count=-1,
+                     rating_sum=-instance.rating,
+                     content_rating_sum=-instance.content_quality_rating,
+                     organization_rating_sum=-instance.organization_rating)
+
+
+# Search index (events/search.py). Kept in Python rather than SQLite triggers:
+# the SQLite schema editor rebuilds events_event on most AlterField
+# migrations, which would silently drop triggers on it.
+
+@receiver(post_save, sender=Event)
+def event_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not SEARCH_FIELDS & set(update_fields):
+        return
+    index_event(instance.id, instance.title, instance.description, instance.venue)
+
+
+@receiver(post_delete, sender=Event)
+def event_deleted(sender, instance, **kwargs):
+    unindex_event(instance.id)
+
+
+# Interest index (events/recommendations.py): events enter it when approved
+# and leave it on any other status; deleted events cascade out of it.
+
+@receiver(post_save, sender=Event)
+def event_terms_saved(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not RECOMMENDATION_FIELDS & set(update_fields):
+        return
+    if created and instance.status != 'approved':
+        return
+    index_event_terms(instance)
+
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def registration_recommendations_changed(sender, instance, **kwargs):
+    # registered events are excluded from a student's recommendations
+    cache.delete(user_cache_key(instance.student_id))
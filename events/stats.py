@@ -0,0 +1,116 @@
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import EventRegistration, EventStats
+
+# EventStats holds per-event counters and rating sums. Writes bump them with
+# F() updates (events/signals.py, attendance.apply_checkins); anything the
+# signals cannot see is corrected by recomputing from the source tables with
+# one conditional-aggregation query.
+
+STATS_FIELDS = (
+    'total_registrations', 'confirmed_registrations', 'attended_count',
+    'feedback_count', 'rating_sum', 'content_rating_sum', 'organization_rating_sum',
+)
+
+# Feedback is one-to-one with its registration, so joining it onto the
+# registrations does not multiply rows and every counter fits in one pass.
+_AGGREGATES = {
+    'total_registrations': Count('id'),
+    'confirmed_registrations': Count('id', filter=Q(status='confirmed')),
+    'attended_count': Count('id', filter=Q(attended=True)),
+    'feedback_count': Count('feedback'),
+    'rating_sum': Sum('feedback__rating', default=0),
+    'content_rating_sum': Sum('feedback__content_quality_rating', default=0),
+    'organization_rating_sum': Sum('feedback__organization_rating', default=0),
+}
+
+
+def compute_event_stats(event_id):
+    """Counters for one event straight from the source tables, in a single query."""
+    return EventRegistration.objects.filter(event_id=event_id).aggregate(**_AGGREGATES)
+
+
+def compute_all_event_stats():
+    """{event_id: counters} for every event with registrations, in a single grouped query."""
+    rows = (EventRegistration.objects
+            .order_by()
+            .values('event_id')
+            .annotate(**_AGGREGATES))
+    return {row.pop('event_id'): row for row in rows}
+
+
+def refresh_event_stats(event_id):
+    """Rebuild an event's stats row from the source tables and return it."""
+    values = compute_event_stats(event_id)
+    stats = EventStats(event_id=event_id, **values)
+    if not EventStats.objects.filter(event_id=event_id).update(updated_at=timezone.now(), **values):
+        try:
+            with transaction.atomic():
+                stats.save(force_insert=True)
+        except IntegrityError:
+            # another request created the row first; ours is just as current
+            EventStats.objects.filter(event_id=event_id).update(updated_at=timezone.now(), **values)
+    return stats
+
+
+def bump_event_stats(event_id, create=True, **deltas):
+    """
+    Add deltas to an event's counters with one UPDATE. A missing row is built
+    from the source tables instead (which already include the change), unless
+    create is False, as during deletes where the event may be going away too.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    updated = EventStats.objects.filter(event_id=event_id).update(
+        updated_at=timezone.now(),
+        **{field: F(field) + delta for field, delta in deltas.items()},
+    )
+    if not updated and create:
+        refresh_event_stats(event_id)
+
+
+def _average(total, count):
+    return round(total / count, 2) if count else 0
+
+
+def statistics_payload(event, stats):
+    confirmed = stats.confirmed_registrations
+    attended = stats.attended_count
+    feedback = stats.feedback_count
+    return {
+        'event_title': event.title,
+        'total_registrations': stats.total_registrations,
+        'confirmed_registrations': confirmed,
+        'attended_count': attended,
+        'attendance_rate': (attended / confirmed * 100) if confirmed > 0 else 0,
+        'feedback_count': feedback,
+        'feedback_rate': (feedback / attended * 100) if attended > 0 else 0,
+        'average_rating': _average(stats.rating_sum, feedback),
+        'average_content_rating': _average(stats.content_rating_sum, feedback),
+        'average_organization_rating': _average(stats.organization_rating_sum, feedback),
+    }
+
+
+def reconcile_all_event_stats(batch_size=500):
+    """
+    Compare every stats row with the source tables and fix what drifted
+    (writes that bypassed the signals, e.g. queryset.update() or raw SQL).
+    Drifted rows are recomputed individually so F() bumps that landed
+    since the grouped read are not overwritten. Returns (fixed, created).
+    """
+    computed = compute_all_event_stats()
+    zero = dict.fromkeys(STATS_FIELDS, 0)
+
+    fixed = 0
+    for stats in EventStats.objects.only('event_id', *STATS_FIELDS).iterator(chunk_size=batch_size):
+        values = computed.pop(stats.event_id, zero)
+        if any(getattr(stats, field) != values[field] for field in STATS_FIELDS):
+            refresh_event_stats(stats.event_id)
+            fixed += 1
+
+    missing = [EventStats(event_id=event_id, **values) for event_id, values in computed.items()]
+    EventStats.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+    return fixed, len(missing)
@@ -0,0 +1,31 @@
+from celery import shared_task
+from .attendance import replay_orphaned_logs
+from .coattendance import rebuild_similarities
+from .rollups import update_rollups
+from .stats import reconcile_all_event_stats
+
+
+@shared_task
+def flush_attendance_logs():
+    # Safety net for the write-behind buffer: replays logs left by stopped web processes.
+    return replay_orphaned_logs()
+
+
+@shared_task
+def reconcile_event_stats():
+    # Nightly (schedule it in django-celery-beat): repairs EventStats rows that
+    # drifted from the registration/feedback tables.
+    fixed, created = reconcile_all_event_stats()
+    return {'fixed': fixed, 'created': created}
+
+
+@shared_task
+def rollup_daily_events():
+    # Nightly, after midnight local time: brings DailyEventRollup up to yesterday.
+    return update_rollups()
+
+
+@shared_task
+def build_event_similarities():
+    # Nightly: recomputes the "students like you also attended" table.
+    return {'rows': rebuild_similarities()}
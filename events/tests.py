@@ -1,3 +1,571 @@
-from django.test import TestCase
+import json
+import os
+import statistics
+import tempfile
+from datetime import datetime, time, timedelta
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db.models import Count, Sum
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from users.models import CollegeStudent, User
+from . import attendance, calendar, qr_tokens
+from .coattendance import coattendance_recommendations, rebuild_similarities
+from .feedback_analytics import compute_feedback_analytics
+from .models import DailyEventRollup, Event, EventFeedback, EventRegistration, EventStats
+from .rollups import update_rollups
+from .qr import payload_digest, static_attendance_url
+from .search import fts_available, search_event_ids
+from .stats import STATS_FIELDS, compute_event_stats
+from .views import mark_attendance_for_user
+
+QR_FIELDS = {'qr_code', 'qr_code_data', 'qr_image_url'}
+
+
+class MyEventsResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(username='dept4', email='dept4@x.com', phone_number='d4',
+                                            role='Department', department='it')
+        cls.admin = User.objects.create(username='admin4', email='admin4@x.com', phone_number='a4', role='Admin')
+        cls.student = User.objects.create(username='stud4', email='stud4@x.com', phone_number='s4', role='Student')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Workshop', description='-', event_level='college', event_type='workshop',
+            start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall',
+            organizer=cls.organizer, registration_deadline=now + timedelta(days=1), status='approved',
+            qr_code_data='token',
+        )
+        EventRegistration.objects.create(event=cls.event, student=cls.student, status='confirmed')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('my-events')
+
+    def get(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_organizer_and_admin_lists_keep_qr_fields_out(self):
+        for user in (self.organizer, self.admin):
+            [event] = self.get(user)
+            self.assertFalse(QR_FIELDS & event.keys())
+            self.assertEqual(event['registered_count'], 1)
+
+    def test_student_list_has_registration_fields(self):
+        [event] = self.get(self.student)['results']
+        self.assertFalse(QR_FIELDS & event.keys())
+        self.assertEqual(event['registration_status'], 'confirmed')
+        self.assertEqual(event['registered_count'], 1)
+
+
+class CoattendanceRecommendationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(username='dept5', email='dept5@x.com', phone_number='d5',
+                                        role='Department', department='it')
+        cls.students = [User.objects.create(username=f'stud5{i}', email=f'stud5{i}@x.com', phone_number=f's5{i}',
+                                            role='Student') for i in range(4)]
+        now = timezone.now()
+
+        def event(title, days, deadline_days):
+            return Event.objects.create(
+                title=title, description='-', event_level='college', event_type='workshop',
+                start_date=now + timedelta(days=days), end_date=now + timedelta(days=days, hours=2), venue='Hall',
+                organizer=organizer, registration_deadline=now + timedelta(days=deadline_days), status='approved',
+            )
+
+        cls.past = event('Past workshop', -10, -11)
+        cls.upcoming = event('Upcoming workshop', 10, 9)
+        for student in cls.students:
+            EventRegistration.objects.create(event=cls.past, student=student, status='confirmed', attended=True)
+        for student in cls.students[:3]:
+            EventRegistration.objects.create(event=cls.upcoming, student=student, status='confirmed')
+
+    def test_upcoming_event_registered_by_similar_students_is_recommended(self):
+        self.assertGreater(rebuild_similarities(), 0)
+        [(event_id, score, matched)] = coattendance_recommendations(self.students[3])
+        self.assertEqual((event_id, matched), (self.upcoming.id, 1))
+        self.assertGreater(score, 0)
+
+        client = APIClient()
+        client.force_authenticate(self.students[3])
+        response = client.get(reverse('event-recommended-coattendance'))
+        self.assertEqual([item['id'] for item in response.json()['results']], [self.upcoming.id])
+
+    def test_registered_events_are_not_recommended(self):
+        rebuild_similarities()
+        self.assertEqual(coattendance_recommendations(self.students[0]), [])
+
+
+@override_settings(ATTENDANCE_QR_ROTATE_SECONDS=30, ATTENDANCE_QR_GRACE_SECONDS=60)
+class AttendanceQrTokenTests(TestCase):
+    NOW = 1_700_000_000
+
+    def test_valid_token(self):
+        token = qr_tokens.make_token(7, at=self.NOW)
+        self.assertEqual(qr_tokens.verify_token(token, at=self.NOW), 7)
+        self.assertEqual(qr_tokens.verify_token(token, at=self.NOW + 60), 7)
+
+    def test_expired_token(self):
+        token = qr_tokens.make_token(7, at=self.NOW)
+        self.assertIsNone(qr_tokens.verify_token(token, at=self.NOW + 120))
+
+    def test_token_for_another_event(self):
+        _, window, signature = qr_tokens.make_token(7, at=self.NOW).split('.')
+        self.assertIsNone(qr_tokens.verify_token(f"8.{window}.{signature}", at=self.NOW))
+
+    def test_tampered_signature(self):
+        token = qr_tokens.make_token(7, at=self.NOW)
+        tampered = token[:-1] + ('A' if token[-1] != 'A' else 'B')
+        self.assertIsNone(qr_tokens.verify_token(tampered, at=self.NOW))
+        self.assertIsNone(qr_tokens.verify_token('garbage', at=self.NOW))
+
+    def test_bad_token_is_rejected_before_any_query(self):
+        token = qr_tokens.make_token(7)
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('attendance-verify'), {'t': token[:-2] + 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_static_qr_links_are_rejected_by_default(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('attendance-verify'), {'event_id': 7, 'qr': 'static'})
+        self.assertEqual(response.status_code, 400)
+
+
+class AttendanceBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(username='dept6', email='dept6@x.com', phone_number='d6',
+                                        role='Department', department='it')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Gate check-in', description='-', event_level='college', event_type='workshop',
+            start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall',
+            organizer=organizer, registration_deadline=now + timedelta(days=1), status='approved',
+        )
+        cls.registrations = [
+            EventRegistration.objects.create(
+                event=cls.event, status='confirmed',
+                student=User.objects.create(username=f'stud6{i}', email=f'stud6{i}@x.com',
+                                            phone_number=f's6{i}', role='Student'))
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def attended(self):
+        return set(EventRegistration.objects.filter(event=self.event, attended=True).values_list('id', flat=True))
+
+    def write_log(self, owner, registrations):
+        path = self.directory / f"{attendance.LOG_PREFIX}{owner}.log"
+        with open(path, 'w') as fh:
+            for registration in registrations:
+                fh.write(json.dumps({'e': self.event.id, 'r': registration.id, 't': timezone.now().isoformat()}) + "\n")
+        return path
+
+    def test_flush_applies_the_log_and_removes_it(self):
+        buffer = attendance.AttendanceBuffer(self.directory)
+        for registration in self.registrations[:2]:
+            buffer.append(self.event.id, registration.id, timezone.now())
+        self.assertEqual(buffer.flush(), 2)
+        self.assertEqual(self.attended(), {r.id for r in self.registrations[:2]})
+        self.assertEqual([p.suffix for p in self.directory.iterdir()], ['.lock'])
+
+    def test_crashed_process_log_is_replayed(self):
+        self.write_log('otherhost_4242_deadbeef', self.registrations)
+        self.assertEqual(attendance.replay_orphaned_logs(self.directory), 3)
+        self.assertEqual(len(self.attended()), 3)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_same_pid_after_restart_is_still_replayed(self):
+        # a restarted container gets the same pid but a new owner nonce
+        host, pid, _ = attendance.process_owner().rsplit('_', 2)
+        self.write_log(f"{host}_{pid}_0ldb00t0", self.registrations[:1])
+        self.assertEqual(attendance.replay_orphaned_logs(self.directory), 1)
+
+    def test_live_owner_log_is_left_alone(self):
+        owner = 'otherhost_4242_a1b2c3d4'
+        path = self.write_log(owner, self.registrations[:1])
+        fd = attendance._try_lock(attendance._lock_path(self.directory, owner))
+        try:
+            self.assertEqual(attendance.replay_orphaned_logs(self.directory), 0)
+            self.assertTrue(path.exists())
+        finally:
+            os.close(fd)
+        self.assertEqual(attendance.replay_orphaned_logs(self.directory), 1)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_record_checkin_counts_live_and_once(self):
+        with override_settings(ATTENDANCE_LOG_DIR=str(self.directory), ATTENDANCE_FLUSH_INTERVAL=3600):
+            attendance._buffer = None
+            self.addCleanup(setattr, attendance, '_buffer', None)
+            registration = self.registrations[0]
+            self.assertEqual(attendance.live_attendance_count(self.event.id), 0)
+            self.assertTrue(attendance.record_checkin(registration))
+            self.assertFalse(attendance.record_checkin(registration))
+            self.assertEqual(attendance.live_attendance_count(self.event.id), 1)
+            self.assertEqual(self.attended(), set())
+            attendance.get_buffer().flush()
+            self.assertEqual(self.attended(), {registration.id})
+            self.assertEqual(attendance.live_attendance_count(self.event.id), 1)
+
+
+class RegenerateQrCodesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(username='dept7', email='dept7@x.com', phone_number='d7',
+                                        role='Department', department='it')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Moved', description='-', event_level='college', event_type='workshop',
+            start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall',
+            organizer=organizer, registration_deadline=now + timedelta(days=1), status='approved',
+            qr_code_data='token',
+        )
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.directory = Path(tmp.name)
+
+    def test_rewrites_cache_for_new_domain(self):
+        with override_settings(SITE_DOMAIN='old.example', QR_DISK_CACHE_DIR=str(self.directory)):
+            old = self.directory / f"{payload_digest(static_attendance_url(self.event), 'png')}.png"
+        old.write_bytes(b'old')
+
+        with override_settings(SITE_DOMAIN='new.example:8000', QR_DISK_CACHE_DIR=str(self.directory)):
+            call_command('regenerate_qr_codes', workers=1, stdout=StringIO())
+            payload = static_attendance_url(self.event)
+        self.assertIn('http://new.example:8000/', payload)
+        self.assertFalse(old.exists())
+        new = self.directory / f"{payload_digest(payload, 'png')}.png"
+        self.assertTrue(new.read_bytes().startswith(b'\x89PNG'))
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.qr_code_data, 'token')
+
+    def test_rotate_tokens(self):
+        with override_settings(QR_DISK_CACHE_DIR=str(self.directory)):
+            call_command('regenerate_qr_codes', workers=1, rotate_tokens=True, stdout=StringIO())
+        self.event.refresh_from_db()
+        self.assertTrue(self.event.qr_code_data.startswith(f'eventify_attendance_{self.event.id}_'))
+        self.assertFalse(self.event.qr_code)
+
+
+@override_settings(ATTENDANCE_WRITE_BEHIND=False)
+class EventStatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(username='dept8', email='dept8@x.com', phone_number='d8',
+                                            role='Department', department='it')
+        now = timezone.now()
+        cls.event = Event.objects.create(
+            title='Stats', description='-', event_level='college', event_type='workshop',
+            start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall',
+            organizer=cls.organizer, registration_deadline=now + timedelta(days=1), status='approved',
+            qr_code_data='token',
+        )
+        cls.students = []
+        for i in range(3):
+            student = User.objects.create(username=f'stats{i}', email=f'stats{i}@x.com',
+                                          phone_number=f'st{i}', role='Student')
+            CollegeStudent.objects.create(name=f'Stats {i}', username=student.username, role='Student',
+                                          department='it', email=student.email)
+            cls.students.append(student)
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def assertStatsMatch(self, **expected):
+        stats = EventStats.objects.get(event=self.event)
+        self.assertEqual({field: getattr(stats, field) for field in STATS_FIELDS},
+                         compute_event_stats(self.event.id))
+        for field, value in expected.items():
+            self.assertEqual(getattr(stats, field), value, field)
+
+    def test_register_cancel_attend(self):
+        for student in self.students:
+            self.client.force_authenticate(student)
+            response = self.client.post(reverse('register-event', args=[self.event.id]))
+            self.assertEqual(response.status_code, 201)
+        self.assertStatsMatch(total_registrations=3, confirmed_registrations=3, attended_count=0)
+
+        self.client.force_authenticate(self.students[0])
+        self.assertEqual(self.client.post(reverse('cancel-registration', args=[self.event.id])).status_code, 200)
+        self.assertStatsMatch(total_registrations=3, confirmed_registrations=2)
+
+        for student in self.students:
+            mark_attendance_for_user(student, self.event, 'token')
+        self.assertStatsMatch(confirmed_registrations=2, attended_count=2)
+
+        # rows loaded without status/attended are recounted from the source tables
+        registration = EventRegistration.objects.only('id', 'event_id', 'student_id').get(student=self.students[1])
+        registration.save()
+        self.assertStatsMatch(attended_count=2)
+
+        registration = EventRegistration.objects.get(student=self.students[1])
+        EventFeedback.objects.create(event=self.event, Student=self.students[1], registration=registration,
+                                     rating=4, content_quality_rating=5, organization_rating=3)
+        self.assertStatsMatch(feedback_count=1, rating_sum=4, content_rating_sum=5, organization_rating_sum=3)
+
+        registration.delete()
+        self.assertStatsMatch(total_registrations=2, confirmed_registrations=1, attended_count=1,
+                              feedback_count=0, rating_sum=0)
+
+        self.client.force_authenticate(self.organizer)
+        response = self.client.get(reverse('event-statistics', args=[self.event.id]))
+        self.assertEqual(response.data['confirmed_registrations'], 1)
+        self.assertEqual(response.data['attendance_rate'], 100)
+
+
+class DailyRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        organizer = User.objects.create(username='dept9', email='dept9@x.com', phone_number='d9',
+                                        role='Department', department='it')
+        tz = timezone.get_current_timezone()
+        cls.day = timezone.localdate() - timedelta(days=2)
+        # just after local midnight: the UTC date is the day before
+        early = timezone.make_aware(datetime.combine(cls.day, time(0, 30)), tz)
+        late = timezone.make_aware(datetime.combine(cls.day, time(23, 30)), tz)
+        event = Event.objects.create(
+            title='Rollup', description='-', event_level='college', event_type='seminar',
+            start_date=early, end_date=late, venue='Hall', organizer=organizer,
+            registration_deadline=early, status='approved', qr_code_data='token',
+        )
+        for i, (department, registered, attended) in enumerate([
+            ('it', early, early), ('it', late, None), ('civil', early - timedelta(hours=1), late),
+            ('civil', late + timedelta(hours=1), None),
+        ]):
+            student = User.objects.create(username=f'roll{i}', email=f'roll{i}@x.com', phone_number=f'r{i}',
+                                          role='Student', department=department)
+            registration = EventRegistration.objects.create(event=event, student=student, status='confirmed',
+                                                            attended=attended is not None,
+                                                            attendance_marked_at=attended)
+            EventRegistration.objects.filter(pk=registration.pk).update(registration_date=registered)
+            if attended:
+                feedback = EventFeedback.objects.create(event=event, Student=student, registration=registration,
+                                                        rating=i + 2, content_quality_rating=3,
+                                                        organization_rating=3)
+                EventFeedback.objects.filter(pk=feedback.pk).update(created_at=attended)
+
+    def direct(self, queryset, timestamp, department, **metrics):
+        start = timezone.make_aware(datetime.combine(self.day, time.min))
+        rows = (queryset.filter(**{f'{timestamp}__gte': start, f'{timestamp}__lt': start + timedelta(days=1)})
+                .order_by().values(department).annotate(**metrics))
+        return {row.pop(department) or '': row for row in rows}
+
+    def rolled_up(self, *metrics):
+        rows = (DailyEventRollup.objects.filter(date=self.day).order_by().values('department')
+                .annotate(**{metric: Sum(metric) for metric in metrics}))
+        return {row['department']: {metric: row[metric] for metric in metrics}
+                for row in rows if any(row[metric] for metric in metrics)}
+
+    def test_day_matches_direct_aggregate(self):
+        update_rollups(today=self.day + timedelta(days=1))
+        update_rollups(today=self.day + timedelta(days=1))  # reruns replace, not add
+
+        self.assertEqual(self.rolled_up('registrations'), self.direct(
+            EventRegistration.objects.all(), 'registration_date', 'student__department',
+            registrations=Count('id')))
+        self.assertEqual(self.rolled_up('attendances'), self.direct(
+            EventRegistration.objects.filter(attended=True), 'attendance_marked_at', 'student__department',
+            attendances=Count('id')))
+        self.assertEqual(self.rolled_up('feedbacks', 'rating_sum'), self.direct(
+            EventFeedback.objects.all(), 'created_at', 'Student__department',
+            feedbacks=Count('id'), rating_sum=Sum('rating')))
+        # the civil registrations fall an hour either side of the day
+        self.assertEqual(self.rolled_up('registrations'), {'it': {'registrations': 2}})
+        self.assertEqual(self.rolled_up('attendances'), {'it': {'attendances': 1}, 'civil': {'attendances': 1}})
+
+
+class FeedbackAnalyticsTests(TestCase):
+    # (organizer index, event type, semester, [(rating, content, organization, would_recommend), ...])
+    EVENTS = [
+        (0, 'workshop', '1', [(5, 4, 3, True), (4, 4, 5, True), (2, 1, 3, False)]),
+        (0, 'seminar', None, [(3, 5, 5, True)]),
+        (1, 'workshop', '2', [(1, 2, 2, False), (5, 5, 4, True)]),
+        (1, 'seminar', '2', []),
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        organizers = [
+            User.objects.create(username='fa-it', email='fa-it@x.com', phone_number='fa0', role='Department',
+                                department='it'),
+            User.objects.create(username='fa-civil', email='fa-civil@x.com', phone_number='fa1',
+                                role='Department', department='civil'),
+        ]
+        now = timezone.now()
+        student_no = 0
+        cls.feedback = []
+        for organizer, event_type, semester, ratings in cls.EVENTS:
+            event = Event.objects.create(
+                title='Rated', description='-', event_level='college', event_type=event_type, semester=semester,
+                start_date=now - timedelta(days=3), end_date=now - timedelta(days=2), venue='Hall',
+                organizer=organizers[organizer], registration_deadline=now - timedelta(days=4),
+                status='completed', qr_code_data='token',
+            )
+            for rating, content, organization, recommend in ratings:
+                student_no += 1
+                student = User.objects.create(username=f'fa{student_no}', email=f'fa{student_no}@x.com',
+                                              phone_number=f'fas{student_no}', role='Student')
+                registration = EventRegistration.objects.create(event=event, student=student,
+                                                                status='confirmed', attended=True)
+                EventFeedback.objects.create(event=event, Student=student, registration=registration,
+                                             rating=rating, content_quality_rating=content,
+                                             organization_rating=organization, would_recommend=recommend)
+                cls.feedback.append((organizers[organizer], event_type, semester or '',
+                                     (rating, content, organization), recommend))
+
+    def expected(self, group):
+        rows = [row for row in self.feedback if group(row)]
+        result = {'count': len(rows),
+                  'would_recommend_rate': round(sum(row[4] for row in rows) / len(rows), 4)}
+        for i, metric in enumerate(('rating', 'content_quality_rating', 'organization_rating')):
+            values = [row[3][i] for row in rows]
+            result[metric] = {
+                'mean': round(statistics.mean(values), 3),
+                'std': round(statistics.stdev(values), 3) if len(values) > 1 else 0.0,
+                'distribution': [values.count(r) for r in range(1, 6)],
+            }
+        return result
+
+    def test_unpacked_ratings_match_python_aggregates(self):
+        results = compute_feedback_analytics()
+        by_key = {dimension: {entry['key']: entry for entry in entries} for dimension, entries in results.items()}
+
+        cases = [('organizer', organizer.id, lambda row, o=organizer: row[0] == o)
+                 for organizer in {row[0] for row in self.feedback}]
+        cases += [('event_type', key, lambda row, k=key: row[1] == k) for key in ('workshop', 'seminar')]
+        cases += [('semester', key, lambda row, k=key: row[2] == k) for key in ('1', '2', '')]
+        cases += [('department', key, lambda row, k=key: row[0].department == k) for key in ('it', 'civil')]
+        for dimension, key, group in cases:
+            with self.subTest(dimension=dimension, key=key):
+                entry = by_key[dimension][key]
+                expected = self.expected(group)
+                self.assertEqual(entry['count'], expected['count'])
+                self.assertEqual(entry['would_recommend_rate'], expected['would_recommend_rate'])
+                for metric in ('rating', 'content_quality_rating', 'organization_rating'):
+                    self.assertEqual(entry[metric]['mean'], expected[metric]['mean'])
+                    self.assertAlmostEqual(entry[metric]['std'], expected[metric]['std'], places=3)
+                    self.assertEqual(entry[metric]['distribution'], expected[metric]['distribution'])
+
+        # the event without feedback adds no empty group
+        self.assertEqual(sum(entry['count'] for entry in results['event_type']), len(self.feedback))
+
+
+class EventSearchRankingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(username='dept10', email='dept10@x.com', phone_number='d10',
+                                            role='Department', department='it')
+        cls.student = User.objects.create(username='stud10', email='stud10@x.com', phone_number='s10',
+                                          role='Student')
+        now = timezone.now()
+
+        def event(title, description, venue, status='approved'):
+            return Event.objects.create(
+                title=title, description=description, event_level='college', event_type='workshop',
+                start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue=venue,
+                organizer=cls.organizer, registration_deadline=now + timedelta(days=1), status=status,
+                qr_code_data='token',
+            )
+
+        cls.in_description = event('Evening meetup', 'Bring your robotics questions', 'Main hall')
+        cls.in_venue = event('Evening meetup', 'Bring your own questions', 'Robotics lab')
+        cls.in_title = event('Robotics meetup', 'Bring your own questions', 'Main hall')
+        cls.pending = event('Robotics clinic', 'Bring your own questions', 'Main hall', status='pending')
+
+    def test_title_then_venue_then_description(self):
+        if not fts_available():
+            self.skipTest("SQLite FTS5 is not available")
+        self.assertEqual(search_event_ids(self.student, 'robot'),
+                         [self.in_title.id, self.in_venue.id, self.in_description.id])
+
+    def test_organizer_sees_own_pending_event(self):
+        self.assertIn(self.pending.id, search_event_ids(self.organizer, 'robotics'))
+        self.assertNotIn(self.pending.id, search_event_ids(self.student, 'robotics'))
+
+
+class CalendarFeedTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.organizer = User.objects.create(username='dept11', email='dept11@x.com', phone_number='d11',
+                                            role='Department', department='it')
+        cls.student = User.objects.create(username='stud11', email='stud11@x.com', phone_number='s11',
+                                          role='Student')
+        cls.student.set_password('old-password')
+        cls.student.save()
+        now = timezone.now()
+
+        def event(title, **fields):
+            return Event.objects.create(
+                title=title, description='Line one\nline two', event_level='college', event_type='workshop',
+                start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall A, Block 2',
+                organizer=cls.organizer, registration_deadline=now + timedelta(days=1), status='approved',
+                qr_code_data='token', **fields,
+            )
+
+        cls.event = event('Atelier de robotique avancée; niveau 2, « café » inclus \\ ' + 'ü' * 60)
+        cls.other = event('Second event')
+        EventRegistration.objects.create(event=cls.event, student=cls.student, status='confirmed')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('event-calendar-feed', args=[calendar.feed_token(self.student)])
+
+    def fetch(self, url=None, **headers):
+        response = self.client.get(url or self.url, **headers)
+        if response.status_code == 200:
+            # a fold inside a multi-byte character would make this fail to decode
+            response.ics = b''.join(response.streaming_content).decode('utf-8')
+        return response
+
+    def test_password_change_revokes_token(self):
+        self.assertEqual(self.fetch().status_code, 200)
+        self.student.set_password('new-password')
+        self.student.save()
+        self.assertEqual(self.fetch().status_code, 404)
+        self.assertEqual(self.fetch(reverse('event-calendar-feed', args=[calendar.feed_token(self.student)]))
+                         .status_code, 200)
+
+    def test_not_modified(self):
+        etag = self.fetch()['ETag']
+        response = self.fetch(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_with_new_registration(self):
+        first = self.fetch()
+        self.assertNotIn('Second event', first.ics)
+        EventRegistration.objects.create(event=self.other, student=self.student, status='confirmed')
+        second = self.fetch(HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second.status_code, 200)
+        self.assertNotEqual(second['ETag'], first['ETag'])
+        self.assertIn('Second event', second.ics)
+
+    def test_long_non_ascii_lines_are_folded_and_escaped(self):
+        text = self.fetch().ics
+        self.assertTrue(text.endswith('END:VCALENDAR\r\n'))
+        lines = text.split('\r\n')[:-1]
+        self.assertTrue(all(len(line.encode('utf-8')) <= 75 for line in lines))
+        self.assertTrue(any(line.startswith(' ') for line in lines))
+        unfolded = text.replace('\r\n ', '').split('\r\n')
+        self.assertIn('SUMMARY:Atelier de robotique avancée\\; niveau 2\\, « café » inclus \\\\ ' + 'ü' * 60,
+                      unfolded)
+        self.assertIn('LOCATION:Hall A\\, Block 2', unfolded)
+        self.assertIn('DESCRIPTION:Line one\\nline two', unfolded)
@@ -55,6 +55,18 @@ from .views import (
     cancelled_events_list,
     completed_events_list,
     attendance_verify,
+    attendance_qr_token,
+    attendance_roster,
+    attendance_sync,
+    live_attendance,
+    event_qr_image,
+    daily_analytics,
+    feedback_analytics_view,
+    search_events,
+    recommended_events,
+    coattendance_recommended_events,
+    calendar_feed_link,
+    calendar_feed,
 )
 
 urlpatterns = [
@@ -66,6 +78,11 @@ urlpatterns = [
     # DRF view directly (you can keep this admin/organizer-only path if you like)
     path('<int:pk>/manage/', EventDetailView.as_view(), name='event-manage'),
 
+    path('search/', search_events, name='event-search'),
+    path('recommended/', recommended_events, name='event-recommended'),
+    path('recommended/co-attendance/', coattendance_recommended_events, name='event-recommended-coattendance'),
+    path('calendar/', calendar_feed_link, name='event-calendar-link'),
+    path('calendar/<str:token>.ics', calendar_feed, name='event-calendar-feed'),
     path('pending/', pending_events_list, name='pending-event-list'),
     path('cancelled/', cancelled_events_list, name='cancelled-event-list'),
     path('completed/', completed_events_list, name='completed-event-list'),
@@ -75,10 +92,17 @@ urlpatterns = [
     path('<int:event_id>/cancel-registration/', cancel_registration, name='cancel-registration'),
 
     path('attendance/verify/', attendance_verify, name='attendance-verify'),
+    path('<int:event_id>/attendance/qr-token/', attendance_qr_token, name='attendance-qr-token'),
+    path('<int:event_id>/qr.<str:fmt>', event_qr_image, name='event-qr'),
+    path('<int:event_id>/attendance/roster/', attendance_roster, name='attendance-roster'),
+    path('<int:event_id>/attendance/sync/', attendance_sync, name='attendance-sync'),
+    path('<int:event_id>/live-attendance/', live_attendance, name='live-attendance'),
     path('<int:event_id>/feedback/', submit_feedback, name='submit-feedback'),
 
     path('<int:event_id>/statistics/', event_statistics, name='event-statistics'),
     path('my-events/', my_events, name='my-events'),
+    path('analytics/daily/', daily_analytics, name='event-daily-analytics'),
+    path('analytics/feedback/', feedback_analytics_view, name='event-feedback-analytics'),
 
     path('conflicts/', EventConflictListView.as_view(), name='event-conflicts'),
 ]
@@ -44,37 +44,38 @@ def detect_event_conflicts(event):
 #             event=event
 #         )
 
-def get_upcoming_events(user, days=7):
+def get_upcoming_events(user, days=7, since=None):
     
-    # Get upcoming events for a user based on their role
+    # Get upcoming events for a user based on their role, as a queryset
+    # (since defaults to now; the calendar feed passes an earlier start so
+    # events that just happened stay in subscribers' calendars)
    
     from datetime import timedelta
     
+    since = since or timezone.now()
     end_date = timezone.now() + timedelta(days=days)
     
     if user.is_student():
         # Get events the student is registered for
-        from .models import EventRegistration
-        registrations = EventRegistration.objects.filter(
-            student=user,
-            status='confirmed',
-            event__start_date__gte=timezone.now(),
-            event__start_date__lte=end_date
-        ).select_related('event')
-        return [reg.event for reg in registrations]
+        return Event.objects.filter(
+            registrations__student=user,
+            registrations__status='confirmed',
+            start_date__gte=since,
+            start_date__lte=end_date
+        )
     
     elif user.is_department():
         # Get events organized by faculty
         return Event.objects.filter(
             organizer=user,
-            start_date__gte=timezone.now(),
+            start_date__gte=since,
             start_date__lte=end_date
         )
     elif user.is_organization():
         # Get events organized by faculty
         return Event.objects.filter(
             organizer=user,
-            start_date__gte=timezone.now(),
+            start_date__gte=since,
             start_date__lte=end_date
         )
     
@@ -82,10 +83,8 @@ def get_upcoming_events(user, days=7):
         # Get all upcoming events
         return Event.objects.filter(
             status='approved',
-            start_date__gte=timezone.now(),
+            start_date__gte=since,
             start_date__lte=end_date
         )
     
-    return []
-
-
+    return Event.objects.none()
@@ -2,19 +2,23 @@
 
 from django.shortcuts import render, redirect
 from rest_framework import generics, permissions, status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.pagination import CursorPagination
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
-from django.db.models  import Q, Count, Avg
+from django.db.models  import Q, Count, Avg, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from datetime import timedelta
 from django.utils import timezone
-from .models import Event, EventRegistration, EventFeedback, EventConflict
-from .serializers import EventSerializer, EventCreateSerializer, EventRegistrationSerializer, EventFeedbackSerializer, EventApprovalSerializer, EventConflictSerializer
+from django.utils.dateparse import parse_date
+from .models import Event, EventRegistration, EventFeedback, EventConflict, EventStats, DailyEventRollup
+from .serializers import EventSerializer, EventCreateSerializer, EventRegistrationSerializer, EventFeedbackSerializer, EventApprovalSerializer, EventConflictSerializer, RegisteredEventSerializer
 from rest_framework.exceptions import PermissionDenied
 from .permissions import IsEventManagerOrReadOnly
 from users.models import CollegeStudent
 from django.utils.timezone import now
 from django.urls import reverse
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from django.contrib.auth import authenticate, login
 from django.contrib.auth.forms import AuthenticationForm
 from django.views.decorators.csrf import csrf_exempt
@@ -22,8 +26,17 @@ from django.views.decorators.csrf import csrf_exempt
 from django.conf import settings
 from django.utils.decorators import method_decorator
 
-from users.models import User
+from users.models import Profile, User
 from .utils import detect_event_conflicts  #, send_event_notification
+from . import qr as qr_images, qr_tokens
+from . import calendar as event_calendar
+from .attendance import MAX_SYNC_BATCH, apply_checkins, live_attendance_count, record_checkin, roster_snapshot
+from .feedback_analytics import DIMENSIONS as FEEDBACK_DIMENSIONS, feedback_analytics
+from .rollups import GROUPS as ROLLUP_GROUPS, rollup_series
+from .coattendance import coattendance_recommendations
+from .recommendations import interest_terms, recommended_event_ids
+from .search import search_event_ids
+from .stats import refresh_event_stats, statistics_payload
 from notifications.utils import create_notification, send_email_notification
 
 from rest_framework.exceptions import PermissionDenied
@@ -708,11 +721,23 @@ def cancel_registration(request, event_id):
 @api_view(['GET', 'POST'])
 @csrf_exempt
 def attendance_verify(request):
-    event_id = request.GET.get('event_id')
-    qr = request.GET.get('qr')
+    token = request.GET.get('t')
+
+    if token:
+        # Rotating QR: signature + time window are checked before touching the DB
+        event_id = qr_tokens.verify_token(token)
+        if event_id is None:
+            return HttpResponse("QR code expired or invalid. Please scan the code on screen again.", status=400)
+        qr = token
+    else:
+        event_id = request.GET.get('event_id')
+        qr = request.GET.get('qr')
+
+        if not event_id or not qr:
+            return Response({'error': 'Invalid attendance link'}, status=400)
 
-    if not event_id or not qr:
-        return Response({'error': 'Invalid attendance link'}, status=400)
+        if not getattr(settings, 'ATTENDANCE_ALLOW_STATIC_QR', False):
+            return HttpResponse("This QR code is no longer accepted. Please scan the code on screen.", status=400)
 
     event = get_object_or_404(Event, id=event_id)
 
@@ -721,8 +746,8 @@ def attendance_verify(request):
     if not (event.start_date <= now <= event.end_date):
         return HttpResponse("QR code expired or event is not active.", status=400)
 
-    # Check QR data matches stored qr_code_data (optional if you stored it)
-    if hasattr(event, 'qr_code_data') and event.qr_code_data != qr:
+    # Static QR: data must match stored qr_code_data
+    if not token and event.qr_code_data != qr:
         return HttpResponse("Invalid QR code.", status=400)
 
     if request.method == 'GET':
@@ -742,7 +767,128 @@ def attendance_verify(request):
             login(request, user)
             return mark_attendance_for_user(user, event, qr)
         else:
-            return render(request, 'attendance_login.html', {'form': form, 'event': event, 'qr': qr, 'errors': form.errors})
+            return render(request, 'events/attendance_login.html', {'form': form, 'event': event, 'qr': qr, 'errors': form.errors})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def attendance_qr_token(request, event_id):
+    # """
+    # Organizer display endpoint: returns the current rotating attendance token.
+    # The display should poll again after `expires_in` seconds.
+    # """
+    event = get_object_or_404(Event, id=event_id)
+
+    if not (request.user == event.organizer or request.user.is_admin_user()):
+        return Response({'error': 'Only the event organizer can display the attendance QR.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    if event.status != 'approved':
+        return Response({'error': 'Attendance QR is only available for approved events.'},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    token = qr_tokens.make_token(event.id)
+    return Response({
+        'event_id': event.id,
+        'token': token,
+        'attendance_url': f"{_base_url()}{reverse('attendance-verify')}?t={token}",
+        'qr_image_url': f"{_base_url()}{reverse('event-qr', args=[event.id, 'svg'])}?rotating=1",
+        'rotate_every': qr_tokens.rotation_seconds(),
+        'expires_in': qr_tokens.seconds_until_rotation(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def event_qr_image(request, event_id, fmt):
+    # """
+    # GET /events/<id>/qr.png | /events/<id>/qr.svg  [?rotating=1]
+    # Renders the attendance QR on first request and serves it from the LRU cache
+    # afterwards. ?v=<digest> (as given in the event's qr_image_url) makes the
+    # response cacheable for a year since the URL changes with the content.
+    # """
+    event = get_object_or_404(Event.objects.only('id', 'organizer_id', 'status', 'qr_code_data'), id=event_id)
+    if not _can_run_gate(request.user, event):
+        return Response({'error': 'Only the event organizer can view the attendance QR.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    fmt = fmt.lower()
+    if fmt not in qr_images.CONTENT_TYPES:
+        return Response({'error': f"Unsupported format. Use one of: {', '.join(qr_images.CONTENT_TYPES)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    rotating = request.query_params.get('rotating') in ('1', 'true')
+    if rotating:
+        if event.status != 'approved':
+            return Response({'error': 'Attendance QR is only available for approved events.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        token = qr_tokens.make_token(event.id)
+        payload = f"{_base_url()}{reverse('attendance-verify')}?t={token}"
+        cache_control = f"private, max-age={qr_tokens.seconds_until_rotation()}"
+    else:
+        if not event.qr_code_data:
+            return Response({'error': 'This event has no attendance QR yet.'}, status=status.HTTP_404_NOT_FOUND)
+        payload = qr_images.static_attendance_url(event)
+        cache_control = None
+
+    digest = qr_images.payload_digest(payload, fmt)[:16]
+    etag = f'"{digest}"'
+    if cache_control is None:
+        immutable = request.query_params.get('v') == digest
+        cache_control = "private, max-age=31536000, immutable" if immutable else "private, max-age=300"
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        data, _ = qr_images.qr_image(payload, fmt, persist=not rotating)
+        response = HttpResponse(data, content_type=qr_images.CONTENT_TYPES[fmt])
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
+
+
+def _can_run_gate(user, event) -> bool:
+    """Gate scanning is done by the event's organizer (or an admin)."""
+    return user.id == event.organizer_id or user.is_admin_user()
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def attendance_roster(request, event_id):
+    # """
+    # Snapshot of confirmed registrations so gate scanners can validate offline.
+    # """
+    event = get_object_or_404(Event, id=event_id)
+    if not _can_run_gate(request.user, event):
+        return Response({'error': 'Only the event organizer can download the attendance roster.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    return Response(roster_snapshot(event))
+
+
+@api_view(['POST'])
+@permission_classes([permissions.IsAuthenticated])
+def attendance_sync(request, event_id):
+    # """
+    # Batch upload of scanned check-ins:
+    #   {"batch_id": "...", "checkins": [{"registration_id": 12, "scanned_at": "2025-09-01T09:58:00+05:45"}, ...]}
+    # Safe to retry: re-sending a batch changes nothing.
+    # """
+    event = get_object_or_404(Event, id=event_id)
+    if not _can_run_gate(request.user, event):
+        return Response({'error': 'Only the event organizer can sync attendance.'},
+                        status=status.HTTP_403_FORBIDDEN)
+
+    checkins = request.data.get('checkins')
+    if not isinstance(checkins, list):
+        return Response({'error': "'checkins' must be a list."}, status=status.HTTP_400_BAD_REQUEST)
+    if len(checkins) > MAX_SYNC_BATCH:
+        return Response({'error': f"At most {MAX_SYNC_BATCH} check-ins per batch."},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    result = apply_checkins(event, checkins)
+    result['batch_id'] = request.data.get('batch_id')
+    return Response(result, status=status.HTTP_200_OK)
 
 
 def mark_attendance_for_user(user, event, qr):
@@ -755,13 +901,36 @@ def mark_attendance_for_user(user, event, qr):
     except EventRegistration.DoesNotExist:
         return HttpResponse("You are not registered or registration not confirmed.", status=403)
 
+    if getattr(settings, 'ATTENDANCE_WRITE_BEHIND', False):
+        # buffered: the background flusher writes it to the DB within a few seconds
+        if not record_checkin(registration):
+            return HttpResponse("Attendance already marked. Thank you.", status=200)
+        return HttpResponse("Attendance marked successfully! Thank you.", status=200)
+
     registration.attended = True
     registration.attendance_marked_at = timezone.now()
-    registration.save()
+    registration.save(update_fields=['attended', 'attendance_marked_at'])
 
     return HttpResponse("Attendance marked successfully! Thank you.", status=200)
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def live_attendance(request, event_id):
+    # """
+    # Cheap live check-in counter for organizers (no aggregate queries).
+    # """
+    event = get_object_or_404(Event.objects.only('id', 'organizer_id'), id=event_id)
+    if not (_can_run_gate(request.user, event) or request.user.is_chief()):
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    return Response({
+        'event_id': event.id,
+        'attended': live_attendance_count(event.id),
+        'as_of': timezone.now(),
+    })
+
+
 @api_view(['POST'])
 @permission_classes([permissions.IsAuthenticated])
 def submit_feedback(request, event_id):
@@ -817,36 +986,73 @@ def submit_feedback(request, event_id):
 @permission_classes([permissions.IsAuthenticated])
 def event_statistics(request, event_id):
     # Get statistics for an event (Organizer/Admin/Chief only)
-    event = get_object_or_404(Event, id=event_id)
+    # The counters come with the event in one query; events without a stats
+    # row yet get one built by a single aggregate query.
+    event = get_object_or_404(Event.objects.select_related('stats'), id=event_id)
 
     # ✅ Allow organizer, admin, or campus chief
-    if not (request.user == event.organizer or request.user.is_admin_user() or request.user.is_chief()):
+    if not (event.organizer_id == request.user.id or request.user.is_admin_user() or request.user.is_chief()):
         return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
 
-    # Calculate statistics
-    total_registrations = event.registrations.count()
-    confirmed_registrations = event.registrations.filter(status='confirmed').count()
-    attended_count = event.registrations.filter(attended=True).count()
-    feedback_count = event.feedbacks.count()
+    try:
+        stats = event.stats
+    except EventStats.DoesNotExist:
+        stats = refresh_event_stats(event.id)
+
+    return Response(statistics_payload(event, stats))
+
+
+def with_registered_count(queryset):
+    # confirmed registrations per event as a correlated subquery, so it does not
+    # multiply rows when the queryset already joins registrations
+    confirmed = (EventRegistration.objects
+                 .filter(event=OuterRef('pk'), status='confirmed')
+                 .order_by()
+                 .values('event')
+                 .annotate(n=Count('id'))
+                 .values('n'))
+    return queryset.annotate(confirmed_count=Coalesce(Subquery(confirmed), 0))
+
+
+class MyEventsPagination(CursorPagination):
+    # newest registrations first; the registration id is unique, so the cursor is exact
+    ordering = '-registration_id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+def _student_events(request):
+    registration_statuses = dict(EventRegistration.STATUS_CHOICES)
+    event_statuses = dict(Event.STATUS_CHOICES)
+    registration_status = request.query_params.get('status')
+    event_status = request.query_params.get('event_status')
+    if registration_status and registration_status not in registration_statuses:
+        return Response({'error': f"status must be one of: {', '.join(registration_statuses)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+    if event_status and event_status not in event_statuses:
+        return Response({'error': f"event_status must be one of: {', '.join(event_statuses)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
 
-    # Average ratings
-    from django.db.models import Avg
-    avg_rating = event.feedbacks.aggregate(Avg('rating'))['rating__avg'] or 0
-    avg_content_rating = event.feedbacks.aggregate(Avg('content_quality_rating'))['content_quality_rating__avg'] or 0
-    avg_organization_rating = event.feedbacks.aggregate(Avg('organization_rating'))['organization_rating__avg'] or 0
-
-    return Response({
-        'event_title': event.title,
-        'total_registrations': total_registrations,
-        'confirmed_registrations': confirmed_registrations,
-        'attended_count': attended_count,
-        'attendance_rate': (attended_count / confirmed_registrations * 100) if confirmed_registrations > 0 else 0,
-        'feedback_count': feedback_count,
-        'feedback_rate': (feedback_count / attended_count * 100) if attended_count > 0 else 0,
-        'average_rating': round(avg_rating, 2),
-        'average_content_rating': round(avg_content_rating, 2),
-        'average_organization_rating': round(avg_organization_rating, 2),
-    })
+    # One row per registration: filtering on registrations__student joins the
+    # student's registrations once, and the annotations below reuse that join.
+    events = (Event.objects
+              .filter(registrations__student=request.user)
+              .select_related('organizer', 'approved_by')
+              .annotate(registration_id=F('registrations__id'),
+                        registration_status=F('registrations__status'),
+                        attended=F('registrations__attended'),
+                        feedback_given=F('registrations__feedback_given')))
+    if registration_status:
+        events = events.filter(registration_status=registration_status)
+    if event_status:
+        events = events.filter(status=event_status)
+    events = with_registered_count(events)
+
+    paginator = MyEventsPagination()
+    page = paginator.paginate_queryset(events, request)
+    serializer = RegisteredEventSerializer(page, many=True, context={'request': request})
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['GET'])
@@ -855,22 +1061,16 @@ def my_events(request):
     user = request.user
 
     if user.is_student():
-        registrations = EventRegistration.objects.filter(student=user).select_related('event')
-        events_data = []
-        for reg in registrations:
-            event_data = EventSerializer(reg.event).data
-            event_data['registration_status'] = reg.status
-            event_data['attended'] = reg.attended
-            event_data['feedback_given'] = reg.feedback_given
-            events_data.append(event_data)
-        return Response(events_data)
+        return _student_events(request)
 
+    # no request context here: EventSerializer would then include the QR
+    # fields for the organizer/admin, which this list never returned
     elif user.is_department():
-        events = Event.objects.filter(organizer=user)
+        events = with_registered_count(Event.objects.filter(organizer=user).select_related('organizer', 'approved_by'))
         return Response(EventSerializer(events, many=True).data)
 
     elif user.is_organization():
-        events = Event.objects.filter(organizer=user)
+        events = with_registered_count(Event.objects.filter(organizer=user).select_related('organizer', 'approved_by'))
         return Response(EventSerializer(events, many=True).data)
 
     elif user.is_chief():
@@ -878,12 +1078,209 @@ def my_events(request):
         raise PermissionDenied("Campus Chief is not allowed to access this resource.")
 
     elif user.is_admin_user():
-        events = Event.objects.all()
+        events = with_registered_count(Event.objects.select_related('organizer', 'approved_by'))
         return Response(EventSerializer(events, many=True).data)
 
     return Response([])
 
 
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def daily_analytics(request):
+    # """
+    # Time series of registrations, check-ins and feedback from the daily
+    # rollups. ?start=&end= (YYYY-MM-DD, default the last 30 days),
+    # ?group_by=date|department|event_type|event, and optional
+    # ?event_type=, ?department=, ?event= filters. Organizers see their own events.
+    # """
+    user = request.user
+    rollups = DailyEventRollup.objects.all()
+    if user.is_department() or user.is_organization():
+        rollups = rollups.filter(event__organizer=user)
+    elif not (user.is_admin_user() or user.is_chief()):
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    params = request.query_params
+    try:
+        end = parse_date(params['end']) if params.get('end') else timezone.localdate()
+        start = parse_date(params['start']) if params.get('start') else end - timedelta(days=29)
+    except (TypeError, ValueError):
+        start = end = None
+    if start is None or end is None or start > end:
+        return Response({'error': 'start and end must be dates (YYYY-MM-DD) with start <= end'},
+                        status=status.HTTP_400_BAD_REQUEST)
+    group_by = params.get('group_by', 'date')
+    if group_by not in ROLLUP_GROUPS:
+        return Response({'error': f"group_by must be one of: {', '.join(ROLLUP_GROUPS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    rollups = rollups.filter(date__range=(start, end))
+    if params.get('event_type'):
+        rollups = rollups.filter(event_type=params['event_type'])
+    if params.get('department'):
+        rollups = rollups.filter(department=params['department'])
+    if params.get('event'):
+        if not params['event'].isdigit():
+            return Response({'error': 'event must be an event id'}, status=status.HTTP_400_BAD_REQUEST)
+        rollups = rollups.filter(event_id=params['event'])
+
+    return Response({
+        'start': start,
+        'end': end,
+        'group_by': group_by,
+        'results': rollup_series(rollups, group_by),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def feedback_analytics_view(request):
+    # """
+    # Rating distributions, means with 95% intervals and would-recommend rates
+    # per organizer, department, event_type and semester (Admin/Chief only).
+    # ?dimension= limits the response to one of them.
+    # """
+    if not (request.user.is_admin_user() or request.user.is_chief()):
+        return Response({'error': 'Permission denied'}, status=status.HTTP_403_FORBIDDEN)
+
+    dimension = request.query_params.get('dimension')
+    if dimension and dimension not in FEEDBACK_DIMENSIONS:
+        return Response({'error': f"dimension must be one of: {', '.join(FEEDBACK_DIMENSIONS)}"},
+                        status=status.HTTP_400_BAD_REQUEST)
+
+    results = feedback_analytics()
+    return Response({dimension: results[dimension]} if dimension else results)
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def search_events(request):
+    # """
+    # Full-text search over event title, description and venue, best match
+    # first. Every word is prefix-matched (?q=pyth work finds "Python
+    # Workshop"). Only events the user may see in the event list are returned.
+    # ?limit= (max 50) and ?offset= page through the results.
+    # """
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'error': 'q is required'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+        offset = max(int(request.query_params.get('offset', 0)), 0)
+    except ValueError:
+        return Response({'error': 'limit and offset must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ids = search_event_ids(request.user, query, limit=limit, offset=offset)
+    events = with_registered_count(Event.objects.filter(id__in=ids).select_related('organizer', 'approved_by'))
+    rank = {event_id: position for position, event_id in enumerate(ids)}
+    ranked = sorted(events, key=lambda event: rank[event.id])
+
+    return Response({
+        'query': query,
+        'results': EventSerializer(ranked, many=True, context={'request': request}).data,
+        'next_offset': offset + limit if len(ids) == limit else None,
+    })
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def recommended_events(request):
+    # """
+    # Open events matching the student's profile interests, best match first,
+    # leaving out events they already registered for. ?limit= (max 50).
+    # """
+    if not request.user.is_student():
+        return Response({'error': 'Recommendations are available to students only.'},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    interests = Profile.objects.filter(user=request.user).values_list('interests', flat=True).first()
+    ranked = recommended_event_ids(request.user, interests, limit=limit)
+    scores = dict(ranked)
+    events = with_registered_count(Event.objects.filter(id__in=scores).select_related('organizer', 'approved_by'))
+    events = sorted(events, key=lambda event: -scores[event.id])
+
+    data = EventSerializer(events, many=True, context={'request': request}).data
+    for item in data:
+        item['score'] = round(scores[item['id']], 3)
+    return Response({'interests': interest_terms(interests), 'results': data})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def coattendance_recommended_events(request):
+    # """
+    # "Students like you also attended": open events most often attended by
+    # students who attended the same events as you. ?limit= (max 50).
+    # """
+    if not request.user.is_student():
+        return Response({'error': 'Recommendations are available to students only.'},
+                        status=status.HTTP_403_FORBIDDEN)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), 50)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    ranked = {event_id: (score, matched) for event_id, score, matched in coattendance_recommendations(request.user, limit)}
+    events = with_registered_count(Event.objects.filter(id__in=ranked).select_related('organizer', 'approved_by'))
+    events = sorted(events, key=lambda event: -ranked[event.id][0])
+
+    data = EventSerializer(events, many=True, context={'request': request}).data
+    for item in data:
+        score, matched = ranked[item['id']]
+        item['score'] = round(score, 3)
+        item['matched_attended_events'] = matched
+    return Response({'results': data})
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def calendar_feed_link(request):
+    # """
+    # Subscription URL of the user's iCalendar feed. Students can add
+    # ?scope=all to the feed to also see approved events still open for
+    # registration. The URL changes when the password does.
+    # """
+    path = reverse('event-calendar-feed', args=[event_calendar.feed_token(request.user)])
+    return Response({
+        'feed_url': request.build_absolute_uri(path),
+        'webcal_url': 'webcal://' + request.get_host() + path,
+    })
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([permissions.AllowAny])
+def calendar_feed(request, token):
+    # """
+    # Public .ics feed for calendar apps; the token in the URL identifies the
+    # user. Answers 304 when If-None-Match matches the current ETag.
+    # """
+    user = event_calendar.user_for_token(token)
+    if user is None:
+        return Response({'error': 'Unknown calendar feed.'}, status=status.HTTP_404_NOT_FOUND)
+
+    include_eligible = request.query_params.get('scope') == 'all'
+    events = event_calendar.feed_events(user, include_eligible)
+    etag = event_calendar.feed_etag(user, events, include_eligible)
+    cache_control = f"private, max-age={getattr(settings, 'CALENDAR_FEED_MAX_AGE', 900)}"
+
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = HttpResponse(status=304)
+    else:
+        response = StreamingHttpResponse(
+            event_calendar.iter_ics(events, f"{user.username} events", _base_url()),
+            content_type='text/calendar; charset=utf-8',
+        )
+        response['Content-Disposition'] = 'inline; filename="events.ics"'
+    response['ETag'] = etag
+    response['Cache-Control'] = cache_control
+    return response
+
+
 class EventConflictListView(generics.ListAPIView):
     # List all event conflicts (Admin/Chief only)
     serializer_class = EventConflictSerializer
@@ -40,6 +40,10 @@ from django.core.mail import send_mail, EmailMultiAlternatives
 from django.conf import settings
 from .models import Notification
 
+def default_from_email():
+    # DEFAULT_FROM_EMAIL if set, else EMAIL_HOST_USER
+    return getattr(settings, "DEFAULT_FROM_EMAIL", None) or getattr(settings, "EMAIL_HOST_USER", None) or "no-reply@example.com"
+
 def create_notification(recipient, title, message, notification_type, event=None):
     print(f"[DEBUG] Creating notification for {recipient} with title: {title}")
     notification = Notification.objects.create(
@@ -58,7 +62,7 @@ def send_email_notification(recipient_email, subject, message):
     # - uses DEFAULT_FROM_EMAIL if set
     # - else falls back to EMAIL_HOST_USER
     # """
-    from_email = getattr(settings, "DEFAULT_FROM_EMAIL", None) or getattr(settings, "EMAIL_HOST_USER", None) or "no-reply@example.com"
+    from_email = default_from_email()
 
     # Plain text is fine. If you later want HTML, you can upgrade here safely.
     try:
@@ -72,4 +76,28 @@ def send_email_notification(recipient_email, subject, message):
             from_email,
             [recipient_email],
             fail_silently=False,
-        )
\ No newline at end of file
+        )
+
+def send_bulk_emails(messages, batch_size=100, on_sent=None):
+    # """
+    # Send many EmailMessage objects over one SMTP connection per batch instead of
+    # opening a connection per email. Returns the number of messages sent.
+    # With on_sent(start, stop), messages go out one at a time on the batch's
+    # connection and the callback runs after each, so callers can record every
+    # delivered message before a later one fails.
+    # """
+    from django.core.mail import get_connection
+
+    sent = 0
+    messages = list(messages)
+    for start in range(0, len(messages), batch_size):
+        batch = messages[start:start + batch_size]
+        connection = get_connection(fail_silently=False)
+        if on_sent is None:
+            sent += connection.send_messages(batch) or 0
+            continue
+        with connection:
+            for index, message in enumerate(batch, start=start):
+                sent += connection.send_messages([message]) or 0
+                on_sent(index, index + 1)
+    return sent
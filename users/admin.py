@@ -1,8 +1,13 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.forms import UserCreationForm, UserChangeForm
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import redirect
+from django.template.response import TemplateResponse
+from django.urls import path
 from django import forms
-from .models import User, Profile, CollegeStudent
+from .models import User, Profile, CollegeStudent, RosterImport
+from .roster import DEFAULT_CHUNK_SIZE, import_roster
 from import_export.admin import ImportExportModelAdmin
 
 class CustomUserChangeForm(UserChangeForm):
@@ -58,10 +63,67 @@ class ProfileAdmin(admin.ModelAdmin):
         return obj.user.username
     get_username.short_description = 'Username'
 
+class RosterStreamImportForm(forms.Form):
+    roster_file = forms.FileField(help_text="CSV with name, username, role, department, email, phone_number columns")
+    chunk_size = forms.IntegerField(min_value=100, initial=DEFAULT_CHUNK_SIZE)
+    restart = forms.BooleanField(required=False, help_text="Ignore an unfinished run of the same file and start over")
+
+
 @admin.register(CollegeStudent)
 class CollegeStudentAdmin(ImportExportModelAdmin):
     list_display = ('name', 'username', 'email', 'phone_number', 'department', 'role')
     search_fields = ('name', 'email', 'phone_number', 'username')
+    # adds the "Stream import" button next to import-export's buttons
+    change_list_template = 'admin/users/collegestudent/change_list.html'
+
+    def get_urls(self):
+        custom = [
+            path('stream-import/', self.admin_site.admin_view(self.stream_import_view),
+                 name='users_collegestudent_stream_import'),
+        ]
+        return custom + super().get_urls()
+
+    def stream_import_view(self, request):
+        # Large roster refreshes: streams the CSV with chunked bulk writes instead of
+        # import-export's load-everything, save-row-by-row flow.
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+
+        form = RosterStreamImportForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            upload = form.cleaned_data['roster_file']
+            run = import_roster(
+                upload,
+                source_name=upload.name,
+                chunk_size=form.cleaned_data['chunk_size'],
+                restart=form.cleaned_data['restart'],
+            )
+            self.message_user(
+                request,
+                f"Roster import finished: {run.inserted} inserted, {run.updated} updated, "
+                f"{run.unchanged} unchanged, {run.rejected} rejected.",
+                messages.WARNING if run.rejected else messages.SUCCESS,
+            )
+            return redirect('admin:users_collegestudent_changelist')
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Stream import roster',
+            'form': form,
+            'recent_imports': RosterImport.objects.all()[:10],
+        }
+        return TemplateResponse(request, 'admin/users/collegestudent/stream_import.html', context)
+
+
+@admin.register(RosterImport)
+class RosterImportAdmin(admin.ModelAdmin):
+    list_display = ('source_name', 'status', 'rows_processed', 'inserted', 'updated', 'unchanged', 'rejected', 'started_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = [f.name for f in RosterImport._meta.fields]
+
+    def has_add_permission(self, request):
+        return False
 
 # ✅ Register User model properly
 admin.site.register(User, CustomUserAdmin)
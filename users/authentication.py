@@ -0,0 +1,108 @@
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+# Token -> user resolution without a database query on repeat requests. Each
+# process keeps a small LRU of recently seen tokens in front of the shared
+# Django cache, which in turn sits in front of the Token/User join.
+# users/signals.py invalidates both on logout (token deleted), on user saves
+# (password change, deactivation, role edits) and on user deletion. Another
+# process's LRU only notices after TOKEN_AUTH_LOCAL_TTL seconds, so keep that
+# short; writes that bypass signals are bounded by TOKEN_AUTH_CACHE_TTL.
+# The LRU holds pickled tokens so no two requests share a User instance.
+
+_lru = OrderedDict()
+_lru_lock = threading.Lock()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def cache_key(key):
+    # the raw token never ends up in a cache key
+    return "auth:token:" + hashlib.sha256(key.encode()).hexdigest()[:40]
+
+
+def _lru_get(ckey):
+    with _lru_lock:
+        entry = _lru.get(ckey)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _lru[ckey]
+            return None
+        _lru.move_to_end(ckey)
+        return entry[1]
+
+
+def _lru_set(ckey, value):
+    size = _setting('TOKEN_AUTH_LRU_SIZE', 1024)
+    if size <= 0:
+        return
+    with _lru_lock:
+        _lru[ckey] = (time.monotonic() + _setting('TOKEN_AUTH_LOCAL_TTL', 10), value)
+        _lru.move_to_end(ckey)
+        while len(_lru) > size:
+            _lru.popitem(last=False)
+
+
+def invalidate_token(key):
+    ckey = cache_key(key)
+    with _lru_lock:
+        _lru.pop(ckey, None)
+    cache.delete(ckey)
+
+
+def invalidate_user_tokens(user_id):
+    for key in Token.objects.filter(user_id=user_id).values_list('key', flat=True):
+        invalidate_token(key)
+
+
+def token_expired(token):
+    """True when TOKEN_EXPIRE_SECONDS is set and the token is older than that."""
+    seconds = _setting('TOKEN_EXPIRE_SECONDS', 0)
+    return bool(seconds) and token.created + timedelta(seconds=seconds) < timezone.now()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    TokenAuthentication with the token lookup cached (see module comment).
+    Tokens older than TOKEN_EXPIRE_SECONDS are rejected and deleted.
+    """
+
+    def authenticate_credentials(self, key):
+        ckey = cache_key(key)
+        data = _lru_get(ckey)
+        if data is None:
+            token = cache.get(ckey)
+            if token is None:
+                token = self._load(key)
+                cache.set(ckey, token, _setting('TOKEN_AUTH_CACHE_TTL', 300))
+            _lru_set(ckey, pickle.dumps(token, pickle.HIGHEST_PROTOCOL))
+        else:
+            token = pickle.loads(data)
+
+        if token_expired(token):
+            Token.objects.filter(key=key).delete()
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        return token.user, token
+
+    def _load(self, key):
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return token
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from users.roster import DEFAULT_CHUNK_SIZE, import_roster
+
+
+class Command(BaseCommand):
+    help = "Stream a CollegeStudent roster CSV into the database (resumable, skips unchanged rows)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Roster CSV with name, username, role, department, email, phone_number columns")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignore any unfinished checkpoint for this file and start from the first row")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        verbosity = options['verbosity']
+
+        def progress(run):
+            if verbosity > 1:
+                self.stdout.write(f"  {run.rows_processed} rows processed")
+
+        try:
+            with open(path, 'rb') as fh:
+                run = import_roster(fh, source_name=path, chunk_size=options['chunk_size'],
+                                    restart=options['restart'], progress=progress)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {path}: {exc}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Roster import #{run.pk}: {run.inserted} inserted, {run.updated} updated, "
+            f"{run.unchanged} unchanged, {run.rejected} rejected"
+        ))
+        if run.errors:
+            self.stdout.write(run.errors)
@@ -0,0 +1,52 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.provisioning import DEFAULT_BATCH_SIZE, plan_accounts, provision_accounts
+from users.tasks import send_account_activation_emails
+
+
+class Command(BaseCommand):
+    help = "Create User and Profile rows for every CollegeStudent without an account."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Password hashing processes (default: all cores)")
+        parser.add_argument('--email-domain', default=None,
+                            help="Build <username>@<domain> for roster rows without an email")
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be created")
+        parser.add_argument('--no-email', action='store_true', help="Do not send activation emails")
+        parser.add_argument('--sync-email', action='store_true',
+                            help="Send activation emails in this process instead of queueing Celery tasks")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        users, rejected = plan_accounts(email_domain=options['email_domain'])
+
+        for username, reason in rejected:
+            self.stdout.write(self.style.WARNING(f"  skipped {username or '<blank>'}: {reason}"))
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(users)} accounts would be created, {len(rejected)} skipped.")
+            return
+
+        def queue_emails(ids):
+            # per committed batch: a failure further on must not leave these
+            # accounts without an activation email (a rerun skips them)
+            if options['no_email']:
+                return
+            if options['sync_email']:
+                send_account_activation_emails(ids)
+            else:
+                send_account_activation_emails.delay(ids)
+
+        created_ids = provision_accounts(users, batch_size=options['batch_size'], workers=options['workers'],
+                                         on_batch=queue_emails)
+        elapsed = time.monotonic() - started
+
+        rate = len(created_ids) / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(created_ids)} accounts created, {len(rejected)} skipped "
+            f"in {elapsed:.1f}s ({rate:.0f} accounts/s)."
+        ))
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-19 07:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0013_collegestudent_row_hash_rosterimport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'department'], name='users_role_dept_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['role', 'organization'], name='users_role_org_idx'),
+        ),
+    ]
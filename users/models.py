@@ -99,19 +99,57 @@ class User(AbstractUser):
 
         # Student / Campus-cheif / Admin: no special constraint here.
 
+    class Meta(AbstractUser.Meta):
+        # directory filters (users.views.UserViewSet), ordered by id within a match
+        indexes = [
+            models.Index(fields=['role', 'department'], name='users_role_dept_idx'),
+            models.Index(fields=['role', 'organization'], name='users_role_org_idx'),
+        ]
+
 
 class CollegeStudent(models.Model):
     name = models.CharField(max_length=100)
-    username = models.CharField(max_length=100)
+    username = models.CharField(max_length=100, db_index=True)
     role = models.CharField(max_length=50)
     department = models.CharField(max_length=100)
     email = models.EmailField(blank=True, null=True)
     phone_number = models.CharField(max_length=20, blank=True, null=True)
+    # fingerprint of the last imported roster row (see users/roster.py)
+    row_hash = models.CharField(max_length=40, blank=True, default='', editable=False)
 
     def __str__(self):
         return f"{self.name} ({self.department})"
 
 
+class RosterImport(models.Model):
+    # One streaming roster import run; doubles as the resume checkpoint.
+    STATUS_CHOICES = [
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    source_name = models.CharField(max_length=255)
+    checksum = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running')
+
+    rows_processed = models.PositiveIntegerField(default=0)
+    inserted = models.PositiveIntegerField(default=0)
+    updated = models.PositiveIntegerField(default=0)
+    unchanged = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    errors = models.TextField(blank=True)
+
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.source_name} ({self.get_status_display()})"
+
+    class Meta:
+        ordering = ['-started_at']
+
+
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
     bio = models.TextField(max_length=500, blank=True)
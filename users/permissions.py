@@ -0,0 +1,22 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsDirectoryUser(BasePermission):
+    # """
+    # User directory (UserViewSet):
+    #   - list: staff, Admin and Campus-cheif see everyone; Department and
+    #     Organization see students only (the view narrows the queryset).
+    #   - everything else (retrieve/create/update/delete): staff only, as
+    #     with IsAdminUser.
+    #   - Others: no access.
+    # """
+
+    def has_permission(self, request, view):
+        user = request.user
+        if not user or not user.is_authenticated:
+            return False
+        if user.is_staff:
+            return True
+        if getattr(view, 'action', None) != 'list':
+            return False
+        return user.is_admin_user() or user.is_chief() or user.is_department() or user.is_organization()
@@ -0,0 +1,148 @@
+import os
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Lower
+
+from eventify.parallel import init_django_worker
+
+from .models import CollegeStudent, Profile, User
+
+DEFAULT_BATCH_SIZE = 500
+LOOKUP_CHUNK = 500  # keep IN (...) lists well under SQLite's variable limit
+
+_username_validator = UnicodeUsernameValidator()
+
+
+def _hash_password(raw):
+    return make_password(raw)
+
+
+def hash_passwords(raw_passwords, workers=None):
+    """Hash passwords across a process pool; PBKDF2 is CPU-bound so threads would not help."""
+    raw_passwords = list(raw_passwords)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(raw_passwords) < 2:
+        return [make_password(p) for p in raw_passwords]
+    chunksize = max(1, len(raw_passwords) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_django_worker) as pool:
+        return list(pool.map(_hash_password, raw_passwords, chunksize=chunksize))
+
+
+def _department_lookup():
+    # roster departments are free text; accept either the choice key or its label
+    lookup = {}
+    for key, label in User.DEPARTMENTS:
+        lookup[key.lower()] = key
+        lookup[label.lower()] = key
+    return lookup
+
+
+def _existing(field, values, ignore_case=False):
+    # ignore_case: values are lower-case; match accounts whatever their casing
+    found = set()
+    values = list(values)
+    users = User.objects.annotate(match=Lower(field)) if ignore_case else User.objects.annotate(match=F(field))
+    for start in range(0, len(values), LOOKUP_CHUNK):
+        chunk = values[start:start + LOOKUP_CHUNK]
+        found.update(users.filter(match__in=chunk).values_list('match', flat=True))
+    return found
+
+
+def plan_accounts(email_domain=None):
+    """
+    Build unsaved User objects for every CollegeStudent without an account.
+    Returns (users, rejected) where rejected is a list of (username, reason).
+    """
+    email_domain = email_domain or getattr(settings, 'STUDENT_EMAIL_DOMAIN', None)
+    departments = _department_lookup()
+
+    roster = (CollegeStudent.objects
+              .exclude(username__in=User.objects.values('username'))
+              .order_by('id'))
+
+    candidates, rejected = [], []
+    seen_usernames, seen_emails, seen_phones = set(), set(), set()
+    for student in roster.iterator(chunk_size=2000):
+        username = (student.username or '').strip()
+        try:
+            _username_validator(username)
+        except ValidationError:
+            rejected.append((username, 'invalid username'))
+            continue
+
+        email = (student.email or '').strip().lower()
+        if not email and email_domain:
+            email = f"{username.lower()}@{email_domain}"
+        phone = (student.phone_number or '').strip()
+
+        if not email:
+            rejected.append((username, 'no email on roster'))
+            continue
+        if not phone:
+            rejected.append((username, 'no phone number on roster'))
+            continue
+        if username in seen_usernames or email in seen_emails or phone in seen_phones:
+            rejected.append((username, 'duplicate username, email or phone within roster'))
+            continue
+        seen_usernames.add(username)
+        seen_emails.add(email)
+        seen_phones.add(phone)
+
+        first, _, last = (student.name or '').strip().partition(' ')
+        candidates.append(User(
+            username=username,
+            email=email,
+            phone_number=phone,
+            first_name=first[:150],
+            last_name=last.strip()[:150],
+            role='Student',
+            department=departments.get((student.department or '').strip().lower()),
+        ))
+
+    taken_emails = _existing('email', seen_emails, ignore_case=True)
+    taken_phones = _existing('phone_number', seen_phones)
+    users = []
+    for user in candidates:
+        if user.email in taken_emails:
+            rejected.append((user.username, 'email already used by another account'))
+        elif user.phone_number in taken_phones:
+            rejected.append((user.username, 'phone number already used by another account'))
+        else:
+            users.append(user)
+    return users, rejected
+
+
+def provision_accounts(users, batch_size=DEFAULT_BATCH_SIZE, workers=None, on_batch=None):
+    """
+    Give each planned user a random initial password (hashed in parallel) and
+    insert users plus empty profiles with bulk_create. Students then set their
+    own password through the activation (password reset) link; a usable random
+    password is needed because Django's reset form skips unusable ones.
+    on_batch(ids) is called after each batch commits, so work tied to the new
+    accounts (activation emails) is not lost if a later batch fails.
+    Returns the created users' ids.
+    """
+    hashes = hash_passwords((secrets.token_urlsafe(16) for _ in users), workers=workers)
+    for user, password_hash in zip(users, hashes):
+        user.password = password_hash
+
+    created_ids = []
+    for start in range(0, len(users), batch_size):
+        batch = users[start:start + batch_size]
+        with transaction.atomic():
+            User.objects.bulk_create(batch)
+            ids = list(User.objects
+                       .filter(username__in=[u.username for u in batch])
+                       .values_list('id', flat=True))
+            Profile.objects.bulk_create([Profile(user_id=user_id) for user_id in ids])
+        created_ids.extend(ids)
+        if on_batch:
+            on_batch(ids)
+    return created_ids
@@ -0,0 +1,196 @@
+import csv
+import hashlib
+import io
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CollegeStudent, RosterImport
+
+ROSTER_FIELDS = ('name', 'username', 'role', 'department', 'email', 'phone_number')
+REQUIRED_FIELDS = ('name', 'username')
+DEFAULT_CHUNK_SIZE = 1000
+MAX_ERRORS_KEPT = 50  # only the first few rejects are stored on the RosterImport row
+
+
+def _binary(fileobj):
+    # Django uploads wrap the real file object; unwrap so TextIOWrapper can read it.
+    return getattr(fileobj, 'file', fileobj)
+
+
+def file_checksum(fileobj):
+    """sha256 of the whole file, read in blocks; rewinds the file afterwards."""
+    raw = _binary(fileobj)
+    digest = hashlib.sha256()
+    raw.seek(0)
+    for block in iter(lambda: raw.read(64 * 1024), b''):
+        digest.update(block)
+    raw.seek(0)
+    return digest.hexdigest()
+
+
+def row_hash(row):
+    """Stable fingerprint of a cleaned roster row, used to skip unchanged records."""
+    joined = '\x1f'.join(row.get(f) or '' for f in ROSTER_FIELDS)
+    return hashlib.sha1(joined.encode('utf-8')).hexdigest()
+
+
+def iter_roster_rows(fileobj, encoding='utf-8-sig'):
+    """Yield (line_no, raw_dict) one CSV row at a time without loading the file."""
+    text = io.TextIOWrapper(_binary(fileobj), encoding=encoding, newline='')
+    try:
+        reader = csv.reader(text)
+        header = next(reader, None)
+        if not header:
+            return
+        columns = [h.strip().lower().replace(' ', '_') for h in header]
+        for line_no, values in enumerate(reader, start=1):
+            if not any(v.strip() for v in values):
+                continue
+            yield line_no, dict(zip(columns, values))
+    finally:
+        # don't let the wrapper close the caller's file
+        text.detach()
+
+
+def clean_row(raw):
+    """Normalise one raw CSV row. Returns (row, None) or (None, error_message)."""
+    row = {}
+    for field in ROSTER_FIELDS:
+        value = (raw.get(field) or '').strip()
+        max_length = CollegeStudent._meta.get_field(field).max_length
+        if len(value) > max_length:
+            return None, f"'{field}' is longer than {max_length} characters"
+        row[field] = value
+
+    for field in REQUIRED_FIELDS:
+        if not row[field]:
+            return None, f"missing required field '{field}'"
+
+    if row['email']:
+        try:
+            validate_email(row['email'])
+        except ValidationError:
+            return None, f"invalid email '{row['email']}'"
+
+    row['role'] = row['role'] or 'Student'
+    row['email'] = row['email'] or None
+    row['phone_number'] = row['phone_number'] or None
+    row['row_hash'] = row_hash(row)
+    return row, None
+
+
+def _apply_chunk(rows):
+    """
+    Insert/update one chunk of cleaned rows keyed by username.
+    Returns (inserted, updated, unchanged).
+    """
+    existing = {}
+    for student in (CollegeStudent.objects
+                    .filter(username__in=rows.keys())
+                    .only('id', 'username', 'row_hash')
+                    .order_by('id')):
+        existing.setdefault(student.username, student)
+
+    to_create, to_update, unchanged = [], [], 0
+    for username, row in rows.items():
+        student = existing.get(username)
+        if student is None:
+            to_create.append(CollegeStudent(**row))
+        elif student.row_hash == row['row_hash']:
+            unchanged += 1
+        else:
+            for field, value in row.items():
+                setattr(student, field, value)
+            to_update.append(student)
+
+    if to_create:
+        CollegeStudent.objects.bulk_create(to_create)
+    if to_update:
+        CollegeStudent.objects.bulk_update(to_update, list(ROSTER_FIELDS) + ['row_hash'])
+    return len(to_create), len(to_update), unchanged
+
+
+def import_roster(fileobj, source_name, chunk_size=DEFAULT_CHUNK_SIZE, restart=False, progress=None):
+    """
+    Stream a CollegeStudent roster CSV into the database.
+
+    Rows are applied in chunks with bulk_create/bulk_update; each chunk commits
+    together with the RosterImport checkpoint, so an interrupted run of the same
+    file (same checksum) resumes after the last committed row. The first row of
+    a username wins; later duplicates anywhere in the file are rejected.
+    """
+    checksum = file_checksum(fileobj)
+
+    run = None
+    if not restart:
+        run = (RosterImport.objects
+               .filter(checksum=checksum)
+               .exclude(status='completed')
+               .order_by('-started_at')
+               .first())
+    if run is None:
+        run = RosterImport.objects.create(source_name=source_name, checksum=checksum)
+    else:
+        run.status = 'running'
+        run.save(update_fields=['status'])
+
+    errors = run.errors.splitlines()
+    resume_after = run.rows_processed
+    pending = {}  # username -> cleaned row
+    seen = {}     # username -> line number of its first row, across the whole run
+    last_line = resume_after
+
+    def flush():
+        inserted, updated, unchanged = _apply_chunk(pending) if pending else (0, 0, 0)
+        run.inserted += inserted
+        run.updated += updated
+        run.unchanged += unchanged
+        run.rows_processed = last_line
+        run.errors = '\n'.join(errors[:MAX_ERRORS_KEPT])
+        run.save(update_fields=['inserted', 'updated', 'unchanged', 'rejected',
+                                'rows_processed', 'errors'])
+        pending.clear()
+        if progress:
+            progress(run)
+
+    def reject(line_no, message):
+        run.rejected += 1
+        if len(errors) < MAX_ERRORS_KEPT:
+            errors.append(f"line {line_no}: {message}")
+
+    try:
+        for line_no, raw in iter_roster_rows(fileobj):
+            row, error = clean_row(raw)
+            if line_no <= resume_after:
+                # already applied; only remember its username for the duplicate check
+                if row:
+                    seen.setdefault(row['username'], line_no)
+                continue
+
+            if error:
+                reject(line_no, error)
+            elif row['username'] in seen:
+                reject(line_no, f"duplicate username '{row['username']}' (first on line {seen[row['username']]})")
+            else:
+                seen[row['username']] = line_no
+                pending[row['username']] = row
+            last_line = line_no
+
+            if len(pending) >= chunk_size:
+                with transaction.atomic():
+                    flush()
+
+        with transaction.atomic():
+            flush()
+    except Exception:
+        run.status = 'failed'
+        run.save(update_fields=['status'])
+        raise
+
+    run.status = 'completed'
+    run.finished_at = timezone.now()
+    run.save(update_fields=['status', 'finished_at'])
+    return run
@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from events.models import Event, EventRegistration
+from .authentication import invalidate_token, invalidate_user_tokens
+from .models import User
+from .stats import invalidate_dashboards
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, update_fields=None, **kwargs):
+    # logins only touch last_login, which no dashboard counts
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_dashboards()
+    # cached tokens carry a copy of the user: password changes, deactivation
+    # and role edits must not keep being served from it
+    invalidate_user_tokens(instance.id)
+
+
+@receiver(post_delete, sender=User)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_dashboards(instance.id)
+    invalidate_user_tokens(instance.id)
+
+
+@receiver(post_delete, sender=Token)
+def token_deleted(sender, instance, **kwargs):
+    # logout_view deletes the token
+    invalidate_token(instance.key)
+
+
+@receiver(post_save, sender=Event)
+@receiver(post_delete, sender=Event)
+def event_changed(sender, instance, **kwargs):
+    invalidate_dashboards(instance.organizer_id)
+
+
+@receiver(post_save, sender=EventRegistration)
+@receiver(post_delete, sender=EventRegistration)
+def registration_changed(sender, instance, **kwargs):
+    invalidate_dashboards(instance.student_id, roles=False)
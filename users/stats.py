@@ -0,0 +1,112 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from events.models import Event, EventRegistration
+from .models import User
+
+# Dashboard counters, one or two conditional-aggregation queries per role.
+# Admin and chief payloads are the same for everyone with that role and are
+# cached per role; organizer and student payloads are cached per user.
+# users/signals.py drops the affected keys on writes; the short TTL covers
+# writes that bypass signals (bulk_create, queryset.update()).
+
+ROLE_KEYS = ('dashboard:role:admin', 'dashboard:role:chief')
+
+
+def user_cache_key(user_id):
+    return f"dashboard:user:{user_id}"
+
+
+def _cache_ttl():
+    return getattr(settings, 'DASHBOARD_STATS_CACHE_TTL', 60)
+
+
+def _user_totals():
+    has_department = Q(department__isnull=False) & ~Q(department='')
+    has_organization = Q(organization__isnull=False) & ~Q(organization='')
+    return User.objects.aggregate(
+        total_users=Count('id'),
+        total_students=Count('id', filter=Q(role='Student')),
+        total_departments=Count('department', filter=has_department, distinct=True),
+        total_organization=Count('organization', filter=has_organization, distinct=True),
+    )
+
+
+def _event_totals(**filters):
+    return Event.objects.filter(**filters).aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status))
+           for status in ('pending', 'approved', 'rejected', 'cancelled', 'completed')},
+    )
+
+
+def _admin_stats():
+    users, events = _user_totals(), _event_totals()
+    return {
+        **users,
+        'total_events': events['total'],
+        'approved_approvals': events['approved'],
+        'pending_approvals': events['pending'],
+        'cancelled_approvals': events['cancelled'],
+        'completed_events': events['completed'],
+    }
+
+
+def _chief_stats():
+    users, events = _user_totals(), _event_totals()
+    return {
+        'pending_approvals': events['pending'],
+        'approved_events': events['approved'],
+        'rejected_events': events['rejected'],
+        'cancelled_events': events['cancelled'],
+        'completed_events': events['completed'],
+        **users,
+        'total_events': events['total'],
+    }
+
+
+def _organizer_stats(user):
+    events = _event_totals(organizer=user)
+    return {
+        'created_events': events['total'],
+        'pending_events': events['pending'],
+        'approved_events': events['approved'],
+        'cancelled_events': events['cancelled'],
+        'completed_events': events['completed'],
+    }
+
+
+def _student_stats(user):
+    registrations = EventRegistration.objects.filter(student=user).aggregate(
+        registered_events=Count('id'),
+        upcoming_events=Count('id', filter=Q(event__status='approved')),
+    )
+    return {**registrations, 'certificates_earned': 0}  # To be filled from certificates app later
+
+
+def dashboard_stats_for(user):
+    """Cached dashboard payload for a user's role, or None if the role has no dashboard."""
+    if user.is_admin_user():
+        key, compute = ROLE_KEYS[0], _admin_stats
+    elif user.is_chief():
+        key, compute = ROLE_KEYS[1], _chief_stats
+    elif user.is_student():
+        key, compute = user_cache_key(user.id), lambda: _student_stats(user)
+    elif user.is_department() or user.is_organization():
+        key, compute = user_cache_key(user.id), lambda: _organizer_stats(user)
+    else:
+        return None
+
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute()
+        cache.set(key, stats, _cache_ttl())
+    return stats
+
+
+def invalidate_dashboards(*user_ids, roles=True):
+    keys = [user_cache_key(user_id) for user_id in user_ids if user_id]
+    if roles:
+        keys.extend(ROLE_KEYS)
+    cache.delete_many(keys)
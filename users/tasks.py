@@ -0,0 +1,34 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from notifications.utils import default_from_email, send_bulk_emails
+from .models import User
+
+
+def _activation_url(user):
+    uid = urlsafe_base64_encode(force_bytes(user.pk))
+    token = default_token_generator.make_token(user)
+    path = reverse('password_reset_confirm', kwargs={'uidb64': uid, 'token': token})
+    return f"http://{getattr(settings, 'SITE_DOMAIN', 'localhost:8000')}".rstrip("/") + path
+
+
+@shared_task
+def send_account_activation_emails(user_ids):
+    # One task per provisioning batch; all messages go out over a single SMTP connection.
+    from_email = default_from_email()
+    messages = []
+    for user in User.objects.filter(id__in=user_ids).only('id', 'username', 'email', 'password', 'last_login', 'first_name'):
+        body = (
+            f"Dear {user.first_name or user.username},\n\n"
+            f"An Eventify account has been created for you from the college roster.\n\n"
+            f"Username: {user.username}\n\n"
+            f"Set your password here to activate it:\n{_activation_url(user)}\n\n"
+            f"Best regards,\nEventify Team"
+        )
+        messages.append(EmailMessage("Activate your Eventify account", body, from_email, [user.email]))
+    return send_bulk_emails(messages)
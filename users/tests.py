@@ -1,3 +1,232 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIClient
+
+from events.models import Event, EventRegistration
+from . import authentication
+from .models import CollegeStudent, User
+from .roster import import_roster
+
+
+class DashboardStatsQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin1', email='admin1@x.com', phone_number='a1', role='Admin')
+        cls.chief = User.objects.create(username='chief1', email='chief1@x.com', phone_number='c1', role='Campus-cheif')
+        cls.organizer = User.objects.create(username='dept1', email='dept1@x.com', phone_number='d1',
+                                            role='Department', department='it')
+        cls.student = User.objects.create(username='stud1', email='stud1@x.com', phone_number='s1', role='Student')
+        now = timezone.now()
+        for i, event_status in enumerate(['pending', 'approved', 'approved', 'completed', 'cancelled']):
+            event = Event.objects.create(
+                title=f'Event {i}', description='-', event_level='college', event_type='workshop',
+                start_date=now + timedelta(days=2), end_date=now + timedelta(days=3), venue='Hall',
+                organizer=cls.organizer, registration_deadline=now + timedelta(days=1), status=event_status,
+            )
+            EventRegistration.objects.create(event=event, student=cls.student, status='confirmed')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('dashboard_stats')
+
+    def get_stats(self, user, queries):
+        self.client.force_authenticate(user)
+        with self.assertNumQueries(queries):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_admin_stats_use_two_queries_then_cache(self):
+        stats = self.get_stats(self.admin, 2)
+        self.assertEqual(stats['total_users'], 4)
+        self.assertEqual(stats['total_students'], 1)
+        self.assertEqual(stats['total_departments'], 1)
+        self.assertEqual(stats['total_events'], 5)
+        self.assertEqual(stats['approved_approvals'], 2)
+        self.get_stats(self.admin, 0)
+
+    def test_chief_stats_use_two_queries(self):
+        stats = self.get_stats(self.chief, 2)
+        self.assertEqual(stats['pending_approvals'], 1)
+        self.assertEqual(stats['completed_events'], 1)
+
+    def test_organizer_stats_use_one_query(self):
+        stats = self.get_stats(self.organizer, 1)
+        self.assertEqual(stats['created_events'], 5)
+        self.assertEqual(stats['cancelled_events'], 1)
+
+    def test_student_stats_use_one_query(self):
+        stats = self.get_stats(self.student, 1)
+        self.assertEqual(stats['registered_events'], 5)
+        self.assertEqual(stats['upcoming_events'], 2)
+
+    def test_event_write_invalidates_cached_stats(self):
+        self.get_stats(self.organizer, 1)
+        Event.objects.filter(status='pending').get().delete()
+        stats = self.get_stats(self.organizer, 1)
+        self.assertEqual(stats['created_events'], 4)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='stud2', email='stud2@x.com', phone_number='s2', role='Student')
+
+    def setUp(self):
+        cache.clear()
+        authentication._lru.clear()
+        self.token = Token.objects.create(user=self.user)
+        self.auth = authentication.CachedTokenAuthentication()
+
+    def test_repeat_lookups_skip_the_database(self):
+        with self.assertNumQueries(1):
+            user, token = self.auth.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+        authentication._lru.clear()
+        with self.assertNumQueries(0):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_logout_invalidates_cached_token(self):
+        self.auth.authenticate_credentials(self.token.key)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(client.post(reverse('logout')).status_code, 200)
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    def test_password_change_refreshes_cached_user(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.set_password('changed-secret')
+        self.user.save()
+        user, _ = self.auth.authenticate_credentials(self.token.key)
+        self.assertTrue(user.check_password('changed-secret'))
+
+    def test_deactivation_rejects_cached_token(self):
+        self.auth.authenticate_credentials(self.token.key)
+        self.user.is_active = False
+        self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+
+    @override_settings(TOKEN_EXPIRE_SECONDS=60)
+    def test_expired_token_is_rejected_and_deleted(self):
+        Token.objects.filter(pk=self.token.pk).update(created=timezone.now() - timedelta(minutes=5))
+        with self.assertRaises(AuthenticationFailed):
+            self.auth.authenticate_credentials(self.token.key)
+        self.assertFalse(Token.objects.filter(pk=self.token.pk).exists())
+
+
+class UserDirectoryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create(username='admin3', email='admin3@x.com', phone_number='a3', role='Admin')
+        cls.organizer = User.objects.create(username='dept3', email='dept3@x.com', phone_number='d3',
+                                            role='Department', department='it')
+        cls.club = User.objects.create(username='club3', email='club3@x.com', phone_number='o3',
+                                       role='Organization', organization='csit_union')
+        cls.chief = User.objects.create(username='chief3', email='chief3@x.com', phone_number='c3',
+                                        role='Campus-cheif')
+        cls.staff = User.objects.create(username='staff3', email='staff3@x.com', phone_number='t3',
+                                        role='Admin', is_staff=True)
+        for i in range(5):
+            User.objects.create(username=f'ram{i}', email=f'ram{i}@x.com', phone_number=f'980{i}', role='Student',
+                                department='it' if i % 2 else 'physics', student_id=f'CS{i}')
+
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('user-list')
+
+    def usernames(self, user, **params):
+        self.client.force_authenticate(user)
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [row['username'] for row in response.json()['results']]
+
+    def test_filters_and_prefix_search(self):
+        self.assertEqual(self.usernames(self.admin, role='Student', department='it'), ['ram1', 'ram3'])
+        self.assertEqual(self.usernames(self.admin, search='ram'), [f'ram{i}' for i in range(5)])
+        self.assertEqual(self.usernames(self.admin, search='9802'), ['ram2'])
+        self.assertEqual(self.usernames(self.admin, search='CS4'), ['ram4'])
+
+    def test_cursor_pagination(self):
+        self.client.force_authenticate(self.admin)
+        page = self.client.get(self.url, {'page_size': 4, 'role': 'Student'}).json()
+        self.assertEqual(len(page['results']), 4)
+        rest = self.client.get(page['next']).json()
+        self.assertEqual(len(rest['results']), 1)
+
+    def status_codes(self, user):
+        self.client.force_authenticate(user)
+        detail = reverse('user-detail', args=[self.admin.id])
+        return (self.client.get(self.url).status_code, self.client.get(detail).status_code,
+                self.client.post(self.url, {}).status_code)
+
+    def test_admin_and_chief_list_everyone_read_only(self):
+        for user in (self.admin, self.chief):
+            self.assertEqual(len(self.usernames(user)), 10)
+            self.assertEqual(self.status_codes(user), (200, 403, 403))
+
+    def test_organizers_list_students_only(self):
+        for user in (self.organizer, self.club):
+            self.assertEqual(self.usernames(user), [f'ram{i}' for i in range(5)])
+            self.assertEqual(self.status_codes(user), (200, 403, 403))
+
+    def test_staff_keep_full_access(self):
+        self.assertEqual(len(self.usernames(self.staff)), 10)
+        self.assertEqual(self.status_codes(self.staff)[:2], (200, 200))
+        self.assertEqual(self.status_codes(self.staff)[2], 400)  # validation, not permission
+
+    def test_students_are_denied(self):
+        student = User.objects.get(username='ram0')
+        self.assertEqual(self.status_codes(student), (403, 403, 403))
+
+
+class RosterImportTests(TestCase):
+    CSV = (b"name,username,department\n"
+           b"Ram,ram,it\nSita,sita,it\nRam Again,ram,physics\nHari,hari,it\nSita Again,sita,bio\n")
+
+    def test_duplicates_are_handled_the_same_for_any_chunk_size(self):
+        for chunk_size in (1, 2, 100):
+            CollegeStudent.objects.all().delete()
+            run = import_roster(io.BytesIO(self.CSV), 'roster.csv', chunk_size=chunk_size, restart=True)
+            self.assertEqual((run.inserted, run.updated, run.rejected), (3, 0, 2), chunk_size)
+            self.assertEqual(CollegeStudent.objects.get(username='ram').department, 'it')
+
+
+class ProvisionStudentAccountsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(username='hari_old', email='Hari@X.com', phone_number='p0', role='Student')
+        for i, (username, email) in enumerate([('ram', 'ram@x.com'), ('sita', 'Sita@x.com'), ('hari', 'hari@x.com')]):
+            CollegeStudent.objects.create(name=f'{username.title()} Kumar', username=username, role='Student',
+                                          department='it', email=email, phone_number=f'p{i + 1}')
+
+    def provision(self):
+        call_command('provision_student_accounts', workers=1, sync_email=True, stdout=io.StringIO())
+
+    def test_rerun_skips_existing_accounts(self):
+        self.provision()
+        self.assertEqual(set(User.objects.filter(role='Student').values_list('username', flat=True)),
+                         {'hari_old', 'ram', 'sita'})
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(User.objects.get(username='sita').email, 'sita@x.com')
+
+        self.provision()
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_email_taken_in_another_casing_is_rejected(self):
+        self.provision()
+        self.assertFalse(User.objects.filter(username='hari').exists())
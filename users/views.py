@@ -9,9 +9,12 @@ from django.contrib.auth import login, logout
 from django.contrib.auth.decorators import login_required
 from rest_framework import viewsets,permissions
 from rest_framework.viewsets import ModelViewSet
+from rest_framework.pagination import CursorPagination
 from django.views.decorators.csrf import csrf_exempt
 from django.core.exceptions import ValidationError
-from events.models import Event
+from .authentication import token_expired
+from .permissions import IsDirectoryUser
+from .stats import dashboard_stats_for
 # Create your views here.
 
 class UserRegistrationView(generics.CreateAPIView):
@@ -40,6 +43,9 @@ def login_view(request):
         user = serializer.validated_data['user']
 
         token, created = Token.objects.get_or_create(user=user)
+        if token_expired(token):
+            token.delete()
+            token = Token.objects.create(user=user)
 
         return Response({
             'message': 'Login successful',
@@ -323,64 +329,65 @@ def update_profile(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def dashboard_stats(request):
-    user = request.user
-    stats = {}
-
-    if user.is_admin_user():
-        stats = {
-            'total_users': User.objects.count(),
-            'total_students': User.objects.filter(role='Student').count(),
-            'total_departments': User.objects.exclude(department__isnull=True).exclude(department='').values('department').distinct().count(),
-            'total_organization': User.objects.exclude(organization__isnull=True).exclude(organization='').values('organization').distinct().count(),
-            'total_events': Event.objects.count(),
-            'approved_approvals': Event.objects.filter(status='approved').count(),
-            'pending_approvals': Event.objects.filter(status='pending').count(),
-            'cancelled_approvals': Event.objects.filter(status='cancelled').count(),
-            'completed_events': Event.objects.filter(status='completed').count(),
-        }
-
-    elif user.is_student():
-        from events.models import EventRegistration  # avoid circular import
-        stats = {
-            'registered_events': EventRegistration.objects.filter(student=user).count(),
-            'upcoming_events': EventRegistration.objects.filter(student=user, event__status='approved').count(),
-            'certificates_earned': 0,  # To be filled from certificates app later
-        }
-
-    elif user.is_department() or user.is_organization():
-        stats = {
-            'created_events': Event.objects.filter(organizer=user).count(),
-            'pending_events': Event.objects.filter(organizer=user, status='pending').count(),
-            'approved_events': Event.objects.filter(organizer=user, status='approved').count(),
-            'cancelled_events': Event.objects.filter(organizer=user, status='cancelled').count(),
-            'completed_events': Event.objects.filter(organizer=user, status='completed').count(),
-        }
-
-    elif user.is_chief():
-        stats = {
-            'pending_approvals': Event.objects.filter(status='pending').count(),
-            'approved_events': Event.objects.filter(status='approved').count(),
-            'rejected_events': Event.objects.filter(status='rejected').count(),
-            'cancelled_events': Event.objects.filter(status='cancelled').count(),
-            'completed_events': Event.objects.filter( status='completed').count(),
-            'total_users': User.objects.count(),
-            'total_students': User.objects.filter(role='Student').count(),
-            'total_departments': User.objects.exclude(department__isnull=True).exclude(department='').values('department').distinct().count(),
-            'total_organization': User.objects.exclude(organization__isnull=True).exclude(organization='').values('organization').distinct().count(),
-            'total_events': Event.objects.count(),
-
-        }
-
-    else:
+    stats = dashboard_stats_for(request.user)
+    if stats is None:
         stats = {'message': 'No dashboard available for your role.'}
 
     return Response(stats, status=status.HTTP_200_OK)
 
 
-    
+class UserDirectoryPagination(CursorPagination):
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+
+# Prefix search as a range on each column (value >= prefix and < prefix + the
+# highest code point), one subquery per column, so each is answered from that
+# column's unique index. LIKE 'x%' cannot use those indexes (SQLite's LIKE
+# ignores case and Django adds an ESCAPE clause), so the match is
+# case-sensitive.
+SEARCH_FIELDS = ('username', 'email', 'phone_number', 'student_id')
+PREFIX_END = '\U0010ffff'
+
+
+def prefix_search(queryset, term):
+    matches = [User.objects.filter(**{f'{field}__gte': term, f'{field}__lt': term + PREFIX_END}).values('id')
+               for field in SEARCH_FIELDS]
+    return queryset.filter(id__in=matches[0].union(*matches[1:]))
 
 
 class UserViewSet(viewsets.ModelViewSet):
+    # """
+    # User directory. Lists are cursor-paginated by id and filtered with
+    # ?role=, ?department=, ?organization= and ?search= (prefix of username,
+    # email, phone number or student id). See IsDirectoryUser for who may
+    # list; Department and Organization users only see students.
+    # """
     queryset = User.objects.all()
     serializer_class = UserRegistrationSerializer
-    permission_classes=[permissions.IsAdminUser]
\ No newline at end of file
+    permission_classes = [IsDirectoryUser]
+    pagination_class = UserDirectoryPagination
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return UserProfileSerializer
+        return UserRegistrationSerializer
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = User.objects.select_related('profile')
+        if not (user.is_staff or user.is_admin_user() or user.is_chief()):
+            queryset = queryset.filter(role='Student')
+        if self.action != 'list':
+            return queryset
+
+        params = self.request.query_params
+        for field in ('role', 'department', 'organization'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        search = params.get('search', '').strip()
+        if search:
+            queryset = prefix_search(queryset, search)
+        return queryset
\ No newline at end of file